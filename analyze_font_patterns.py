@@ -14,6 +14,7 @@ This reveals the common structure/template that designers used.
 import os
 import sys
 import glob
+import numpy as np
 from PIL import Image
 import argparse
 
@@ -22,35 +23,80 @@ def count_black_columns(img):
     Count the number of black columns in an image
     
     Args:
-        img: PIL Image object
+        img: PIL Image object (or 2D array of palette indices)
         
     Returns:
         Number of columns where all pixels are 0 (with special handling for first column)
     """
-    pixel_data = list(img.getdata())
-    width = img.width
-    height = img.height
-    black_cols = 0
+    non_zero = np.asarray(img) != 0
     
-    for x in range(width):
-        is_black_col = True
-        
-        for y in range(height):
-            pixel_index = y * width + x
-            pixel_value = pixel_data[pixel_index]
-            
-            # Special case: for first column (x=0), ignore pixel at (0,0) since it's always colored
-            if x == 0 and y == 0:
-                continue
+    # Special case: for first column (x=0), ignore pixel at (0,0) since it's always colored
+    non_zero[0, 0] = False
+    
+    return int((~non_zero.any(axis=0)).sum())
+
+def load_glyph_arrays(bitmap_folder, debug=False):
+    """
+    Load every BMP in a folder as a 2D array of palette indices
+    
+    Returns:
+        Tuple of (file names, list of uint8 arrays)
+    """
+    bmp_pattern = os.path.join(bitmap_folder, "*.bmp")
+    files = []
+    arrays = []
+    
+    for bmp_file in sorted(glob.glob(bmp_pattern)):
+        try:
+            with Image.open(bmp_file) as img:
+                pixels = np.asarray(img if img.mode in ('P', 'L') else img.convert('L'), dtype=np.uint8)
+            files.append(os.path.basename(bmp_file))
+            arrays.append(pixels)
             
-            if pixel_value != 0:
-                is_black_col = False
-                break
+            if debug:
+                print(f"  ✓ {os.path.basename(bmp_file)}: {pixels.shape[1]}x{pixels.shape[0]} ({pixels.size} pixels)")
+                
+        except Exception as e:
+            if debug:
+                print(f"  ✗ Error loading {os.path.basename(bmp_file)}: {e}")
+    
+    return files, arrays
+
+def color_histograms(arrays):
+    """
+    Per-glyph color histograms with one bincount over all pixel buffers
+    
+    Args:
+        arrays: List of 2D uint8 arrays (one per glyph)
         
-        if is_black_col:
-            black_cols += 1
+    Returns:
+        (N, 256) int64 array, row i counts the colors of glyph i
+    """
+    if not arrays:
+        return np.zeros((0, 256), dtype=np.int64)
+    
+    sizes = [a.size for a in arrays]
+    pixels = np.concatenate([a.ravel() for a in arrays]).astype(np.int64)
+    glyph_ids = np.repeat(np.arange(len(arrays)), sizes)
     
-    return black_cols
+    return np.bincount(glyph_ids * 256 + pixels, minlength=len(arrays) * 256).reshape(len(arrays), 256)
+
+def glyphs_using_colors(files, histograms, colors):
+    """
+    Query per-glyph color usage
+    
+    Args:
+        files: Glyph file names (rows of histograms)
+        histograms: (N, 256) array from color_histograms
+        colors: Color indices (e.g. the colors of one role such as the shadow)
+        
+    Returns:
+        Dictionary of file name -> {color: pixel count} for glyphs using any of the colors
+    """
+    colors = list(colors)
+    usage = histograms[:, colors]
+    return {files[i]: {color: int(count) for color, count in zip(colors, usage[i]) if count}
+            for i in np.flatnonzero(usage.any(axis=1))}
 
 def analyze_color_statistics(bitmap_folder, debug=False):
     """
@@ -68,45 +114,27 @@ def analyze_color_statistics(bitmap_folder, debug=False):
         print(f"Analyzing color statistics in: {bitmap_folder}")
         print("=" * 60)
     
-    # Find all BMP files
-    bmp_pattern = os.path.join(bitmap_folder, "*.bmp")
-    all_bmp_files = glob.glob(bmp_pattern)
+    files, arrays = load_glyph_arrays(bitmap_folder, debug)
     
-    if not all_bmp_files:
+    if not files:
         print(f"No BMP files found in {bitmap_folder}")
         return None
     
     # Color statistics tracking
-    color_counts = {}
-    total_pixels = 0
-    processed_files = 0
-    
-    for bmp_file in sorted(all_bmp_files):
-        try:
-            img = Image.open(bmp_file)
-            pixel_data = list(img.getdata())
-            
-            # Count pixels for this image
-            for pixel in pixel_data:
-                color_counts[pixel] = color_counts.get(pixel, 0) + 1
-                total_pixels += 1
-            
-            processed_files += 1
-            
-            if debug:
-                print(f"  ✓ {os.path.basename(bmp_file)}: {img.width}x{img.height} ({len(pixel_data)} pixels)")
-                
-        except Exception as e:
-            if debug:
-                print(f"  ✗ Error loading {os.path.basename(bmp_file)}: {e}")
+    color_counts = color_histograms(arrays).sum(axis=0)
+    total_pixels = int(color_counts.sum())
+    processed_files = len(files)
     
     if total_pixels == 0:
         print("No pixels found to analyze")
         return None
     
-    # Calculate statistics
+    # Calculate statistics, sorted by usage (most used first)
+    used_colors = np.flatnonzero(color_counts)
+    used_colors = used_colors[np.argsort(-color_counts[used_colors], kind='stable')]
     color_stats = []
-    for color, count in color_counts.items():
+    for color in used_colors.tolist():
+        count = int(color_counts[color])
         percentage = (count / total_pixels) * 100
         color_stats.append({
             'color': color,
@@ -114,9 +142,6 @@ def analyze_color_statistics(bitmap_folder, debug=False):
             'percentage': percentage
         })
     
-    # Sort by usage (most used first)
-    color_stats.sort(key=lambda x: x['count'], reverse=True)
-    
     # Print statistics
     print(f"\n📊 Color Usage Statistics")
     print("=" * 60)
@@ -153,7 +178,7 @@ def analyze_color_statistics(bitmap_folder, debug=False):
         print(f"  Second most used: {second_most['color']} ({second_most['percentage']:.1f}%)")
     
     # Background vs content analysis
-    background_pixels = color_counts.get(0, 0)
+    background_pixels = int(color_counts[0])
     content_pixels = total_pixels - background_pixels
     
     print(f"  Background pixels (0): {background_pixels:,} ({background_pixels/total_pixels*100:.1f}%)")
@@ -166,7 +191,134 @@ def analyze_color_statistics(bitmap_folder, debug=False):
     
     return color_stats
 
-def analyze_font_patterns(bitmap_folder, target_width, output_file=None, num_black_cols=None, debug=False):
+def compare_color_statistics(bitmap_folders, colors=None, debug=False):
+    """
+    Compare color usage between font folders (e.g. every scene's console font)
+    
+    Args:
+        bitmap_folders: Folders containing bitmap files
+        colors: Only show these color indices (e.g. the role colors), default all used colors
+        debug: Whether to print debug information
+        
+    Returns:
+        Tuple of (folder names, (folders, 256) array of usage percentages)
+    """
+    names = []
+    totals = []
+    for bitmap_folder in bitmap_folders:
+        files, arrays = load_glyph_arrays(bitmap_folder, debug)
+        if not files:
+            print(f"No BMP files found in {bitmap_folder}")
+            continue
+        names.append(bitmap_folder.rstrip('/\\'))
+        totals.append(color_histograms(arrays).sum(axis=0))
+    
+    if not names:
+        return None
+    
+    totals = np.array(totals)
+    percentages = totals / np.maximum(totals.sum(axis=1, keepdims=True), 1) * 100
+    
+    if colors is None:
+        colors = np.flatnonzero(totals.any(axis=0)).tolist()
+    
+    print(f"\n📊 Color Usage Comparison (% of pixels)")
+    print("=" * 60)
+    column_width = max(10, max(len(name) for name in names) + 1)
+    print(f"{'Color':<8}" + "".join(f"{name:>{column_width}}" for name in names))
+    print("-" * (8 + column_width * len(names)))
+    for color in colors:
+        print(f"{color:<8}" + "".join(f"{percentages[i, color]:>{column_width - 1}.2f}%" for i in range(len(names))))
+    
+    return names, percentages
+
+def load_matching_glyphs(bitmap_folder, target_width, num_black_cols=None, debug=False):
+    """
+    Load the glyphs of a given width (and optionally number of black columns)
+    
+    Returns:
+        Tuple of (file names, list of 2D uint8 arrays)
+    """
+    matching_files = []
+    matching_arrays = []
+    
+    files, arrays = load_glyph_arrays(bitmap_folder)
+    for file_name, pixels in zip(files, arrays):
+        height, width = pixels.shape
+        if width != target_width:
+            if debug:
+                print(f"  - {file_name}: {width}x{height} (skipped - wrong width)")
+            continue
+        
+        # Check black columns filter if specified
+        black_cols = count_black_columns(pixels) if num_black_cols is not None else "N/A"
+        if num_black_cols is not None and black_cols != num_black_cols:
+            if debug:
+                print(f"  - {file_name}: {width}x{height} (skipped - has {black_cols} black cols, need {num_black_cols})")
+            continue
+        
+        matching_files.append(file_name)
+        matching_arrays.append(pixels)
+        if debug:
+            print(f"  ✓ {file_name}: {width}x{height} (black cols: {black_cols})")
+    
+    return matching_files, matching_arrays
+
+def stack_glyphs(arrays, fill=0):
+    """
+    Pad glyphs of the same width into one (N, H, W) uint8 stack
+    
+    Args:
+        arrays: List of 2D uint8 arrays
+        fill: Value for the rows below shorter glyphs
+    """
+    height = max(a.shape[0] for a in arrays)
+    width = max(a.shape[1] for a in arrays)
+    stack = np.full((len(arrays), height, width), fill, dtype=np.uint8)
+    for i, pixels in enumerate(arrays):
+        stack[i, :pixels.shape[0], :pixels.shape[1]] = pixels
+    return stack
+
+def union_image(stack):
+    """
+    Union (AND) of a glyph stack: where all non-zero pixels agree use that
+    color, otherwise (or where all are 0) use 0
+    """
+    non_zero = stack != 0
+    highest = stack.max(axis=0)
+    lowest_non_zero = np.where(non_zero, stack, 255).min(axis=0)
+    return np.where(non_zero.any(axis=0) & (highest == lowest_non_zero), highest, 0).astype(np.uint8)
+
+def color_counts(stack):
+    """Per-pixel color counts of a glyph stack, shape (H, W, 256)"""
+    count, height, width = stack.shape
+    positions = np.arange(height * width).reshape(1, height, width)
+    flat = (positions * 256 + stack).ravel()
+    return np.bincount(flat, minlength=height * width * 256).reshape(height, width, 256)
+
+def mode_image(stack):
+    """Most frequent non-zero color of each pixel (0 where all glyphs are 0)"""
+    counts = color_counts(stack)[:, :, 1:]
+    return np.where(counts.any(axis=2), counts.argmax(axis=2) + 1, 0).astype(np.uint8)
+
+def majority_image(stack):
+    """Color used by more than half of the glyphs at each pixel (0 otherwise)"""
+    counts = color_counts(stack)
+    winner = counts.argmax(axis=2)
+    return np.where(counts.max(axis=2) * 2 > len(stack), winner, 0).astype(np.uint8)
+
+def coverage_heatmap(stack):
+    """Share of glyphs with a non-zero pixel, scaled to 0-255"""
+    return np.round((stack != 0).mean(axis=0) * 255).astype(np.uint8)
+
+CONSENSUS_METHODS = {
+    'union': union_image,
+    'majority': majority_image,
+    'mode': mode_image,
+}
+
+def analyze_font_patterns(bitmap_folder, target_width, output_file=None, num_black_cols=None, debug=False,
+                          method='union', heatmap_file=None):
     """
     Analyze font bitmap patterns and create union image
     
@@ -176,6 +328,8 @@ def analyze_font_patterns(bitmap_folder, target_width, output_file=None, num_bla
         output_file: Output union image file (optional)
         num_black_cols: Number of black columns to filter by (optional)
         debug: Whether to print debug information
+        method: Consensus method: 'union', 'majority' or 'mode'
+        heatmap_file: Also save a coverage heatmap (optional)
     """
     
     if debug:
@@ -185,99 +339,33 @@ def analyze_font_patterns(bitmap_folder, target_width, output_file=None, num_bla
             print(f"Filter: Only images with exactly {num_black_cols} black columns")
         print("=" * 60)
     
-    # Find all BMP files with target width
-    bmp_pattern = os.path.join(bitmap_folder, "*.bmp")
-    all_bmp_files = glob.glob(bmp_pattern)
-    
-    if not all_bmp_files:
+    if not glob.glob(os.path.join(bitmap_folder, "*.bmp")):
         print(f"No BMP files found in {bitmap_folder}")
         return False
     
     # Filter by width and collect image data
-    matching_images = []
-    matching_files = []
+    matching_files, matching_arrays = load_matching_glyphs(bitmap_folder, target_width, num_black_cols, debug)
     
-    for bmp_file in sorted(all_bmp_files):
-        try:
-            img = Image.open(bmp_file)
-            
-            if img.width == target_width:
-                # Check black columns filter if specified
-                if num_black_cols is not None:
-                    black_cols = count_black_columns(img)
-                    if black_cols != num_black_cols:
-                        if debug:
-                            print(f"  - {os.path.basename(bmp_file)}: {img.width}x{img.height} (skipped - has {black_cols} black cols, need {num_black_cols})")
-                        continue
-                
-                matching_images.append(img)
-                matching_files.append(os.path.basename(bmp_file))
-                if debug:
-                    black_cols = count_black_columns(img) if num_black_cols is not None else "N/A"
-                    print(f"  ✓ {os.path.basename(bmp_file)}: {img.width}x{img.height} (black cols: {black_cols})")
-            else:
-                if debug:
-                    print(f"  - {os.path.basename(bmp_file)}: {img.width}x{img.height} (skipped - wrong width)")
-                    
-        except Exception as e:
-            if debug:
-                print(f"  ✗ Error loading {os.path.basename(bmp_file)}: {e}")
-    
-    if not matching_images:
+    if not matching_arrays:
         print(f"No BMP files with width {target_width} found")
         return False
     
     if debug:
-        print(f"\nFound {len(matching_images)} images with width {target_width}")
+        print(f"\nFound {len(matching_arrays)} images with width {target_width}")
         print("Files analyzed:")
         for filename in matching_files:
             print(f"  - {filename}")
     
-    # Determine dimensions for union image
-    # Use the maximum height among all matching images
-    max_height = max(img.height for img in matching_images)
-    union_width = target_width
-    union_height = max_height
+    # One (N, H, W) stack, shorter images are treated as 0 below their height
+    stack = stack_glyphs(matching_arrays)
+    union_height, union_width = stack.shape[1:]
     
     if debug:
         print(f"\nUnion image dimensions: {union_width}x{union_height}")
-        print("Creating union image...")
+        print(f"Creating {method} image...")
     
-    # Create union image
-    union_pixels = []
-    
-    for y in range(union_height):
-        for x in range(union_width):
-            # Collect pixel values from all images at position (x, y)
-            pixel_values = []
-            
-            for img in matching_images:
-                if x < img.width and y < img.height:
-                    pixel_data = list(img.getdata())
-                    pixel_index = y * img.width + x
-                    pixel_values.append(pixel_data[pixel_index])
-                else:
-                    # If image is smaller, treat as 0
-                    pixel_values.append(0)
-            
-            # Apply union logic: find non-zero pixels and check if they're all the same
-            non_zero_values = [v for v in pixel_values if v != 0]
-            
-            if not non_zero_values:
-                # All pixels are 0, so union is 0
-                union_pixel = 0
-            elif len(set(non_zero_values)) == 1:
-                # All non-zero pixels have the same color, use that color
-                union_pixel = non_zero_values[0]
-            else:
-                # Non-zero pixels have different colors, use 0
-                union_pixel = 0
-            
-            union_pixels.append(union_pixel)
-    
-    # Create and save union image
-    union_img = Image.new('L', (union_width, union_height))
-    union_img.putdata(union_pixels)
+    union_pixels = CONSENSUS_METHODS[method](stack)
+    union_img = Image.fromarray(union_pixels, 'L')
     
     # Generate output filename if not provided
     if output_file is None:
@@ -286,13 +374,18 @@ def analyze_font_patterns(bitmap_folder, target_width, output_file=None, num_bla
     
     union_img.save(output_file)
     
+    if heatmap_file:
+        Image.fromarray(coverage_heatmap(stack), 'L').save(heatmap_file)
+        if debug:
+            print(f"✓ Coverage heatmap saved: {heatmap_file}")
+    
     if debug:
         print(f"✓ Union image saved: {output_file}")
         
         # Analyze the union image
-        unique_values = set(union_pixels)
-        non_zero_pixels = sum(1 for p in union_pixels if p != 0)
-        total_pixels = len(union_pixels)
+        unique_values = np.unique(union_pixels).tolist()
+        non_zero_pixels = int(np.count_nonzero(union_pixels))
+        total_pixels = union_pixels.size
         
         print(f"\nUnion Image Analysis:")
         print(f"  Dimensions: {union_width}x{union_height}")
@@ -300,18 +393,19 @@ def analyze_font_patterns(bitmap_folder, target_width, output_file=None, num_bla
         print(f"  Common pixels: {non_zero_pixels}")
         print(f"  Different pixels: {total_pixels - non_zero_pixels}")
         print(f"  Common coverage: {non_zero_pixels/total_pixels*100:.1f}%")
-        print(f"  Unique pixel values: {sorted(unique_values)}")
+        print(f"  Unique pixel values: {unique_values}")
         
         if non_zero_pixels > 0:
             print(f"\nThis shows the common structure/template used by designers!")
-            print(f"Non-zero pixels represent areas where ALL {len(matching_images)} characters")
+            print(f"Non-zero pixels represent areas where ALL {len(matching_arrays)} characters")
             print(f"have the same pixel value - revealing the design pattern.")
         else:
             print(f"\nNo common patterns found - characters are very different from each other.")
     
     return True
 
-def create_comparison_grid(bitmap_folder, target_width, output_file=None, num_black_cols=None, debug=False):
+def create_comparison_grid(bitmap_folder, target_width, output_file=None, num_black_cols=None, debug=False,
+                           method='union'):
     """
     Create a grid showing all matching bitmaps plus the union for comparison
     
@@ -321,85 +415,31 @@ def create_comparison_grid(bitmap_folder, target_width, output_file=None, num_bl
         output_file: Output comparison grid file (optional)
         num_black_cols: Number of black columns to filter by (optional)
         debug: Whether to print debug information
+        method: Consensus method used for the last tile
     """
     
-    # Find all BMP files with target width
-    bmp_pattern = os.path.join(bitmap_folder, "*.bmp")
-    all_bmp_files = glob.glob(bmp_pattern)
-    
-    matching_images = []
-    matching_files = []
-    
-    for bmp_file in sorted(all_bmp_files):
-        try:
-            img = Image.open(bmp_file)
-            
-            if img.width == target_width:
-                # Check black columns filter if specified
-                if num_black_cols is not None:
-                    black_cols = count_black_columns(img)
-                    if black_cols != num_black_cols:
-                        continue
-                
-                matching_images.append(img)
-                matching_files.append(os.path.basename(bmp_file))
-        except:
-            continue
+    matching_files, matching_arrays = load_matching_glyphs(bitmap_folder, target_width, num_black_cols)
     
-    if not matching_images:
+    if not matching_arrays:
         if debug:
             print("No matching images found for comparison grid")
         return False
     
-    # Create union image (reuse logic from above)
-    max_height = max(img.height for img in matching_images)
-    union_pixels = []
-    
-    for y in range(max_height):
-        for x in range(target_width):
-            pixel_values = []
-            for img in matching_images:
-                if x < img.width and y < img.height:
-                    pixel_data = list(img.getdata())
-                    pixel_index = y * img.width + x
-                    pixel_values.append(pixel_data[pixel_index])
-                else:
-                    pixel_values.append(0)
-            
-            # Apply same union logic as main function
-            non_zero_values = [v for v in pixel_values if v != 0]
-            
-            if not non_zero_values:
-                union_pixels.append(0)
-            elif len(set(non_zero_values)) == 1:
-                union_pixels.append(non_zero_values[0])
-            else:
-                union_pixels.append(0)
-    
-    union_img = Image.new('L', (target_width, max_height))
-    union_img.putdata(union_pixels)
+    # Union from the zero-padded stack, tiles keep the gray background below shorter glyphs
+    union_pixels = CONSENSUS_METHODS[method](stack_glyphs(matching_arrays))
+    tiles = stack_glyphs(matching_arrays + [union_pixels], fill=128)
+    count, tile_height, tile_width = tiles.shape
     
     # Calculate grid dimensions
-    cols = min(8, len(matching_images) + 1)  # +1 for union image
-    rows = ((len(matching_images) + 1) + cols - 1) // cols
+    cols = min(8, count)  # count includes the union image
+    rows = (count + cols - 1) // cols
     
-    # Create grid image
-    grid_width = cols * (target_width + 2) - 2  # +2 for spacing between images
-    grid_height = rows * (max_height + 2) - 2
-    grid_img = Image.new('L', (grid_width, grid_height), 128)  # Gray background
-    
-    # Place images in grid
-    images_to_place = matching_images + [union_img]
-    labels = matching_files + ["UNION"]
-    
-    for i, (img, label) in enumerate(zip(images_to_place, labels)):
-        row = i // cols
-        col = i % cols
-        
-        x_pos = col * (target_width + 2)
-        y_pos = row * (max_height + 2)
-        
-        grid_img.paste(img, (x_pos, y_pos))
+    # Lay the stack out as (rows, cols) tiles with 2 pixels of gray spacing
+    grid = np.full((rows * cols, tile_height + 2, tile_width + 2), 128, dtype=np.uint8)
+    grid[:count, :tile_height, :tile_width] = tiles
+    grid = grid.reshape(rows, cols, tile_height + 2, tile_width + 2).transpose(0, 2, 1, 3)
+    grid = grid.reshape(rows * (tile_height + 2), cols * (tile_width + 2))[:-2, :-2]
+    grid_img = Image.fromarray(np.ascontiguousarray(grid), 'L')
     
     # Generate output filename if not provided
     if output_file is None:
@@ -410,7 +450,7 @@ def create_comparison_grid(bitmap_folder, target_width, output_file=None, num_bl
     
     if debug:
         print(f"✓ Comparison grid saved: {output_file}")
-        print(f"  Grid: {cols}x{rows} ({len(images_to_place)} images including union)")
+        print(f"  Grid: {cols}x{rows} ({count} images including union)")
     
     return True
 
@@ -425,12 +465,16 @@ Examples:
   python analyze_font_patterns.py bitmaps 8 --output font_pattern.bmp
   python analyze_font_patterns.py bitmaps 12 --grid --debug
   python analyze_font_patterns.py bitmaps 12 --num-black-cols 2 --debug
+  python analyze_font_patterns.py bitmaps 12 --method majority --heatmap coverage.bmp
   python analyze_font_patterns.py bitmaps --stats --debug
+  python analyze_font_patterns.py bitmaps --stats --colors 123,124,209
+  python analyze_font_patterns.py bitmaps --compare castle/bitmaps deadcity/bitmaps --colors 123,124,209
   
 This tool helps understand how designers in the 90s created consistent font patterns
 by showing what pixels are common across all characters of the same width.
 Black column filter helps analyze characters with specific spacing patterns.
-Use --stats to analyze color usage across all bitmap images.
+Use --stats to analyze color usage across all bitmap images, --colors to list the
+glyphs using specific colors and --compare to compare color usage between folders.
         """
     )
     
@@ -439,7 +483,12 @@ Use --stats to analyze color usage across all bitmap images.
     parser.add_argument('--output', '-o', help='Output union image filename')
     parser.add_argument('--num-black-cols', type=int, help='Filter by number of black columns (exact match)')
     parser.add_argument('--grid', action='store_true', help='Also create comparison grid')
+    parser.add_argument('--method', choices=sorted(CONSENSUS_METHODS), default='union',
+                        help='Consensus image: union (all agree), majority (> half agree) or mode (most frequent color)')
+    parser.add_argument('--heatmap', help='Also save a coverage heatmap (share of glyphs with a non-zero pixel)')
     parser.add_argument('--stats', action='store_true', help='Show color usage statistics across all images')
+    parser.add_argument('--colors', help='Comma-separated color indices to query (with --stats or --compare)')
+    parser.add_argument('--compare', nargs='+', metavar='FOLDER', help='Compare color usage with other bitmap folders')
     parser.add_argument('--debug', action='store_true', help='Enable debug output')
     
     args = parser.parse_args()
@@ -453,9 +502,29 @@ Use --stats to analyze color usage across all bitmap images.
         print(f"Error: '{args.bitmap_folder}' is not a directory")
         sys.exit(1)
     
+    colors = None
+    if args.colors:
+        try:
+            colors = [int(color) for color in args.colors.split(',')]
+        except ValueError:
+            parser.error("--colors must be comma-separated color indices (0-255)")
+        if any(color < 0 or color > 255 for color in colors):
+            parser.error("--colors must be comma-separated color indices (0-255)")
+    
+    # Compare color usage between folders
+    if args.compare:
+        compare_color_statistics([args.bitmap_folder] + args.compare, colors, args.debug)
+        return
+    
     # If user just wants color statistics
     if args.stats:
         analyze_color_statistics(args.bitmap_folder, args.debug)
+        if colors:
+            files, arrays = load_glyph_arrays(args.bitmap_folder)
+            usage = glyphs_using_colors(files, color_histograms(arrays), colors)
+            print(f"\n🔍 Glyphs using colors {colors}: {len(usage)}")
+            for file_name, counts in usage.items():
+                print(f"  {file_name}: " + ", ".join(f"{color}={count}" for color, count in counts.items()))
         return
     
     # For pattern analysis, width is required
@@ -464,7 +533,8 @@ Use --stats to analyze color usage across all bitmap images.
     
     try:
         # Create union image
-        success = analyze_font_patterns(args.bitmap_folder, args.width, args.output, args.num_black_cols, args.debug)
+        success = analyze_font_patterns(args.bitmap_folder, args.width, args.output, args.num_black_cols, args.debug,
+                                        args.method, args.heatmap)
         
         if success and args.grid:
             # Also create comparison grid
@@ -473,7 +543,8 @@ Use --stats to analyze color usage across all bitmap images.
                 base_name = os.path.splitext(args.output)[0]
                 grid_output = f"{base_name}_grid.bmp"
             
-            create_comparison_grid(args.bitmap_folder, args.width, grid_output, args.num_black_cols, args.debug)
+            create_comparison_grid(args.bitmap_folder, args.width, grid_output, args.num_black_cols, args.debug,
+                                   args.method)
         
         if success:
             print(f"\n🎨 Analysis complete! This reveals the design patterns used by")
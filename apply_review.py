@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+Apply a reviewed translation sheet straight to a scene MSG file.
+
+Streams the reviewed XLSX rows (english, hebrew, tested?, comments) with a
+read-only openpyxl iterator, merges the Hebrew column into the scene's
+<id>_messages_hebrew.txt (the n-th row with an English text goes to the n-th
+line with that text), and - only when a line really differs - rebuilds the
+mapping, translated messages and MSG file in-process
+(map_files -> translate_csv -> create_msg without intermediate files).
+
+Usage:
+    python apply_review.py <xlsx_file> <scene_dir> <msg_id> <output_msg> [--max-length 26]
+    python apply_review.py --file-id <drive_id> <scene_dir> <msg_id> <output_msg>
+
+Example:
+    python apply_review.py output/1000_review.xlsx daventry 1000 C:/Games/KQ8/daventry/English/1000.MSG
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+
+from create_msg import write_msg_file
+from map_files import pair_lines, mapping_entries
+from process_messages import write_lines
+from text_normalize import normalize_key, message_sort_key, read_messages_csv
+from translate_csv import parse_mapping, translate_messages
+
+IGNORE_PREFIX = '###IGNORE###'
+
+
+def read_review(xlsx_file_path, sheet_name="Translation"):
+    """
+    Stream reviewed rows from an XLSX sheet.
+
+    Returns:
+        Dictionary of normalized English key -> list of reviewed Hebrew, one per
+        row with that English in sheet order (None where the Hebrew cell is empty)
+    """
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(xlsx_file_path, read_only=True, data_only=True)
+    try:
+        worksheet = workbook[sheet_name] if sheet_name in workbook.sheetnames else workbook.worksheets[0]
+        review = {}
+        rows = worksheet.iter_rows(values_only=True)
+        next(rows, None)  # Skip header row
+        for row in rows:
+            if not row or row[0] is None:
+                continue
+            key = normalize_key(str(row[0]))
+            if not key:
+                continue
+            hebrew = str(row[1]) if len(row) > 1 and row[1] is not None else ''
+            # Keep every row: the same English can have a different Hebrew per context
+            review.setdefault(key, []).append(hebrew if hebrew.strip() else None)
+        return review
+    finally:
+        workbook.close()
+
+
+def merge_review(english_lines, hebrew_lines, review):
+    """
+    Replace Hebrew lines whose reviewed translation differs.
+
+    The n-th line with a given English text takes the n-th sheet row with that
+    text, so repeated English lines keep their own (context-specific) Hebrew.
+
+    Returns:
+        Tuple of (merged Hebrew lines, number of changed lines)
+    """
+    merged = list(hebrew_lines)
+    changed = 0
+    occurrences = {}
+    for i, english in enumerate(english_lines):
+        if i >= len(merged) or not english.strip():
+            continue
+        key = normalize_key(english)
+        occurrence = occurrences.get(key, 0)
+        occurrences[key] = occurrence + 1
+        rows = review.get(key, [])
+        reviewed = rows[occurrence] if occurrence < len(rows) else None
+        if reviewed is not None and reviewed != merged[i]:
+            merged[i] = reviewed
+            changed += 1
+    return merged, changed
+
+
+def read_text_lines(file_path):
+    """Read a text file without newlines"""
+    with open(file_path, 'r', encoding='utf-8') as f:
+        return [line.rstrip('\n\r') for line in f]
+
+
+def apply_review(xlsx_file_path, scene_dir, msg_id, output_msg, max_length=26,
+                 sheet_name="Translation", force=False):
+    """
+    Merge a reviewed sheet into a scene and rebuild its MSG file.
+
+    Returns:
+        Number of changed Hebrew lines (the MSG is rebuilt only if > 0 or force)
+    """
+    english_path = os.path.join(scene_dir, f"{msg_id}_messages_english.txt")
+    hebrew_path = os.path.join(scene_dir, f"{msg_id}_messages_hebrew.txt")
+    csv_path = os.path.join(scene_dir, f"{msg_id}_messages.csv")
+    mapping_path = os.path.join(scene_dir, f"{msg_id}_mapping.txt")
+
+    for path in (english_path, hebrew_path, csv_path):
+        if not os.path.exists(path):
+            print(f"Error: File not found: {path}")
+            sys.exit(1)
+
+    review = read_review(xlsx_file_path, sheet_name)
+    print(f"Read {sum(len(rows) for rows in review.values())} reviewed translations from {xlsx_file_path}")
+
+    english_lines = read_text_lines(english_path)
+    hebrew_lines = read_text_lines(hebrew_path)
+    pairs = pair_lines(english_lines, hebrew_lines, english_path, hebrew_path)
+
+    # Merge along the pairing so misaligned files are handled like map_files does
+    paired_english = [english for english, _ in pairs]
+    paired_hebrew = [hebrew if hebrew is not None else f"{IGNORE_PREFIX} {english}"
+                     for english, hebrew in pairs]
+    merged, changed = merge_review(paired_english, paired_hebrew, review)
+    print(f"Changed {changed} Hebrew lines")
+
+    if not changed and not force:
+        print(f"No changes for {msg_id}, MSG file not rebuilt")
+        return 0
+
+    if changed and len(english_lines) == len(hebrew_lines):
+        write_lines(merged, hebrew_path)
+        print(f"Updated {hebrew_path}")
+    elif changed:
+        # Don't rewrite a misaligned file, check_alignment.py --repair does that
+        print(f"Warning: {hebrew_path} is misaligned, reviewed lines applied to the MSG only")
+
+    # map_files -> translate_csv -> create_msg, all in memory
+    mapping = parse_mapping(f"{english} === {hebrew}"
+                            for english, hebrew in filter(None, mapping_entries(
+                                list(zip(paired_english, merged)), max_length, mapping_path)))
+    _, messages = read_messages_csv(csv_path)
+    messages.sort(key=message_sort_key)
+    translated_count, not_found_count = translate_messages(messages, mapping)
+    print(f"Translated {translated_count} messages ({not_found_count} not found)")
+
+    output_dir = os.path.dirname(output_msg)
+    if output_dir and not os.path.exists(output_dir):
+        os.makedirs(output_dir)
+    write_msg_file(messages, output_msg)
+    return changed
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Apply a reviewed XLSX sheet to a scene MSG file')
+    parser.add_argument('xlsx_file', nargs='?', help='Reviewed XLSX file')
+    parser.add_argument('scene_dir', help='Scene directory (e.g. daventry)')
+    parser.add_argument('msg_id', help='MSG number (e.g. 1000)')
+    parser.add_argument('output_msg', help='Output MSG file')
+    parser.add_argument('--file-id', help='Download the reviewed sheet from Google Drive instead')
+    parser.add_argument('--max-length', type=int, default=26, help='Maximum line length (default: 26)')
+    parser.add_argument('--sheet-name', default='Translation', help='Excel sheet name (default: Translation)')
+    parser.add_argument('--force', action='store_true', help='Rebuild the MSG file even without changes')
+    args = parser.parse_args()
+
+    if bool(args.xlsx_file) == bool(args.file_id):
+        print("Error: Provide either an XLSX file or --file-id")
+        sys.exit(1)
+
+    temp_xlsx = None
+    xlsx_file = args.xlsx_file
+    if args.file_id:
+        from csv_xlsx_drive_v3 import CSVXLSXDriveManager
+        with tempfile.NamedTemporaryFile(suffix='.xlsx', delete=False) as temp_file:
+            temp_xlsx = temp_file.name
+        if not CSVXLSXDriveManager().download_from_drive(args.file_id, temp_xlsx, quiet=True):
+            os.unlink(temp_xlsx)
+            sys.exit(1)
+        xlsx_file = temp_xlsx
+    elif not os.path.exists(xlsx_file):
+        print(f"Error: XLSX file not found: {xlsx_file}")
+        sys.exit(1)
+
+    try:
+        apply_review(xlsx_file, args.scene_dir, args.msg_id, args.output_msg,
+                     args.max_length, args.sheet_name, args.force)
+    finally:
+        if temp_xlsx:
+            os.unlink(temp_xlsx)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Batch extraction/replacement of PBM (PBMP) menu screens.
+
+Scans a game 8Gui directory once and indexes every PBM header (dimensions,
+bit count, data offset and size) into a JSON manifest. Extraction and
+replacement are then driven from the manifest on a thread pool in a single
+process, instead of launching extract_bmp_from_pbm.py / replace_bmp_in_pbm.py
+once per image.
+
+Usage:
+    python batch_pbm.py index <8gui_dir> [--manifest pbm_manifest.json]
+    python batch_pbm.py extract <output_dir> [--manifest pbm_manifest.json] [--workers 4]
+    python batch_pbm.py replace <bmp_dir> [--output-dir <patch_8gui_dir>] [--manifest pbm_manifest.json]
+
+Replacement uses <bmp_dir>/<name>.bmp for <name>.pbm and skips screens that
+have no edited BMP. With --output-dir the original PBM is copied there
+before patching, otherwise it is patched in place.
+
+Example:
+    python batch_pbm.py index C:/Games/KQ8/GAME/8Gui
+    python batch_pbm.py extract gui_bmp
+    python batch_pbm.py replace gui_bmp_hebrew --output-dir patch/GAME/8Gui
+"""
+
+import argparse
+import json
+import os
+import shutil
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+from PIL import Image
+
+from pbm_codec import read_pbm_header, read_pbm, pbm_to_image, patch_pbm_pixels, image_to_pixels
+
+DEFAULT_MANIFEST = 'pbm_manifest.json'
+DEFAULT_WORKERS = 4
+
+
+def index_directory(gui_dir):
+    """
+    Read the header of every PBM file under gui_dir.
+
+    Returns:
+        Manifest dictionary: {'root': gui_dir, 'files': {relative path: header}}
+    """
+    files = {}
+    for dir_path, _, file_names in os.walk(gui_dir):
+        for file_name in sorted(file_names):
+            if not file_name.lower().endswith('.pbm'):
+                continue
+            path = os.path.join(dir_path, file_name)
+            relative_path = os.path.relpath(path, gui_dir).replace(os.sep, '/')
+            try:
+                header = read_pbm_header(path)
+            except ValueError as e:
+                print(f"Warning: Skipping {relative_path}: {e}")
+                continue
+            header['file_size'] = os.path.getsize(path)
+            files[relative_path] = header
+    return {'root': os.path.abspath(gui_dir), 'files': dict(sorted(files.items()))}
+
+
+def load_manifest(manifest_path):
+    """Load a manifest written by the index command"""
+    if not os.path.exists(manifest_path):
+        print(f"Error: Manifest not found: {manifest_path} (run 'batch_pbm.py index' first)")
+        sys.exit(1)
+    with open(manifest_path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_manifest(manifest, manifest_path):
+    """Write the manifest as JSON"""
+    with open(manifest_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+
+
+def bmp_name(relative_path):
+    """BMP file name for a PBM path (main18.pbm -> main18.bmp)"""
+    return os.path.splitext(relative_path)[0] + '.bmp'
+
+
+def extract_one(root, relative_path, output_dir):
+    """Extract one PBM to <output_dir>/<name>.bmp, returns an error message or None"""
+    try:
+        header, pixels = read_pbm(os.path.join(root, relative_path))
+        output_path = os.path.join(output_dir, bmp_name(relative_path))
+        os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
+        pbm_to_image(header, pixels).save(output_path)
+        return None
+    except (OSError, ValueError) as e:
+        return str(e)
+
+
+def replace_one(root, relative_path, expected, bmp_dir, output_dir):
+    """
+    Patch one PBM with <bmp_dir>/<name>.bmp.
+
+    Returns:
+        'skipped' when there's no edited BMP, an error message, or None on success
+    """
+    bmp_path = os.path.join(bmp_dir, bmp_name(relative_path))
+    if not os.path.exists(bmp_path):
+        return 'skipped'
+    try:
+        with Image.open(bmp_path) as img:
+            pixels = image_to_pixels(img)
+        height, width = pixels.shape
+        if (width, height) != (expected['width'], expected['height']):
+            return (f"Dimension mismatch: PBM {expected['width']}x{expected['height']}, "
+                    f"BMP {width}x{height}")
+
+        pbm_path = os.path.join(root, relative_path)
+        if output_dir:
+            target_path = os.path.join(output_dir, relative_path)
+            os.makedirs(os.path.dirname(target_path) or '.', exist_ok=True)
+            shutil.copyfile(pbm_path, target_path)
+            pbm_path = target_path
+        patch_pbm_pixels(pbm_path, pixels)
+        return None
+    except (OSError, ValueError) as e:
+        return str(e)
+
+
+def report(action, relative_paths, results):
+    """Print per-file failures and a summary, returns the number of failures"""
+    done = skipped = failed = 0
+    for relative_path, result in zip(relative_paths, results):
+        if result is None:
+            done += 1
+        elif result == 'skipped':
+            skipped += 1
+        else:
+            failed += 1
+            print(f"Error: {relative_path}: {result}")
+    print(f"{action} {done} files, skipped {skipped}, failed {failed}")
+    return failed
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Batch extract/replace PBM menu screens')
+    parser.add_argument('--manifest', default=DEFAULT_MANIFEST,
+                        help=f'Manifest file (default: {DEFAULT_MANIFEST})')
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS,
+                        help=f'Number of parallel workers (default: {DEFAULT_WORKERS})')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    index_parser = subparsers.add_parser('index', help='Index every PBM header in an 8Gui directory')
+    index_parser.add_argument('gui_dir', help='Game 8Gui directory')
+
+    extract_parser = subparsers.add_parser('extract', help='Extract every indexed PBM to BMP')
+    extract_parser.add_argument('output_dir', help='Directory for the extracted BMP files')
+
+    replace_parser = subparsers.add_parser('replace', help='Replace indexed PBMs with edited BMPs')
+    replace_parser.add_argument('bmp_dir', help='Directory with the edited BMP files')
+    replace_parser.add_argument('--output-dir', help='Copy PBMs here before patching (default: patch in place)')
+
+    args = parser.parse_args()
+
+    if args.command == 'index':
+        if not os.path.isdir(args.gui_dir):
+            print(f"Error: Directory not found: {args.gui_dir}")
+            sys.exit(1)
+        manifest = index_directory(args.gui_dir)
+        save_manifest(manifest, args.manifest)
+        print(f"Indexed {len(manifest['files'])} PBM files into {args.manifest}")
+        for relative_path, header in manifest['files'].items():
+            print(f"  {relative_path}: {header['width']}x{header['height']}, "
+                  f"{header['bit_count']} bit, data at {header['data_offset']}")
+        return
+
+    manifest = load_manifest(args.manifest)
+    root = manifest['root']
+    relative_paths = list(manifest['files'])
+
+    with ThreadPoolExecutor(max_workers=args.workers) as pool:
+        if args.command == 'extract':
+            results = list(pool.map(lambda path: extract_one(root, path, args.output_dir), relative_paths))
+            failed = report('Extracted', relative_paths, results)
+        else:
+            if not os.path.isdir(args.bmp_dir):
+                print(f"Error: Directory not found: {args.bmp_dir}")
+                sys.exit(1)
+            results = list(pool.map(
+                lambda path: replace_one(root, path, manifest['files'][path], args.bmp_dir, args.output_dir),
+                relative_paths))
+            failed = report('Replaced', relative_paths, results)
+
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
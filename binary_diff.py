@@ -0,0 +1,299 @@
+#!/usr/bin/env python3
+"""
+Structural diff of KQ8 .pft fonts and .msg message files
+
+Both files are walked with the layouts of binary_schema.py, then compared
+region by region: a whole region (a bitmap, the glyph array, the message
+headers) that is equal in both files is skipped with one memoryview
+comparison, and only differing regions are drilled into, down to the fields.
+Every differing field is reported by name, e.g.
+
+    0x0242  0x0242  bitmaps[1].footer.mipmap_count: 1 -> 0
+
+Files of different layout (other counts, sizes) are still compared field by
+field: each file is walked with its own offsets.
+
+--at OFFSET names the field at an offset in both files and shows the bytes
+around it (replaces compare_offset.py / find_offset_242.py).
+
+Usage:
+    python binary_diff.py <first> <second> [--json diff.json] [--workers 4]
+    python binary_diff.py <first> [<second>] --at 0x242
+
+first/second are two files, or two folders whose .pft/.msg files are
+compared by relative path (e.g. the original and the patched GAME folder).
+The exit code is 1 if any file differs.
+"""
+
+import argparse
+import json
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from binary_schema import walk, field_at, join_path, layout_for, CString, Record, LAYOUTS
+
+DEFAULT_WORKERS = 4
+
+# Bytes shown on each side of an offset with --at
+CONTEXT_BYTES = 8
+
+
+def display(value):
+    """Field value for reports and JSON: printable tags as text, other bytes as hex"""
+    if isinstance(value, bytes):
+        if all(32 <= b < 127 for b in value):
+            return value.decode('ascii')
+        return value.hex(' ')
+    return value
+
+
+def _field(path, a_offset, b_offset, a_value, b_value):
+    return {'field': path, 'offset_a': a_offset, 'offset_b': b_offset,
+            'a': display(a_value), 'b': display(b_value)}
+
+
+def _diff_bytes(path, a, b, view_a, view_b, differences):
+    """Raw regions: count the differing bytes"""
+    size = min(a.size, b.size)
+    bytes_a = np.frombuffer(view_a[a.offset:a.offset + size], dtype=np.uint8)
+    bytes_b = np.frombuffer(view_b[b.offset:b.offset + size], dtype=np.uint8)
+    changed = np.flatnonzero(bytes_a != bytes_b)
+    difference = _field(path, a.offset, b.offset, f'{a.size} bytes', f'{b.size} bytes')
+    difference['changed_bytes'] = int(len(changed)) + abs(a.size - b.size)
+    difference['first_change'] = int(changed[0]) if len(changed) else size
+    differences.append(difference)
+
+
+def _diff_values(path, a, b, differences):
+    """Decoded regions: compare field by field"""
+    node = a.node
+    if isinstance(node, Record):
+        for field, (start, _), a_value, b_value in zip(node.fields, node.offsets, a.values, b.values):
+            if a_value != b_value:
+                differences.append(_field(join_path(path, field), a.offset + start, b.offset + start,
+                                          a_value, b_value))
+    elif isinstance(node, CString):
+        differences.append(_field(path, a.offset, b.offset,
+                                  a.values[0].decode('cp1255', errors='replace'),
+                                  b.values[0].decode('cp1255', errors='replace')))
+    else:
+        # Bulk scalar array
+        size = node.item_size
+        for i in range(max(len(a.values), len(b.values))):
+            a_value = a.values[i] if i < len(a.values) else None
+            b_value = b.values[i] if i < len(b.values) else None
+            if a_value != b_value:
+                differences.append(_field(join_path(path, f'[{i}]'),
+                                          a.offset + i * size if a_value is not None else None,
+                                          b.offset + i * size if b_value is not None else None,
+                                          a_value, b_value))
+
+
+def diff_regions(a, b, view_a, view_b, path='', differences=None):
+    """
+    Differing fields of two region trees.
+
+    Equal regions are skipped with one memoryview comparison; only regions
+    that differ are compared child by child.
+
+    Args:
+        a, b: Regions of the same layout node (from binary_schema.walk)
+        view_a, view_b: memoryviews of the two files
+        path: Field path of the regions
+
+    Returns:
+        List of difference dictionaries (field, offset_a, offset_b, a, b;
+        raw regions also changed_bytes and first_change)
+    """
+    if differences is None:
+        differences = []
+    if a.size == b.size and view_a[a.offset:a.end] == view_b[b.offset:b.end]:
+        return differences
+
+    if a.children is not None and b.children is not None:
+        b_children = {child.name: child for child in b.children}
+        a_names = set()
+        for child in a.children:
+            a_names.add(child.name)
+            other = b_children.get(child.name)
+            if other is None:
+                differences.append(_field(join_path(path, child.name), child.offset, None,
+                                          f'{child.size} bytes', None))
+            else:
+                diff_regions(child, other, view_a, view_b, join_path(path, child.name), differences)
+        for child in b.children:
+            if child.name not in a_names:
+                differences.append(_field(join_path(path, child.name), None, child.offset,
+                                          None, f'{child.size} bytes'))
+    elif a.node is not None and a.node is b.node and a.values is not None and b.values is not None:
+        _diff_values(path, a, b, differences)
+    else:
+        _diff_bytes(path, a, b, view_a, view_b, differences)
+    return differences
+
+
+def read_layout(filename, layout=None):
+    """File contents and region tree"""
+    layout = layout or layout_for(filename)
+    if layout is None:
+        raise ValueError(f"Unknown file type (expected {', '.join(LAYOUTS)})")
+    with open(filename, 'rb') as f:
+        data = f.read()
+    return data, walk(layout, data)
+
+
+def diff_files(first, second, layout=None):
+    """
+    Compare two files of the same format.
+
+    Returns:
+        Result dictionary: first, second, differences (or error for unreadable files)
+    """
+    try:
+        data_a, root_a = read_layout(first, layout)
+        data_b, root_b = read_layout(second, layout or layout_for(first))
+    except (OSError, ValueError) as e:
+        return {'first': first, 'second': second, 'differences': [], 'error': str(e)}
+    differences = diff_regions(root_a, root_b, memoryview(data_a), memoryview(data_b))
+    return {'first': first, 'second': second, 'differences': differences}
+
+
+def file_pairs(first_dir, second_dir):
+    """
+    .pft/.msg files of two folders, matched by relative path (case-insensitive).
+
+    Returns:
+        List of (first, second) pairs; files missing on one side have None there
+    """
+    def collect(root):
+        files = {}
+        for dir_path, _, file_names in os.walk(root):
+            for name in file_names:
+                if os.path.splitext(name)[1].lower() in LAYOUTS:
+                    path = os.path.join(dir_path, name)
+                    files[os.path.relpath(path, root).lower()] = path
+        return files
+
+    first_files, second_files = collect(first_dir), collect(second_dir)
+    return [(first_files.get(key), second_files.get(key)) for key in sorted(set(first_files) | set(second_files))]
+
+
+def diff_sources(first, second, layout=None, max_workers=DEFAULT_WORKERS):
+    """
+    Compare two files, or all .pft/.msg files of two folders.
+
+    Returns:
+        List of result dictionaries (see diff_files)
+    """
+    if not os.path.isdir(first):
+        return [diff_files(first, second, layout)]
+
+    pairs = file_pairs(first, second)
+    results = [{'first': a, 'second': b, 'differences': [], 'error': 'missing file'}
+               for a, b in pairs if a is None or b is None]
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        results.extend(pool.map(lambda pair: diff_files(*pair, layout), [pair for pair in pairs if None not in pair]))
+    return results
+
+
+def print_results(results):
+    """Print the differences of all compared files"""
+    for result in results:
+        differences = result['differences']
+        if 'error' not in result and not differences:
+            continue
+        print(f"\n{result['first']} vs {result['second']}:")
+        if 'error' in result:
+            print(f"  Error: {result['error']}")
+            continue
+        for difference in differences:
+            offset_a, offset_b = (f'0x{offset:04X}' if offset is not None else '-' * 6
+                                  for offset in (difference['offset_a'], difference['offset_b']))
+            line = f"  {offset_a}  {offset_b}  {difference['field']}: {difference['a']} -> {difference['b']}"
+            if 'changed_bytes' in difference:
+                line += f" ({difference['changed_bytes']} bytes differ, first at +{difference['first_change']})"
+            print(line)
+        print(f"  {len(differences)} differences")
+
+    changed = [result for result in results if result['differences'] or 'error' in result]
+    print(f"\nResults: {len(results) - len(changed)}/{len(results)} files identical")
+
+
+def show_offset(filenames, offset, layout=None):
+    """Name the field at an offset of one or two files and show the bytes around it"""
+    print(f"Offset 0x{offset:X} ({offset})")
+    print("=" * 50)
+    values = []
+    for filename in filenames:
+        data, root = read_layout(filename, layout)
+        start = max(offset - CONTEXT_BYTES, 0)
+        window = data[start:offset + CONTEXT_BYTES]
+        print(f"{filename}:")
+        print(f"  0x{start:X}: {window.hex(' ').upper()}")
+        print(f"  {' ' * len(f'0x{start:X}: ')}{'   ' * (offset - start)}^")
+        location = field_at(root, offset)
+        if location is None:
+            print("  Past the end of the file")
+        else:
+            path, field_offset, field_size = location
+            print(f"  Field: {path} (0x{field_offset:X}-0x{field_offset + field_size - 1:X}, "
+                  f"byte {offset - field_offset})")
+        values.append(data[offset:offset + 1])
+
+    if len(values) == 2:
+        if values[0] != values[1]:
+            print(f"\n*** DIFFERENCE at 0x{offset:X}: {values[0].hex().upper() or '--'} != {values[1].hex().upper() or '--'} ***")
+        else:
+            print(f"\nBytes match at 0x{offset:X}: {values[0].hex().upper()}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Structural diff of KQ8 .pft and .msg files')
+    parser.add_argument('first', help='First file, or folder with .pft/.msg files')
+    parser.add_argument('second', nargs='?', help='Second file or folder')
+    parser.add_argument('--at', type=lambda value: int(value, 0), metavar='OFFSET',
+                        help='Show the field at this offset (e.g. 0x242) instead of diffing')
+    parser.add_argument('--format', choices=['pft', 'msg'], help='File format (default: by extension)')
+    parser.add_argument('--json', help='Write the differences to this JSON file')
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS,
+                        help=f'Number of parallel workers (default: {DEFAULT_WORKERS})')
+    args = parser.parse_args()
+
+    if args.second is None and args.at is None:
+        parser.error("Give a second file or folder, or --at OFFSET")
+    sources = [args.first] + ([args.second] if args.second else [])
+    for source in sources:
+        if not os.path.exists(source):
+            print(f"Error: '{source}' not found")
+            sys.exit(1)
+    layout = LAYOUTS[f'.{args.format}'] if args.format else None
+
+    if args.at is not None:
+        try:
+            show_offset(sources, args.at, layout)
+        except (OSError, ValueError) as e:
+            print(f"Error: {e}")
+            sys.exit(1)
+        return
+
+    if os.path.isdir(args.first) != os.path.isdir(args.second):
+        print("Error: Compare two files or two folders")
+        sys.exit(1)
+
+    results = diff_sources(args.first, args.second, layout, args.workers)
+    print_results(results)
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+        print(f"Wrote differences to {args.json}")
+
+    if any(result['differences'] or 'error' in result for result in results):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
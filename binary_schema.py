@@ -0,0 +1,438 @@
+#!/usr/bin/env python3
+"""
+Declarative layouts of the KQ8 binary files (.pft fonts, .msg messages)
+
+A layout is a tree of nodes:
+- Record: fixed-size fields decoded by one precompiled struct
+- Array: count elements (count taken from an earlier field), either a bulk
+  scalar format ('h', 'I'), fixed-size Records or variable-size nodes
+- Bytes: raw region (pixel data), sized from earlier fields and the data, or
+  the rest of the file
+- CString: null-terminated string
+- Group: nodes in file order
+
+walk() follows a layout over the bytes of a file and returns a tree of
+Regions (name, offset, size, decoded values, children). Files that end early
+get a '<truncated>' region, bytes past the layout a '<trailing>' region.
+
+Reader, writer and offset tracer all come from the same layout:
+- read() decodes a file into nested values (dicts per Record/Group, lists
+  per Array, zero-copy memoryviews for Bytes); read_tree() also returns the
+  region tree, e.g. for layout_end()
+- write() packs the same nested values back into bytes
+- walk() over write()'s output with layout_fields() lists every field offset
+  of a file before it is written (debug_font_offset.py)
+"""
+
+import os
+import struct
+from collections import ChainMap
+
+TRUNCATED = '<truncated>'
+TRAILING = '<trailing>'
+
+# Process-wide cache: (format, count) -> struct.Struct of a bulk scalar array
+_bulk_structs = {}
+
+
+class Record:
+    """Fixed-size record: named fields decoded by one precompiled struct"""
+
+    def __init__(self, name, fields):
+        """
+        Args:
+            name: Record name
+            fields: List of (field name, struct format) in file order, little-endian
+        """
+        self.name = name
+        self.fields = [field for field, _ in fields]
+        self.struct = struct.Struct('<' + ''.join(fmt for _, fmt in fields))
+        self.size = self.struct.size
+        # Offset and size of every field inside the record
+        self.offsets = []
+        position = 0
+        for _, fmt in fields:
+            size = struct.calcsize('<' + fmt)
+            self.offsets.append((position, size))
+            position += size
+
+
+class Array:
+    """count elements of one item; the count is the value of an earlier field"""
+
+    def __init__(self, name, item, count):
+        """
+        Args:
+            name: Array name
+            item: Scalar struct format (decoded in bulk), Record, or any other node
+            count: Name of the field holding the element count
+        """
+        self.name = name
+        self.item = item
+        self.count = count
+        if isinstance(item, str):
+            self.item_size = struct.calcsize('<' + item)
+
+
+class Bytes:
+    """Raw region; size(values, data, offset) gives its length, None means the rest of the file"""
+
+    def __init__(self, name, size=None):
+        self.name = name
+        self.size = size
+
+
+class CString:
+    """Null-terminated string (terminator included in the region)"""
+
+    def __init__(self, name):
+        self.name = name
+
+
+class Group:
+    """Nodes in file order"""
+
+    def __init__(self, name, items):
+        self.name = name
+        self.items = items
+
+
+class Region:
+    """Part of a file that a layout node covers"""
+
+    __slots__ = ('name', 'offset', 'size', 'node', 'values', 'children')
+
+    def __init__(self, name, offset, size, node=None, values=None, children=None):
+        self.name = name
+        self.offset = offset
+        self.size = size
+        self.node = node
+        self.values = values
+        self.children = children
+
+    @property
+    def end(self):
+        return self.offset + self.size
+
+
+class _Truncated(Exception):
+    """The file ends inside a node"""
+
+
+def aligned_width(width):
+    """PBMP rows are stored 4-byte aligned"""
+    return ((width + 3) // 4) * 4
+
+
+def mipmap_sizes(width, height):
+    """
+    (height, width) of the mipmap levels of a bitmap: the base level, then
+    every level halved in both directions until one side reaches 0
+    """
+    while width > 0 and height > 0:
+        yield height, width
+        width, height = width >> 1, height >> 1
+
+
+def pixel_data_size(values, data, offset):
+    """
+    Size of the pixel data of a PBMP bitmap: the base level and the mipmap
+    levels stored after it. The levels end 4 bytes before the 'DETL' tag, so
+    the first level boundary followed by it ends the data (the base level
+    alone for most fonts).
+    """
+    height, width = values['height'], aligned_width(values['width_raw'])
+    size = 0
+    for level_height, level_width in mipmap_sizes(width, height):
+        size += level_height * level_width
+        if data[offset + size + 4:offset + size + 8] == b'DETL':
+            return size
+    return height * width
+
+
+def _need(data, offset, size):
+    if size < 0 or offset + size > len(data):
+        raise _Truncated(offset)
+
+
+def _bulk_struct(fmt, count):
+    """Precompiled struct for count scalars of one format"""
+    key = (fmt, count)
+    if key not in _bulk_structs:
+        _bulk_structs[key] = struct.Struct(f'<{count}{fmt}')
+    return _bulk_structs[key]
+
+
+def _walk(node, name, data, offset, scope, siblings):
+    """Append the region of one node to siblings and return its end offset"""
+    if isinstance(node, Record):
+        _need(data, offset, node.size)
+        values = node.struct.unpack_from(data, offset)
+        scope.update(zip(node.fields, values))
+        siblings.append(Region(name, offset, node.size, node, values))
+        return offset + node.size
+
+    if isinstance(node, Bytes):
+        size = len(data) - offset if node.size is None else node.size(scope, data, offset)
+        _need(data, offset, size)
+        siblings.append(Region(name, offset, size, node))
+        return offset + size
+
+    if isinstance(node, CString):
+        end = data.find(b'\0', offset)
+        if end < 0:
+            raise _Truncated(offset)
+        siblings.append(Region(name, offset, end + 1 - offset, node, (bytes(data[offset:end]),)))
+        return end + 1
+
+    if isinstance(node, Array):
+        count = max(scope[node.count], 0)
+        if isinstance(node.item, str):
+            size = count * node.item_size
+            _need(data, offset, size)
+            values = _bulk_struct(node.item, count).unpack_from(data, offset)
+            siblings.append(Region(name, offset, size, node, values))
+            return offset + size
+        if isinstance(node.item, Record):
+            item = node.item
+            size = count * item.size
+            _need(data, offset, size)
+            children = [Region(f'[{i}]', offset + i * item.size, item.size, item, values)
+                        for i, values in enumerate(item.struct.iter_unpack(data[offset:offset + size]))]
+            siblings.append(Region(name, offset, size, node, children=children))
+            return offset + size
+        items = [(f'[{i}]', node.item) for i in range(count)]
+    else:
+        # Fields of a group are visible to its later items only
+        items = [(item.name, item) for item in node.items]
+        scope = scope.new_child()
+
+    # Group or array of variable-size items: spans to the end of the file until walked
+    region = Region(name, offset, len(data) - offset, node, children=[])
+    siblings.append(region)
+    end = offset
+    for child_name, child in items:
+        end = _walk(child, child_name, data, end, scope, region.children)
+    region.size = end - offset
+    return end
+
+
+def walk(layout, data):
+    """
+    Region tree of a file.
+
+    Args:
+        layout: Group of a file format (PFT_LAYOUT, MSG_LAYOUT)
+        data: File contents (bytes)
+
+    Returns:
+        Root Region; its children end with '<truncated>' or '<trailing>' regions
+        when the file is shorter or longer than the layout
+    """
+    root = Region(layout.name, 0, len(data), layout, children=[])
+    scope = ChainMap()
+    end = 0
+    try:
+        for item in layout.items:
+            end = _walk(item, item.name, data, end, scope, root.children)
+    except _Truncated as e:
+        # Keep what was walked, the rest of the file is one raw region
+        offset = e.args[0]
+        root.children.append(Region(TRUNCATED, offset, len(data) - offset))
+        return root
+    if end < len(data):
+        root.children.append(Region(TRAILING, end, len(data) - end))
+    return root
+
+
+def values_of(region, view):
+    """Nested values of a region (see read)"""
+    node = region.node
+    if isinstance(node, Record):
+        return dict(zip(node.fields, region.values))
+    if isinstance(node, CString):
+        return region.values[0]
+    if isinstance(node, Bytes) or node is None:
+        return view[region.offset:region.end]
+    if isinstance(node, Array) and isinstance(node.item, str):
+        return list(region.values)
+    if isinstance(node, Array):
+        return [values_of(child, view) for child in region.children]
+    return {child.name: values_of(child, view) for child in region.children}
+
+
+def layout_end(root):
+    """End offset of the layout in a walked file (before any trailing bytes)"""
+    if root.children and root.children[-1].name == TRAILING:
+        return root.children[-1].offset
+    return root.end
+
+
+def read(layout, data):
+    """
+    Decode a file into nested values.
+
+    Records and Groups become dicts by field/item name, Arrays lists, Bytes
+    memoryviews into data (no copy) and CStrings bytes. Bytes past the end of
+    the layout are ignored.
+
+    Raises:
+        ValueError: The file ends inside the layout
+    """
+    return read_tree(layout, data)[0]
+
+
+def read_tree(layout, data):
+    """
+    Decode a file like read, also returning the region tree it was walked into.
+
+    Returns:
+        Tuple of (nested values, root Region)
+
+    Raises:
+        ValueError: The file ends inside the layout
+    """
+    root = walk(layout, data)
+    if root.children and root.children[-1].name == TRUNCATED:
+        offset = root.children[-1].offset
+        raise ValueError(f"Truncated {layout.name} file: {len(data)} bytes, "
+                         f"data from 0x{offset:X} does not fit the layout")
+    view = memoryview(data)
+    return {child.name: values_of(child, view) for child in root.children if child.name != TRAILING}, root
+
+
+def _pack(node, value):
+    if isinstance(node, Record):
+        return node.struct.pack(*(value[field] for field in node.fields))
+    if isinstance(node, Bytes):
+        return bytes(value)
+    if isinstance(node, CString):
+        return bytes(value) + b'\0'
+    if isinstance(node, Array) and isinstance(node.item, str):
+        return _bulk_struct(node.item, len(value)).pack(*value)
+    if isinstance(node, Array):
+        return b''.join(_pack(node.item, item) for item in value)
+    return b''.join(_pack(item, value[item.name]) for item in node.items)
+
+
+def write(layout, values):
+    """
+    Encode nested values (as returned by read) into the bytes of a file.
+
+    Array lengths are taken from the values; the count fields have to match them.
+    """
+    return _pack(layout, values)
+
+
+def layout_fields(region, path=''):
+    """
+    Fields of a region tree in file order.
+
+    Records are listed field by field; scalar arrays, arrays of records and
+    raw regions as one entry each.
+
+    Yields:
+        Tuples of (field path, offset, size)
+    """
+    node = region.node
+    if isinstance(node, Record):
+        for field, (start, size) in zip(node.fields, node.offsets):
+            yield join_path(path, field), region.offset + start, size
+    elif region.children is None or (isinstance(node, Array) and isinstance(node.item, Record)):
+        yield path, region.offset, region.size
+    else:
+        for child in region.children:
+            yield from layout_fields(child, join_path(path, child.name))
+
+
+def field_at(root, offset):
+    """
+    Deepest named field of a region tree that contains a file offset.
+
+    Returns:
+        Tuple of (field path, field offset, field size), or None past the end of the file
+    """
+    if not root.offset <= offset < root.end:
+        return None
+    path, region = '', root
+    while True:
+        if region.children:
+            child = next((child for child in region.children if child.offset <= offset < child.end), None)
+            if child is None:
+                break
+            path = join_path(path, child.name)
+            region = child
+            continue
+        node = region.node
+        if isinstance(node, Record):
+            for field, (start, size) in zip(node.fields, node.offsets):
+                if start <= offset - region.offset < start + size:
+                    return join_path(path, field), region.offset + start, size
+        elif isinstance(node, Array) and isinstance(node.item, str):
+            index = (offset - region.offset) // node.item_size
+            return join_path(path, f'[{index}]'), region.offset + index * node.item_size, node.item_size
+        break
+    return path, region.offset, region.size
+
+
+def join_path(path, name):
+    """Field path: 'bitmaps[3].header.height'"""
+    if not path or name.startswith('['):
+        return path + name
+    return f'{path}.{name}'
+
+
+PFT_LAYOUT = Group('pft', [
+    Record('header', [('block_tag', '4s'), ('block_data', 'I'), ('class_version', 'I')]),
+    Record('font_info', [
+        ('font_flags', 'I'), ('text_flags', 'I'), ('glyph_count', 'i'), ('char_height', 'i'),
+        ('char_width', 'i'), ('text_color', 'I'), ('back_color', 'I'), ('baseline', 'i'),
+        ('text_h_scale', 'I'), ('text_v_scale', 'I'), ('char_h_space', 'i'),
+    ]),
+    Record('character_mapping', [('char_count', 'h'), ('char_first', 'h')]),
+    Array('char_glyph', 'h', 'char_count'),
+    Array('glyph_array', Record('glyph', [
+        ('bitmap_index', 'B'), ('bitmap_left', 'B'), ('bitmap_top', 'B'), ('width', 'B'),
+        ('height', 'B'), ('baseline_shift', 'B'), ('spare_bytes', '2s'),
+    ]), 'glyph_count'),
+    Record('bitmap_array', [
+        ('pbma_tag', '4s'), ('pbma_unknown', 'I'), ('pbma_head', 'I'),
+        ('bitmap_header1', 'I'), ('bitmap_header2', 'I'), ('bitmap_count', 'I'),
+    ]),
+    Record('rmap', [('rmap_tag', '4s'), ('rmap_unknown', 'I')]),
+    Array('rmap_reserved', 'I', 'bitmap_count'),
+    Array('bitmaps', Group('bitmap', [
+        Record('header', [
+            ('pbmp_tag', '4s'), ('pbmp_unknown', 'I'), ('pbmp_head', 'I'), ('bitmap_chunks_raw', 'I'),
+            ('bitmap_version_raw', 'I'), ('width_raw', 'I'), ('height', 'I'), ('bit_count', 'I'),
+            ('flags', 'I'), ('data_tag', '4s'),
+        ]),
+        Bytes('pixels', pixel_data_size),
+        Record('footer', [
+            ('bitmap_footer_unknown', '4s'), ('detl_tag', '4s'), ('mipmap_count', 'I'),
+            ('detl_footer_unknown', '4s'),
+        ]),
+    ]), 'bitmap_count'),
+    Record('palette', [('has_palette', 'I')]),
+])
+
+MSG_LAYOUT = Group('msg', [
+    Record('header', [
+        ('res_type', 'B'), ('header_size', 'B'), ('sci_version', 'I'),
+        ('data_size', 'H'), ('last_id', 'H'), ('count', 'H'),
+    ]),
+    Array('messages', Record('message', [
+        ('noun', 'B'), ('verb', 'B'), ('case', 'B'), ('sequence', 'B'), ('talker', 'B'),
+        ('text_offset', 'H'), ('ref_noun', 'B'), ('ref_verb', 'B'), ('ref_case', 'B'), ('ref_sequence', 'B'),
+    ]), 'count'),
+    Array('texts', CString('text'), 'count'),
+    # Developer comments (ignored by the game)
+    Bytes('comments'),
+])
+
+LAYOUTS = {'.pft': PFT_LAYOUT, '.msg': MSG_LAYOUT}
+
+
+def layout_for(filename):
+    """Layout of a file by its extension (None if unknown)"""
+    return LAYOUTS.get(os.path.splitext(filename)[1].lower())
@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+"""
+Alignment checker for <scene>_messages_english.txt / <scene>_messages_hebrew.txt
+
+Lines are aligned with a Myers diff (O((N+M)*D), linear for a bounded number
+of edits). Blank lines are the "case" separators written by process_messages
+and only ever match each other, so they act as anchors. Text lines match when
+their length ratio is close to the file-wide English -> Hebrew ratio.
+
+Reports the exact line offsets of Hebrew insertions and deletions and can
+optionally repair the Hebrew file:
+- a missing Hebrew line is filled with ###IGNORE### <english> (map_files skips
+  it, so translate_csv keeps the English text)
+- an extra Hebrew text line is merged into the previous Hebrew line
+- an extra Hebrew blank line is dropped
+
+Usage: python check_alignment.py <english_file> <hebrew_file> [--repair] [--output <file>]
+"""
+
+import argparse
+import json
+import os
+import sys
+
+IGNORE_PREFIX = '###IGNORE###'
+
+# Lines shorter than this are too short for a meaningful length ratio
+MIN_RATIO_LENGTH = 12
+# Allowed deviation (as a factor) from the file-wide length ratio
+RATIO_TOLERANCE = 3.0
+# Give up after this many edits (keeps the checker linear on real files)
+DEFAULT_MAX_EDITS = 500
+
+
+def read_lines(file_path):
+    """Read all lines from a file without newlines"""
+    with open(file_path, 'r', encoding='utf-8-sig') as f:
+        return [line.rstrip('\n\r') for line in f]
+
+
+def length_ratio(english_lines, hebrew_lines):
+    """File-wide Hebrew/English length ratio over non-blank lines"""
+    english_chars = sum(len(line.strip()) for line in english_lines)
+    hebrew_chars = sum(len(line.strip()) for line in hebrew_lines
+                       if not line.startswith(IGNORE_PREFIX))
+    if english_chars == 0 or hebrew_chars == 0:
+        return 1.0
+    return hebrew_chars / english_chars
+
+
+def make_matcher(ratio, tolerance=RATIO_TOLERANCE):
+    """Build the line equality predicate used by the diff"""
+    low = 1.0 / tolerance
+
+    def lines_match(english, hebrew):
+        english = english.strip()
+        hebrew = hebrew.strip()
+        # Case separators only match each other
+        if not english or not hebrew:
+            return not english and not hebrew
+        if hebrew.startswith(IGNORE_PREFIX):
+            return True
+        if len(english) < MIN_RATIO_LENGTH or len(hebrew) < MIN_RATIO_LENGTH:
+            return True
+        line_ratio = len(hebrew) / (len(english) * ratio)
+        return low <= line_ratio <= tolerance
+
+    return lines_match
+
+
+def myers_diff(a, b, eq, max_edits=None):
+    """
+    Myers O((N+M)*D) diff of sequences a and b under predicate eq.
+
+    Returns:
+        List of (op, a_index, b_index) with op in 'equal', 'delete', 'insert',
+        or None if more than max_edits edits are needed
+    """
+    n, m = len(a), len(b)
+    max_d = n + m if max_edits is None else min(max_edits, n + m)
+    offset = max_d + 1
+    v = [0] * (2 * max_d + 3)
+    trace = []
+
+    for d in range(max_d + 1):
+        for k in range(-d, d + 1, 2):
+            if k == -d or (k != d and v[offset + k - 1] < v[offset + k + 1]):
+                x = v[offset + k + 1]
+            else:
+                x = v[offset + k - 1] + 1
+            y = x - k
+            while x < n and y < m and eq(a[x], b[y]):
+                x += 1
+                y += 1
+            v[offset + k] = x
+            if x >= n and y >= m:
+                trace.append(v[offset - d:offset + d + 1])
+                return _backtrack(trace, n, m)
+        # Only the diagonals reachable in d edits are kept (O(D^2) memory)
+        trace.append(v[offset - d:offset + d + 1])
+
+    return None
+
+
+def _backtrack(trace, n, m):
+    """Recover the edit script from the saved V arrays"""
+    ops = []
+    x, y = n, m
+    for d in range(len(trace) - 1, 0, -1):
+        prev = trace[d - 1]
+        k = x - y
+        if k == -d or (k != d and prev[k - 1 + d - 1] < prev[k + 1 + d - 1]):
+            prev_k = k + 1
+        else:
+            prev_k = k - 1
+        prev_x = prev[prev_k + d - 1]
+        prev_y = prev_x - prev_k
+        while x > prev_x and y > prev_y:
+            x -= 1
+            y -= 1
+            ops.append(('equal', x, y))
+        if prev_k == k + 1:
+            ops.append(('insert', None, prev_y))
+        else:
+            ops.append(('delete', prev_x, None))
+        x, y = prev_x, prev_y
+    while x > 0 and y > 0:
+        x -= 1
+        y -= 1
+        ops.append(('equal', x, y))
+    ops.reverse()
+    return ops
+
+
+def align(english_lines, hebrew_lines, max_edits=DEFAULT_MAX_EDITS):
+    """
+    Align English and Hebrew lines.
+
+    Returns:
+        Dictionary with:
+        - aligned: True when no insertions/deletions were found
+        - ops: edit script from myers_diff (None if max_edits was exceeded)
+        - insertions: list of {'hebrew_line', 'english_line', 'text'} (1-based)
+        - deletions: list of {'english_line', 'hebrew_line', 'text'} (1-based)
+        - ratio: file-wide Hebrew/English length ratio
+    """
+    ratio = length_ratio(english_lines, hebrew_lines)
+    ops = myers_diff(english_lines, hebrew_lines, make_matcher(ratio), max_edits)
+
+    result = {
+        'aligned': False,
+        'ops': ops,
+        'insertions': [],
+        'deletions': [],
+        'ratio': ratio,
+        'english_count': len(english_lines),
+        'hebrew_count': len(hebrew_lines),
+    }
+    if ops is None:
+        return result
+
+    # Track the current position in the other file for reporting offsets
+    i = j = 0
+    for op, a_index, b_index in ops:
+        if op == 'equal':
+            i, j = a_index + 1, b_index + 1
+        elif op == 'insert':
+            result['insertions'].append({
+                'hebrew_line': b_index + 1,
+                'english_line': i + 1,
+                'text': hebrew_lines[b_index],
+            })
+            j = b_index + 1
+        else:
+            result['deletions'].append({
+                'english_line': a_index + 1,
+                'hebrew_line': j + 1,
+                'text': english_lines[a_index],
+            })
+            i = a_index + 1
+
+    result['aligned'] = not result['insertions'] and not result['deletions']
+    return result
+
+
+def aligned_pairs(english_lines, hebrew_lines, result):
+    """
+    Yield (english, hebrew) pairs from an alignment result.
+    English lines without a Hebrew counterpart get None.
+    """
+    for op, a_index, b_index in result['ops']:
+        if op == 'equal':
+            yield english_lines[a_index], hebrew_lines[b_index]
+        elif op == 'delete':
+            yield english_lines[a_index], None
+
+
+def repair(english_lines, hebrew_lines, result):
+    """
+    Build a repaired Hebrew line list with the same length as the English file.
+    """
+    repaired = []
+    for op, a_index, b_index in result['ops']:
+        if op == 'equal':
+            repaired.append(hebrew_lines[b_index])
+        elif op == 'delete':
+            english = english_lines[a_index]
+            repaired.append(f"{IGNORE_PREFIX} {english}" if english.strip() else '')
+        else:
+            extra = hebrew_lines[b_index].strip()
+            # Extra text is most likely a translation split over two lines
+            if extra and repaired and repaired[-1].strip():
+                repaired[-1] = f"{repaired[-1].rstrip()} {extra}"
+    return repaired
+
+
+def print_report(result, english_path, hebrew_path):
+    """Print a human readable alignment report"""
+    print(f"English: {english_path} ({result['english_count']} lines)")
+    print(f"Hebrew:  {hebrew_path} ({result['hebrew_count']} lines)")
+    print(f"Length ratio: {result['ratio']:.2f}")
+
+    if result['ops'] is None:
+        print("Error: Files differ too much to align (max edits exceeded)")
+        return
+
+    for item in result['deletions']:
+        print(f"  Missing in Hebrew: english line {item['english_line']} "
+              f"(before hebrew line {item['hebrew_line']}): '{item['text'][:50]}'")
+    for item in result['insertions']:
+        print(f"  Extra in Hebrew:   hebrew line {item['hebrew_line']} "
+              f"(before english line {item['english_line']}): '{item['text'][:50]}'")
+
+    if result['aligned']:
+        print("Files are aligned")
+    else:
+        print(f"Found {len(result['deletions'])} missing and "
+              f"{len(result['insertions'])} extra Hebrew lines")
+
+
+def main():
+    """Main function to handle command line arguments"""
+    parser = argparse.ArgumentParser(description='Check alignment of English and Hebrew message files')
+    parser.add_argument('english_file', help='Path to the English text file')
+    parser.add_argument('hebrew_file', help='Path to the Hebrew text file')
+    parser.add_argument('--repair', action='store_true', help='Write a repaired Hebrew file')
+    parser.add_argument('--output', help='Repaired file path (default: overwrite hebrew_file)')
+    parser.add_argument('--max-edits', type=int, default=DEFAULT_MAX_EDITS,
+                        help=f'Maximum number of edits before giving up (default: {DEFAULT_MAX_EDITS})')
+    parser.add_argument('--json', action='store_true', help='Print the result as JSON')
+    args = parser.parse_args()
+
+    for path in (args.english_file, args.hebrew_file):
+        if not os.path.exists(path):
+            print(f"Error: Input file does not exist: {path}")
+            sys.exit(1)
+
+    english_lines = read_lines(args.english_file)
+    hebrew_lines = read_lines(args.hebrew_file)
+    result = align(english_lines, hebrew_lines, args.max_edits)
+
+    if args.json:
+        report = {key: value for key, value in result.items() if key != 'ops'}
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+    else:
+        print_report(result, args.english_file, args.hebrew_file)
+
+    if result['ops'] is None:
+        sys.exit(2)
+
+    if args.repair and not result['aligned']:
+        output_path = args.output or args.hebrew_file
+        with open(output_path, 'w', encoding='utf-8') as f:
+            for line in repair(english_lines, hebrew_lines, result):
+                f.write(line + '\n')
+        print(f"Repaired Hebrew file written to: {output_path}")
+        sys.exit(0)
+
+    sys.exit(0 if result['aligned'] else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,115 +1,263 @@
 #!/usr/bin/env python3
 """
 Convert a 24-bit RGB image to 8-bit indexed color using a specific palette file
+
+The nearest palette color is looked up in a 32x32x32 RGB cube built once per
+palette: every cell keeps the palette entries that can be nearest to some
+color inside it, and each pixel is checked exactly against its cell's
+entries, so a whole image is mapped with vectorized indexing. --dither
+applies Floyd-Steinberg error diffusion with NumPy over all rows at once.
+Several palettes can be given to convert one (resized) image for every
+scene at once.
 """
 
 from PIL import Image
+import os
 import sys
 import numpy as np
 
-def load_palette(palette_file):
-    """Load palette from .pal file"""
-    with open(palette_file, 'r') as f:
-        lines = f.readlines()
-    
-    # Skip header lines (JASC-PAL format)
-    if lines[0].strip() == 'JASC-PAL':
-        start_line = 3
-    else:
-        start_line = 0
-    
-    palette = []
-    for line in lines[start_line:]:
-        line = line.strip()
-        if line:
-            parts = line.split()
-            if len(parts) >= 3:
-                r, g, b = int(parts[0]), int(parts[1]), int(parts[2])
-                palette.extend([r, g, b])
-    
-    # Ensure palette has exactly 768 values (256 colors * 3 RGB)
-    while len(palette) < 768:
-        palette.extend([0, 0, 0])
-    
-    return palette[:768]
-
-def convert_to_palette(input_image, output_image, palette_file):
-    """Convert 24-bit image to 8-bit using specific palette"""
-    
+from palette import load_palette
+
+# Bits per channel of the lookup cube (32x32x32)
+LUT_BITS = 5
+
+# Pixels per chunk of the candidate distance computation (keeps memory bounded)
+NEAREST_CHUNK = 65536
+
+# Lookup cubes already built in this process: palette bytes -> candidates
+_lut_cache = {}
+
+
+def _axis_distances(levels, values):
+    """
+    Squared distances along one axis from every cell [low, low + step) to
+    every palette value: the nearest and the farthest point of the cell.
+    """
+    low = levels[:, None]
+    high = low + (1 << (8 - LUT_BITS)) - 1
+    near = np.where(values < low, low - values, np.where(values > high, values - high, 0))
+    far = np.maximum(values - low, high - values)
+    return near * near, far * far
+
+
+def build_lut(palette):
+    """
+    Build (or reuse) the RGB lookup cube of a palette.
+
+    An entry can only be the nearest color of some point in a cell if its
+    distance to the nearest point of the cell does not exceed the smallest
+    distance any entry has to the farthest point of the cell. Those
+    candidates are kept per cell, in palette order (so ties go to the lowest
+    index, like a full argmin). The rest of a row holds entries that are
+    farther than some candidate from every color of the cell, so searching
+    a whole row finds the same index.
+
+    Returns:
+        Tuple of ((32*32*32, K) uint8 array of candidate indices per cell,
+        the first count of them valid; (32*32*32,) array of counts), both
+        indexed by (r >> 3) << 10 | (g >> 3) << 5 | (b >> 3)
+    """
+    lut = _lut_cache.get(palette.palette_bytes)
+    if lut is None:
+        levels = np.arange(1 << LUT_BITS, dtype=np.int32) << (8 - LUT_BITS)
+        rgb = palette.rgb.astype(np.int32)
+        (near_r, far_r), (near_g, far_g), (near_b, far_b) = (_axis_distances(levels, rgb[:, axis])
+                                                             for axis in range(3))
+        near = (near_r[:, None, None] + near_g[None, :, None] + near_b[None, None, :]).reshape(-1, len(rgb))
+        far = (far_r[:, None, None] + far_g[None, :, None] + far_b[None, None, :]).reshape(-1, len(rgb))
+        candidates = near <= far.min(axis=1, keepdims=True)
+        counts = candidates.sum(axis=1)
+        # Candidates first, each group in palette order
+        order = np.argsort(~candidates, axis=1, kind='stable')[:, :counts.max()]
+        lut = (order.astype(np.uint8), counts)
+        _lut_cache[palette.palette_bytes] = lut
+    return lut
+
+
+def lut_index(pixels):
+    """Cube index of uint8 RGB pixels (..., 3)"""
+    shift = 8 - LUT_BITS
+    pixels = pixels.astype(np.intp)
+    return ((pixels[..., 0] >> shift) << (2 * LUT_BITS)) | ((pixels[..., 1] >> shift) << LUT_BITS) | (pixels[..., 2] >> shift)
+
+
+def nearest_indices(colors, palette):
+    """
+    Nearest palette index of each color (smallest squared RGB distance).
+
+    Args:
+        colors: (..., 3) uint8 array of RGB colors
+        palette: Decoded Palette
+
+    Returns:
+        (...) uint8 array of palette indices
+    """
+    lut, counts = build_lut(palette)
+    rgb = palette.rgb.astype(np.int32)
+
+    # Images repeat colors a lot: search each distinct color once
+    flat = colors.reshape(-1, 3).astype(np.int32)
+    packed, inverse = np.unique((flat[:, 0] << 16) | (flat[:, 1] << 8) | flat[:, 2], return_inverse=True)
+    unique_colors = np.stack([packed >> 16, (packed >> 8) & 0xFF, packed & 0xFF], axis=1)
+    cells = lut_index(unique_colors)
+    cell_counts = counts[cells]
+
+    unique_indices = np.empty(len(packed), dtype=np.uint8)
+    # Cells with the same number of candidates are searched together
+    for count in np.unique(cell_counts):
+        selected = np.flatnonzero(cell_counts == count)
+        for start in range(0, len(selected), NEAREST_CHUNK):
+            chunk = selected[start:start + NEAREST_CHUNK]
+            candidates = lut[cells[chunk], :count]
+            difference = rgb[candidates] - unique_colors[chunk, None, :]
+            best = (difference * difference).sum(axis=2).argmin(axis=1)
+            unique_indices[chunk] = candidates[np.arange(len(chunk)), best]
+    return unique_indices[inverse].reshape(colors.shape[:-1])
+
+
+def dither_floyd_steinberg(pixels, palette):
+    """
+    Floyd-Steinberg dithering.
+
+    A pixel only depends on its left neighbour and the three pixels above
+    it, so every row can advance together, two pixels behind the row above:
+    each step quantizes the pixels with the same x + 2y at once and spreads
+    their errors with NumPy.
+
+    Args:
+        pixels: (height, width, 3) uint8 array
+        palette: Decoded Palette
+
+    Returns:
+        (height, width) uint8 array of palette indices
+    """
+    height, width = pixels.shape[:2]
+    # One padding column on each side and a padding row below take the
+    # errors pushed out of the image; pixels are addressed by flat position
+    stride = width + 2
+    work = np.zeros((height + 1, stride, 3), dtype=np.float32)
+    work[:height, 1:width + 1] = pixels
+    work = work.reshape(-1, 3)
+    indices = np.empty(height * width, dtype=np.uint8)
+    lut, counts = build_lut(palette)
+    rgb = palette.rgb.astype(np.int32)
+    rows = np.arange(height)
+
+    for step in range(width + 2 * (height - 1)):
+        ys = rows[max(0, (step - width + 2) // 2):min(height - 1, step // 2) + 1]
+        xs = step - 2 * ys
+        position = ys * stride + xs + 1
+        values = work[position]
+        colors = np.clip(values + 0.5, 0, 255).astype(np.int32)
+        # The candidates of every cell of the step (see build_lut)
+        cells = lut_index(colors)
+        candidates = lut[cells, :counts[cells].max()]
+        difference = rgb[candidates] - colors[:, None, :]
+        step_indices = candidates[np.arange(len(ys)), (difference * difference).sum(axis=2).argmin(axis=1)]
+        indices[ys * width + xs] = step_indices
+        error = values - rgb[step_indices]
+        # 7/16 right, 3/16 below-left, 5/16 below, 1/16 below-right
+        work[position + 1] += error * 0.4375
+        work[position + stride - 1] += error * 0.1875
+        work[position + stride] += error * 0.3125
+        work[position + stride + 1] += error * 0.0625
+
+    return indices.reshape(height, width)
+
+
+def quantize_array(pixels, palette, dither=False):
+    """
+    Map RGB pixels to palette indices.
+
+    Args:
+        pixels: (height, width, 3) uint8 array
+        palette: Decoded Palette
+        dither: Apply Floyd-Steinberg dithering
+
+    Returns:
+        (height, width) uint8 array of palette indices
+    """
+    if dither:
+        return dither_floyd_steinberg(pixels, palette)
+    return nearest_indices(pixels, palette)
+
+
+def convert_to_palette(input_image, output_image, palette_file, dither=False):
+    """
+    Convert 24-bit image to 8-bit using specific palette
+
+    Args:
+        input_image: Path to the input image (or a PIL image)
+        output_image: Path to the output PNG
+        palette_file: Palette file (.pal or .ppl)
+        dither: Apply Floyd-Steinberg dithering
+    """
     # Load the palette
-    palette_data = load_palette(palette_file)
+    palette = load_palette(palette_file)
     print(f"Loaded palette from {palette_file}")
-    
-    # Convert palette to numpy array for faster processing
-    palette_rgb = np.array(palette_data).reshape(256, 3)
-    
+
     # Open the input image
-    img = Image.open(input_image)
-    
+    img = input_image if isinstance(input_image, Image.Image) else Image.open(input_image)
+
     # Convert to RGB if needed
     if img.mode != 'RGB':
         img = img.convert('RGB')
-    
+
     print(f"Input image: {img.size[0]}x{img.size[1]}, mode: {img.mode}")
-    
+
     # Get pixel data
-    pixels = np.array(img)
-    height, width = pixels.shape[:2]
-    
-    print("Converting pixels to palette indices (this may take a moment)...")
-    
-    # Reshape pixels to (height*width, 3) for vectorized distance calculation
-    pixels_flat = pixels.reshape(-1, 3).astype(np.float32)
-    
-    # Use PIL's built-in quantize with custom palette for much faster conversion
-    # Create a palette image
-    palette_img = Image.new('P', (1, 1))
-    palette_img.putpalette(palette_data)
-    
-    # Convert the image to use this palette
-    output_img = img.quantize(palette=palette_img, dither=0)
-    
+    pixels = np.asarray(img)
+
+    print("Converting pixels to palette indices...")
+    indices = quantize_array(pixels, palette, dither)
+
+    # Wrap the index array without copying it
+    output_img = Image.frombuffer('P', img.size, indices, 'raw', 'P', 0, 1)
+    output_img.putpalette(palette.palette_bytes)
+
     print(f"Conversion complete!")
-    
+
     # Save as PNG
     output_img.save(output_image, 'PNG')
     print(f"Saved 8-bit indexed PNG to {output_image}")
 
 if __name__ == "__main__":
     import argparse
-    
+
     parser = argparse.ArgumentParser(description='Convert 24-bit RGB image to 8-bit indexed color using a specific palette')
     parser.add_argument('input_image', help='Input 24-bit image')
-    parser.add_argument('output_image', help='Output 8-bit PNG')
-    parser.add_argument('palette_file', help='Palette file (.pal)')
+    parser.add_argument('output_image', help='Output 8-bit PNG (with several palettes: <name>_<palette>.png)')
+    parser.add_argument('palette_file', nargs='+', help='Palette file(s) (.pal or .ppl)')
     parser.add_argument('--width', type=int, help='Resize to this width (optional)')
     parser.add_argument('--height', type=int, help='Resize to this height (optional)')
-    
+    parser.add_argument('--dither', action='store_true', help='Apply Floyd-Steinberg dithering')
+
     args = parser.parse_args()
-    
+
     # Load and optionally resize before converting
     img = Image.open(args.input_image)
-    
+
     if args.width or args.height:
         original_size = img.size
         new_width = args.width if args.width else img.size[0]
         new_height = args.height if args.height else img.size[1]
-        
+
         print(f"Resizing from {original_size[0]}x{original_size[1]} to {new_width}x{new_height}")
         img = img.resize((new_width, new_height), Image.Resampling.LANCZOS)
-        
-        # Save resized image temporarily
-        temp_file = "temp_resized.png"
-        img.save(temp_file)
-        input_to_convert = temp_file
-    else:
-        input_to_convert = args.input_image
-    
-    convert_to_palette(input_to_convert, args.output_image, args.palette_file)
-    
-    # Clean up temp file if it was created
-    if args.width or args.height:
-        import os
-        os.remove(temp_file)
-    
+
+    img = img.convert('RGB')
+
+    for palette_file in args.palette_file:
+        if not os.path.exists(palette_file):
+            print(f"Error: Palette file not found: {palette_file}")
+            sys.exit(1)
+
+        output_image = args.output_image
+        if len(args.palette_file) > 1:
+            base_name, ext = os.path.splitext(args.output_image)
+            palette_name = os.path.splitext(os.path.basename(palette_file))[0]
+            output_image = f"{base_name}_{palette_name}{ext or '.png'}"
+
+        convert_to_palette(img, output_image, palette_file, args.dither)
+
     print("Done!")
@@ -7,109 +7,34 @@ Converts indexed BMP files to RGB PNG files using a palette file
 import sys
 import os
 import struct
+from concurrent.futures import ThreadPoolExecutor
 from PIL import Image
 import json
 
+from palette import load_palette, grayscale_palette
+
+DEFAULT_WORKERS = 4
+
 def load_palette_from_file(palette_file, debug=False):
     """
     Load palette data from a file. Supports multiple formats:
+    - .ppl files (KQ8 palette)
     - .pal files (JASC-PAL format or raw text)
     - .act files (Adobe Color Table)
     - .json files (custom JSON format)
     - .bin files (raw RGB data)
-    """
-    ext = os.path.splitext(palette_file)[1].lower()
     
-    if ext == '.pal':
-        # Try different .pal formats
-        with open(palette_file, 'r') as f:
-            lines = f.readlines()
-            lines = [line.strip() for line in lines if line.strip()]  # Remove empty lines
-            
-            if len(lines) == 0:
-                raise ValueError("Empty palette file")
-            
-            # Check for JASC-PAL format
-            if lines[0] == 'JASC-PAL':
-                if len(lines) < 3:
-                    raise ValueError("Invalid JASC-PAL file: missing header")
-                version = lines[1]
-                color_count = int(lines[2])
-                
-                palette = []
-                for i in range(3, min(3 + color_count, len(lines))):
-                    try:
-                        r, g, b = map(int, lines[i].split())
-                        palette.extend([r, g, b])
-                    except ValueError:
-                        if debug:
-                            print(f"Warning: Invalid color line {i}: '{lines[i]}'")
-                        palette.extend([0, 0, 0])  # Default to black
-                
-                # Pad to 256 colors if needed
-                while len(palette) < 768:  # 256 * 3
-                    palette.extend([0, 0, 0])
-                
-                return palette
-            
-            else:
-                # Try raw RGB text format (3 numbers per line or 3 columns)
-                if debug:
-                    print("Trying raw RGB text format...")
-                palette = []
-                
-                for line in lines:
-                    parts = line.split()
-                    if len(parts) >= 3:
-                        try:
-                            r, g, b = map(int, parts[:3])
-                            palette.extend([r, g, b])
-                        except ValueError:
-                            if debug:
-                                print(f"Warning: Invalid RGB line: '{line}'")
-                            continue
-                
-                if len(palette) == 0:
-                    raise ValueError("No valid RGB values found in palette file")
-                
-                # Pad to 256 colors if needed
-                while len(palette) < 768:
-                    palette.extend([0, 0, 0])
-                
-                if debug:
-                    print(f"Loaded {len(palette)//3} colors from raw RGB format")
-                return palette
-    
-    elif ext == '.act':
-        # Adobe Color Table format (768 bytes = 256 colors × 3 RGB)
-        with open(palette_file, 'rb') as f:
-            palette_data = f.read(768)
-            return list(palette_data)
-    
-    elif ext == '.json':
-        # Custom JSON format: {"palette": [[r,g,b], [r,g,b], ...]}
-        with open(palette_file, 'r') as f:
-            data = json.load(f)
-            palette = []
-            for color in data['palette']:
-                palette.extend(color[:3])  # Take only RGB, ignore alpha if present
-            return palette
-    
-    elif ext == '.bin':
-        # Raw binary RGB data
-        with open(palette_file, 'rb') as f:
-            palette_data = f.read()
-            return list(palette_data)
-    
-    else:
-        raise ValueError(f"Unsupported palette format: {ext}")
+    Returns:
+        768 palette bytes (decoded once per file, see palette.load_palette)
+    """
+    palette = load_palette(palette_file)
+    if debug:
+        print(f"Loaded {len(palette)} colors from {palette_file}")
+    return palette.palette_bytes
 
 def create_default_grayscale_palette():
     """Create a default 256-color grayscale palette"""
-    palette = []
-    for i in range(256):
-        palette.extend([i, i, i])  # R, G, B all the same for grayscale
-    return palette
+    return grayscale_palette().palette_bytes
 
 def extract_palette_from_font(font_file, debug=False):
     """
@@ -147,6 +72,12 @@ def extract_palette_from_font(font_file, debug=False):
             print(f"Error checking font palette: {e}")
         return None
 
+def palette_to_bytes(palette):
+    """768 palette bytes from a list/bytes palette, or grayscale for None"""
+    if palette is None:
+        return create_default_grayscale_palette()
+    return bytes(palette[:768])  # Ensure exactly 768 bytes (256 colors * 3 RGB)
+
 def convert_bmp_to_png(bmp_file, output_file, palette=None, debug=False):
     """
     Convert indexed BMP file to RGB PNG using palette
@@ -154,48 +85,37 @@ def convert_bmp_to_png(bmp_file, output_file, palette=None, debug=False):
     Args:
         bmp_file: Path to input BMP file
         output_file: Path to output PNG file  
-        palette: List of RGB values [r1,g1,b1,r2,g2,b2,...] or None for grayscale
+        palette: RGB values [r1,g1,b1,r2,g2,b2,...] (list or bytes) or None for grayscale
         debug: Whether to print debug information
     """
     # Load BMP file
-    img = Image.open(bmp_file)
+    with Image.open(bmp_file) as img:
+        if debug:
+            print(f"Input image: {img.size[0]}x{img.size[1]}, mode: {img.mode}")
+        
+        # Raw palette indices (remain as-is)
+        if img.mode not in ('P', 'L'):
+            img = img.convert('L')
+        size = img.size
+        indices = img.tobytes()
     
     if debug:
-        print(f"Input image: {img.size[0]}x{img.size[1]}, mode: {img.mode}")
-    
-    # Convert to mode 'L' (8-bit grayscale) if not already
-    #if img.mode != 'L':
-    #    img = img.convert('L')
-    
-    # Get pixel data as indices
-    
-    width, height = img.size
-    
-    if palette is None:
-        # Use default grayscale palette
-        palette = create_default_grayscale_palette()
-        if debug:
+        if palette is None:
             print("Using default grayscale palette")
-    else:
-        if debug:
+        else:
             print(f"Using custom palette with {len(palette)//3} colors")
     
-    # Create palette mode image ('P')
-    palette_img = Image.new('P', (width, height))
-    
-    # Set the palette data as bytes
-    palette_bytes = bytes(palette[:768])  # Ensure exactly 768 bytes (256 colors * 3 RGB)
-    palette_img.putpalette(palette_bytes)
-    
-    # Set the pixel data (indices remain as-is)
-    palette_img.putdata(img.getdata())
+    # Create palette mode image ('P') directly on the index bytes
+    palette_img = Image.frombuffer('P', size, indices, 'raw', 'P', 0, 1)
+    palette_img.putpalette(palette_to_bytes(palette))
 
     # Save as PNG with palette
     palette_img.save(output_file, 'PNG')
     if debug:
         print(f"Converted {bmp_file} -> {output_file} (palette mode)")
 
-def convert_folder(input_folder, output_folder, palette_file=None, font_file=None, debug=False):
+def convert_folder(input_folder, output_folder, palette_file=None, font_file=None, debug=False,
+                   max_workers=DEFAULT_WORKERS):
     """
     Convert all BMP files in a folder to PNG files
     
@@ -205,6 +125,7 @@ def convert_folder(input_folder, output_folder, palette_file=None, font_file=Non
         palette_file: Path to palette file (optional)
         font_file: Path to font file to extract palette from (optional)
         debug: Whether to print debug information
+        max_workers: Number of files converted in parallel
     """
     # Load palette if provided
     palette = None
@@ -230,6 +151,9 @@ def convert_folder(input_folder, output_folder, palette_file=None, font_file=Non
                 print(f"Error loading palette: {e}")
                 print("Using default grayscale palette")
     
+    # Convert the palette once for all files
+    palette_bytes = palette_to_bytes(palette)
+    
     # Create output folder if it doesn't exist
     os.makedirs(output_folder, exist_ok=True)
     
@@ -244,17 +168,20 @@ def convert_folder(input_folder, output_folder, palette_file=None, font_file=Non
     if debug:
         print(f"Found {len(bmp_files)} BMP files to convert")
     
-    # Convert each BMP file
-    for bmp_file in sorted(bmp_files):
+    def convert_one(bmp_file):
         input_path = os.path.join(input_folder, bmp_file)
         output_name = os.path.splitext(bmp_file)[0] + '.png'
         output_path = os.path.join(output_folder, output_name)
         
         try:
-            convert_bmp_to_png(input_path, output_path, palette, debug)
+            convert_bmp_to_png(input_path, output_path, palette_bytes, debug)
         except Exception as e:
             if debug:
                 print(f"Error converting {bmp_file}: {e}")
+    
+    # Convert the BMP files on a thread pool (decode/encode release the GIL)
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        list(pool.map(convert_one, sorted(bmp_files)))
 
 def create_sample_palette_files(debug=False):
     """Create sample palette files for testing"""
@@ -372,6 +299,7 @@ def main():
         print("    python convert_bmp_to_png.py samples [debug]")
         print("")
         print("Supported palette formats:")
+        print("  .ppl  - KQ8 palette")
         print("  .pal  - JASC-PAL format")
         print("  .act  - Adobe Color Table")  
         print("  .json - Custom JSON format")
@@ -9,54 +9,48 @@ import sys
 import os
 import json
 import glob
+import hashlib
+import numpy as np
 from PIL import Image
 
-def create_font_file(metadata_filename, bitmaps_folder, output_filename, debug=False):
+from binary_schema import PFT_LAYOUT, write, aligned_width
+
+def load_bitmaps(bitmaps_folder, pattern="bitmap_*.bmp", debug=False):
     """
-    Create a KQ8 font file from metadata and bitmap BMPs
+    Load the bitmaps of a font folder (bitmap_XXX.bmp), sorted by index
     
-    Args:
-        metadata_filename: Path to the JSON metadata file
-        bitmaps_folder: Path to folder containing bitmap BMP files
-        output_filename: Path to output font file
-        debug: Whether to print debug information
+    Returns:
+        List of dicts with index, width, height and data (8-bit pixel bytes)
     """
-    
-    # Load metadata
-    with open(metadata_filename, 'r') as meta_file:
-        metadata = json.load(meta_file)
-    
-    if debug:
-        print(f"Loaded metadata from: {metadata_filename}")
-
     # Scan bitmaps folder for BMP files
-    bitmap_files = glob.glob(os.path.join(bitmaps_folder, "bitmap_*.bmp"))
+    bitmap_files = glob.glob(os.path.join(bitmaps_folder, pattern))
     bitmap_files.sort()  # Sort to ensure consistent order
     
     # Extract bitmap indices from filenames and create mapping
+    extension = os.path.splitext(pattern)[1]
     bitmap_data_list = []
     for bitmap_file in bitmap_files:
         filename = os.path.basename(bitmap_file)
         # Extract index from "bitmap_XXX.bmp"
-        if filename.startswith("bitmap_") and filename.endswith(".bmp"):
-            index_str = filename[7:-4]  # Remove "bitmap_" and ".bmp"
+        if filename.startswith("bitmap_") and filename.endswith(extension):
+            index_str = filename[7:-len(extension)]  # Remove "bitmap_" and ".bmp"
             try:
                 index = int(index_str)
                 
                 # Load bitmap image
-                img = Image.open(bitmap_file)
-                if img.mode != 'L':
-                    img = img.convert('L')  # Convert to grayscale if needed
-                
-                bitmap_data = {
-                    'index': index,
-                    'width': img.width,
-                    'height': img.height,
-                    'data': list(img.getdata())  # Get pixel data as list
-                }
+                with Image.open(bitmap_file) as img:
+                    if img.mode != 'L':
+                        img = img.convert('L')  # Convert to grayscale if needed
+                    
+                    bitmap_data = {
+                        'index': index,
+                        'width': img.width,
+                        'height': img.height,
+                        'data': img.tobytes()  # Pixel data, row by row
+                    }
                 bitmap_data_list.append(bitmap_data)
                 if debug:
-                    print(f"Loaded bitmap {index}: {img.width}x{img.height} from {bitmap_file}")
+                    print(f"Loaded bitmap {index}: {bitmap_data['width']}x{bitmap_data['height']} from {bitmap_file}")
                 
             except ValueError:
                 if debug:
@@ -64,6 +58,232 @@ def create_font_file(metadata_filename, bitmaps_folder, output_filename, debug=F
     
     # Sort bitmaps by index
     bitmap_data_list.sort(key=lambda x: x['index'])
+    return bitmap_data_list
+
+def encoding_pixel_count(width, height):
+    """Leading pixels holding the dimension encoding: (0,0), and (1,0) when width * height > 255"""
+    return 2 if width * height > 255 else 1
+
+def downsample(stack, skip=0):
+    """
+    Next mipmap level of a (..., height, width) stack of palette indices:
+    the most common index of every 2x2 block, the top-left one on a tie (an
+    odd last row/column is dropped). Indices are not averaged, that would
+    pick unrelated palette entries.
+    
+    Args:
+        stack: (..., height, width) uint8 array
+        skip: Leading pixels left out of the vote (the dimension encoding)
+    """
+    height, width = stack.shape[-2] >> 1, stack.shape[-1] >> 1
+    blocks = stack[..., :height * 2, :width * 2].reshape(stack.shape[:-2] + (height, 2, width, 2))
+    # (..., height, width, 4): top-left, top-right, bottom-left, bottom-right
+    blocks = blocks.swapaxes(-3, -2).reshape(stack.shape[:-2] + (height, width, 4))
+    valid = np.ones((height, width, 4), dtype=bool)
+    valid[0, 0, :skip] = False
+    votes = ((blocks[..., :, None] == blocks[..., None, :]) & valid[:, :, None, :]).sum(axis=-1)
+    votes = np.where(valid, votes, -1)
+    return np.take_along_axis(blocks, votes.argmax(axis=-1)[..., None], axis=-1)[..., 0]
+
+def mipmap_stack(stack, level_count):
+    """Mipmap levels of a (..., height, width) stack, base level first (see downsample)"""
+    levels = [stack]
+    skip = encoding_pixel_count(stack.shape[-1], stack.shape[-2])
+    while len(levels) < level_count and min(levels[-1].shape[-2:]) >= 2:
+        levels.append(downsample(levels[-1], skip if len(levels) == 1 else 0))
+    return levels
+
+def stored_mipmaps(header, bitmap):
+    """
+    Mipmap levels saved by parse_font.py for a bitmap (bytes after the base
+    level), or None when there are none or the base bitmap was edited
+    """
+    if 'mipmap_data' not in header:
+        return None
+    if hashlib.md5(bitmap['data']).hexdigest() != header.get('base_md5'):
+        return None
+    return bytes.fromhex(header['mipmap_data'])
+
+def pixel_data(bitmap_data_list, level_counts, stored_levels=None):
+    """
+    Pixel data of every bitmap: the base level followed by its mipmap levels
+    
+    Stored levels of unchanged bitmaps are copied as they are, so unmodified
+    fonts round-trip; all other levels are generated from the (edited) base
+    bitmaps, so they always match it. Bitmaps of the same size are filtered
+    as one stack.
+    
+    Args:
+        bitmap_data_list: Bitmaps from load_bitmaps
+        level_counts: Number of levels (base included) to store for every bitmap
+        stored_levels: Optional list of stored mipmap bytes (or None) per bitmap
+    
+    Returns:
+        List of bytes, one per bitmap
+    """
+    data = [bitmap['data'] for bitmap in bitmap_data_list]
+    groups = {}
+    for i, (bitmap, level_count) in enumerate(zip(bitmap_data_list, level_counts)):
+        if stored_levels and stored_levels[i] is not None:
+            data[i] += stored_levels[i]
+        elif level_count > 1:
+            groups.setdefault((bitmap['height'], bitmap['width'], level_count), []).append(i)
+    
+    for (height, width, level_count), members in groups.items():
+        stack = np.frombuffer(b''.join(data[i] for i in members), dtype=np.uint8).reshape(-1, height, width)
+        levels = mipmap_stack(stack, level_count)
+        for j, i in enumerate(members):
+            data[i] = b''.join(level[j].tobytes() for level in levels)
+    return data
+
+def font_values(metadata, bitmap_data_list):
+    """
+    Font values for binary_schema.write(PFT_LAYOUT, ...) from metadata and bitmaps
+    
+    Glyph widths and bitmap widths come from the actual bitmaps; bitmaps
+    without saved headers get default PBMP headers. Mipmap levels are
+    copied from the metadata for unchanged bitmaps and regenerated from the
+    edited ones (as many as the original stored, see mipmap_levels).
+    
+    Args:
+        metadata: Font metadata (from parse_font.py's <font>_metadata.json)
+        bitmap_data_list: Bitmaps from load_bitmaps
+    """
+    # Width of every bitmap, to use the actual bitmap width in the glyph array
+    bitmap_widths = {}
+    for bitmap in bitmap_data_list:
+        bitmap_widths.setdefault(bitmap['index'], bitmap['width'])
+    
+    glyph_array = []
+    for glyph in metadata['glyph_array']:
+        # Write the spare bytes (if available, otherwise write zeros)
+        spare_bytes = glyph.get('spare_bytes', [])
+        glyph_array.append({
+            'bitmap_index': glyph['bitmap_index'],
+            'bitmap_left': glyph['bitmap_left'],
+            'bitmap_top': glyph['bitmap_top'],
+            'width': bitmap_widths.get(glyph['bitmap_index'], glyph['width']),  # Use actual bitmap width instead of metadata
+            'height': glyph['height'],
+            'baseline_shift': glyph['baseline_shift'],
+            'spare_bytes': bytes(spare_bytes) if len(spare_bytes) == 2 else b'\x00\x00'  # Default spare bytes
+        })
+    
+    # Reserved entries for each bitmap, 0 for new bitmaps
+    original_reserved = metadata['bitmap_array']['rmap_reserved']
+    rmap_reserved = [original_reserved[i] if i < len(original_reserved) else 0 for i in range(len(bitmap_data_list))]
+    
+    bitmaps = []
+    bitmap_headers = metadata['bitmap_array'].get('bitmap_headers', [])
+    # Metadata from before mipmap decoding has no level counts: base level only
+    level_counts = [bitmap_headers[i].get('mipmap_levels', 1) if i < len(bitmap_headers) else 1
+                    for i in range(len(bitmap_data_list))]
+    stored_levels = [stored_mipmaps(bitmap_headers[i], bitmap) if i < len(bitmap_headers) else None
+                     for i, bitmap in enumerate(bitmap_data_list)]
+    pixels = pixel_data(bitmap_data_list, level_counts, stored_levels)
+    for i, bitmap in enumerate(bitmap_data_list):
+        # Use saved header data if available, otherwise use defaults
+        if i < len(bitmap_headers):
+            header = bitmap_headers[i]
+            pbmp = {
+                'pbmp_tag': header['pbmp_tag'].encode('ascii'),
+                'pbmp_unknown': header['pbmp_unknown'],
+                'pbmp_head': header['pbmp_head'],
+                'bitmap_chunks_raw': header['bitmap_chunks_raw'],
+                'bitmap_version_raw': header['bitmap_version_raw'],
+                'width_raw': bitmap['width'],  # Use calculated width
+                'height': header['height'],
+                'bit_count': header['bit_count'],
+                'flags': header['flags'],
+                'data_tag': header['data_tag'].encode('ascii')
+            }
+            footer = {
+                'bitmap_footer_unknown': bytes(header['bitmap_footer_unknown']),
+                'detl_tag': header['detl_tag'].encode('ascii'),
+                'mipmap_count': header['mipmap_count'],
+                'detl_footer_unknown': bytes(header['detl_footer_unknown'])
+            }
+        else:
+            # Fallback to defaults for new bitmaps
+            pbmp = {
+                'pbmp_tag': b'PBMP',
+                'pbmp_unknown': 0,
+                'pbmp_head': 0,
+                'bitmap_chunks_raw': metadata['bitmap_array']['chunks'] & 0x00FFFFFF,
+                'bitmap_version_raw': metadata['bitmap_array']['version'] & 0xFF,
+                'width_raw': aligned_width(bitmap['width']),
+                'height': bitmap['height'],
+                'bit_count': 8,
+                'flags': 0,
+                'data_tag': b'data'
+            }
+            footer = {
+                'bitmap_footer_unknown': bytes(4),
+                'detl_tag': b'DETL',
+                'mipmap_count': 4,
+                'detl_footer_unknown': bytes(4)
+            }
+        bitmaps.append({'header': pbmp, 'pixels': pixels[i], 'footer': footer})
+    
+    return {
+        'header': {
+            'block_tag': metadata['header']['block_tag'].encode('ascii'),
+            'block_data': 0,  # Set from the file size by create_font_file
+            'class_version': metadata['header']['class_version']
+        },
+        'font_info': metadata['font_info'],
+        'character_mapping': metadata['character_mapping'],
+        'char_glyph': metadata['character_mapping']['char_glyph'],
+        'glyph_array': glyph_array,
+        'bitmap_array': {
+            'pbma_tag': metadata['bitmap_array']['pbma_tag'].encode('ascii'),
+            'pbma_unknown': metadata['bitmap_array']['pbma_unknown'],
+            'pbma_head': metadata['bitmap_array']['pbma_head'],
+            'bitmap_header1': metadata['bitmap_array']['bitmap_header1'],  # Full 32-bit values
+            'bitmap_header2': metadata['bitmap_array']['bitmap_header2'],
+            'bitmap_count': len(bitmap_data_list)
+        },
+        'rmap': {
+            'rmap_tag': metadata['bitmap_array']['rmap_tag'].encode('ascii'),
+            'rmap_unknown': metadata['bitmap_array']['rmap_unknown']
+        },
+        'rmap_reserved': rmap_reserved,
+        'bitmaps': bitmaps,
+        'palette': metadata['palette']
+    }
+
+def font_bytes(metadata, bitmap_data_list):
+    """
+    Contents of a font file, written with the PFT layout of binary_schema.py
+    (the same one parse_font.py reads with)
+    """
+    data = bytearray(write(PFT_LAYOUT, font_values(metadata, bitmap_data_list)))
+    
+    # Block size is the file size minus the 8 bytes of tag and block size
+    actual_block_size = len(data) - 8
+    block_data = (actual_block_size & 0x7FFFFFFF) | \
+                ((metadata['header']['block_align'] & 1) << 31)
+    struct.pack_into('<I', data, 4, block_data)
+    return bytes(data)
+
+def create_font_file(metadata_filename, bitmaps_folder, output_filename, debug=False):
+    """
+    Create a KQ8 font file from metadata and bitmap BMPs
+    
+    Args:
+        metadata_filename: Path to the JSON metadata file
+        bitmaps_folder: Path to folder containing bitmap BMP files
+        output_filename: Path to output font file
+        debug: Whether to print debug information
+    """
+    
+    # Load metadata
+    with open(metadata_filename, 'r') as meta_file:
+        metadata = json.load(meta_file)
+    
+    if debug:
+        print(f"Loaded metadata from: {metadata_filename}")
+
+    bitmap_data_list = load_bitmaps(bitmaps_folder, debug=debug)
     
     if debug:
         print(f"Found {len(bitmap_data_list)} bitmap files")
@@ -73,165 +293,7 @@ def create_font_file(metadata_filename, bitmaps_folder, output_filename, debug=F
     
     # Write font file
     with open(output_filename, 'wb') as f:
-        # Write Persistent::Base header
-        f.write(metadata['header']['block_tag'].encode('ascii'))
-        
-        # Calculate actual block size (file size - 8 bytes for header)
-        # We'll write a placeholder for now and update it at the end
-        block_size_pos = f.tell()
-        f.write(struct.pack('<I', 0))  # Placeholder for block_size
-        
-        # Write Persistent::VersionedBase
-        f.write(struct.pack('<I', metadata['header']['class_version']))
-        
-        # Write GFXFont::FontInfo structure
-        f.write(struct.pack('<I', metadata['font_info']['font_flags']))
-        f.write(struct.pack('<I', metadata['font_info']['text_flags']))
-        f.write(struct.pack('<i', metadata['font_info']['glyph_count']))
-        f.write(struct.pack('<i', metadata['font_info']['char_height']))
-        f.write(struct.pack('<i', metadata['font_info']['char_width']))
-        f.write(struct.pack('<I', metadata['font_info']['text_color']))
-        f.write(struct.pack('<I', metadata['font_info']['back_color']))
-        f.write(struct.pack('<i', metadata['font_info']['baseline']))
-        f.write(struct.pack('<I', metadata['font_info']['text_h_scale']))
-        f.write(struct.pack('<I', metadata['font_info']['text_v_scale']))
-        f.write(struct.pack('<i', metadata['font_info']['char_h_space']))
-        
-        # Write character mapping
-        f.write(struct.pack('<h', metadata['character_mapping']['char_count']))
-        f.write(struct.pack('<h', metadata['character_mapping']['char_first']))
-        
-        # Write character glyph mapping array
-        for glyph_index in metadata['character_mapping']['char_glyph']:
-            f.write(struct.pack('<h', glyph_index))
-        
-        # Write glyph info array
-        for i, glyph in enumerate(metadata['glyph_array']):
-            # Find corresponding bitmap to get actual width
-            bitmap_index = glyph['bitmap_index']
-            actual_width = glyph['width']  # Default to metadata width
-            
-            # Look for bitmap with matching index
-            for bitmap in bitmap_data_list:
-                if bitmap['index'] == bitmap_index:
-                    actual_width = bitmap['width']  # Use actual bitmap width
-                    break
-            #if bitmap_index==107:
-            #    actual_width = 12
-                
-            
-            # Write the main 6 bytes (using actual bitmap width)
-            f.write(struct.pack('<BBBBBB', 
-                               glyph['bitmap_index'],
-                               glyph['bitmap_left'],
-                               glyph['bitmap_top'],
-                               actual_width,  # Use actual bitmap width instead of metadata
-                               glyph['height'],
-                               glyph['baseline_shift']))
-            
-            # Write the spare bytes (if available, otherwise write zeros)
-            if 'spare_bytes' in glyph and len(glyph['spare_bytes']) == 2:
-                f.write(bytes(glyph['spare_bytes']))
-            else:
-                f.write(b'\x00\x00')  # Default spare bytes
-        
-        # Write bitmap array header
-        f.write(metadata['bitmap_array']['pbma_tag'].encode('ascii'))  # Tag
-        f.write(struct.pack('<I', metadata['bitmap_array']['pbma_unknown']))  # Unknown
-        f.write(struct.pack('<I', metadata['bitmap_array']['pbma_head']))  # Head
-        
-        # Write bitmap header with full 32-bit values
-        f.write(struct.pack('<I', metadata['bitmap_array']['bitmap_header1']))
-        f.write(struct.pack('<I', metadata['bitmap_array']['bitmap_header2']))
-        
-        # Write bitmap count
-        f.write(struct.pack('<I', len(bitmap_data_list)))
-        
-        # Write rmap section
-        f.write(metadata['bitmap_array']['rmap_tag'].encode('ascii'))  # Tag
-        f.write(struct.pack('<I', metadata['bitmap_array']['rmap_unknown']))  # Unknown
-        
-        # Write reserved entries for each bitmap
-        original_reserved = metadata['bitmap_array']['rmap_reserved']
-        for i in range(len(bitmap_data_list)):
-            if i < len(original_reserved):
-                f.write(struct.pack('<I', original_reserved[i]))  # Original reserved value
-            else:
-                f.write(struct.pack('<I', 0))  # Default for new bitmaps
-        
-        # Write bitmap data
-        bitmap_headers = metadata['bitmap_array'].get('bitmap_headers', [])
-        for i, bitmap in enumerate(bitmap_data_list):
-            # Use saved header data if available, otherwise use defaults
-            if i < len(bitmap_headers):
-                header = bitmap_headers[i]
-                # Write PBMP header with saved values
-                f.write(header['pbmp_tag'].encode('ascii'))
-                f.write(struct.pack('<I', header['pbmp_unknown']))
-                f.write(struct.pack('<I', header['pbmp_head']))
-                
-                # Write bitmap info with saved raw values
-                f.write(struct.pack('<I', header['bitmap_chunks_raw']))
-                f.write(struct.pack('<I', header['bitmap_version_raw']))
-                width = bitmap['width']
-                f.write(struct.pack('<I', width))  # Use calculated width
-                f.write(struct.pack('<I', header['height']))
-                f.write(struct.pack('<I', header['bit_count']))
-                
-                # Write flags and data tag with saved values
-                f.write(struct.pack('<I', header['flags']))
-                f.write(header['data_tag'].encode('ascii'))
-            else:
-                # Fallback to defaults for new bitmaps
-                f.write(b'PBMP')
-                f.write(struct.pack('<I', 0))
-                f.write(struct.pack('<I', 0))
-                
-                chunks = metadata['bitmap_array']['chunks'] & 0x00FFFFFF
-                f.write(struct.pack('<I', chunks))
-                version = metadata['bitmap_array']['version'] & 0xFF
-                f.write(struct.pack('<I', version))
-                
-                width = ((bitmap['width'] + 3) // 4) * 4
-                f.write(struct.pack('<I', width))
-                f.write(struct.pack('<I', bitmap['height']))
-                f.write(struct.pack('<I', 8))
-                f.write(struct.pack('<I', 0))
-                f.write(b'data')
-            
-            # Write bitmap data
-            bitmap_bytes = bytes(bitmap['data'])
-            f.write(bitmap_bytes)
-            
-            # Write footer with saved values
-            if i < len(bitmap_headers):
-                header = bitmap_headers[i]
-                f.write(bytes(header['bitmap_footer_unknown']))
-                f.write(header['detl_tag'].encode('ascii'))
-                f.write(struct.pack('<I', header['mipmap_count']))
-                f.write(bytes(header['detl_footer_unknown']))
-            else:
-                # Fallback to defaults
-                f.write(struct.pack('<I', 0))
-                f.write(b'DETL')
-                f.write(struct.pack('<I', 4))
-                f.write(struct.pack('<I', 0))
-        
-        # Write palette info
-        f.write(struct.pack('<I', metadata['palette']['has_palette']))
-        
-        # Now calculate the actual file size and update the block_size
-        current_pos = f.tell()
-        actual_block_size = current_pos - 8  # File size minus 8 bytes for header
-        
-        # Go back and write the correct block_size
-        f.seek(block_size_pos)
-        block_data = (actual_block_size & 0x7FFFFFFF) | \
-                    ((metadata['header']['block_align'] & 1) << 31)
-        f.write(struct.pack('<I', block_data))
-        
-        # Return to end of file
-        f.seek(current_pos)
+        f.write(font_bytes(metadata, bitmap_data_list))
     
     if debug:
         print(f"Created font file: {output_filename}")
@@ -9,6 +9,24 @@ import csv
 import sys
 import os
 
+NUMERIC_FIELDS = ('noun', 'verb', 'case', 'sequence', 'talker', 'text_offset',
+                  'ref_noun', 'ref_verb', 'ref_case', 'ref_sequence')
+
+
+def read_msg_csv(csv_filename):
+    """
+    Read messages from a CSV file (as written by parse_msg.py / translate_csv.py)
+    
+    Args:
+        csv_filename: Path to the CSV file
+        
+    Returns:
+        List of message dictionaries
+    """
+    with open(csv_filename, 'r', encoding='utf-8') as csvfile:
+        return list(csv.DictReader(csvfile))
+
+
 def create_msg_file(csv_filename, output_filename):
     """
     Create a KQ8 MSG file from CSV data
@@ -17,29 +35,25 @@ def create_msg_file(csv_filename, output_filename):
         csv_filename: Path to the CSV file
         output_filename: Path to output MSG file
     """
-    messages = []
-    
-    # Read CSV file
-    with open(csv_filename, 'r', encoding='utf-8') as csvfile:
-        reader = csv.DictReader(csvfile)
-        for row in reader:
-            # Convert string values back to integers for numeric fields
-            message = {
-                'noun': int(row['noun']),
-                'verb': int(row['verb']),
-                'case': int(row['case']),
-                'sequence': int(row['sequence']),
-                'talker': int(row['talker']),
-                'text_offset': int(row['text_offset']),  # Will be recalculated
-                'ref_noun': int(row['ref_noun']),
-                'ref_verb': int(row['ref_verb']),
-                'ref_case': int(row['ref_case']),
-                'ref_sequence': int(row['ref_sequence']),
-                'text': row['text']
-            }
-            messages.append(message)
-    
+    messages = read_msg_csv(csv_filename)
     print(f"Read {len(messages)} messages from CSV")
+    write_msg_file(messages, output_filename)
+
+
+def write_msg_file(rows, output_filename):
+    """
+    Write a KQ8 MSG file from message rows
+    
+    Args:
+        rows: List of message dicts (numeric fields as int or str)
+        output_filename: Path to output MSG file
+    """
+    messages = []
+    for row in rows:
+        # Convert string values back to integers for numeric fields
+        message = {field: int(row[field]) for field in NUMERIC_FIELDS}  # text_offset will be recalculated
+        message['text'] = row['text']
+        messages.append(message)
     
     # Calculate text offsets and encode texts
     encoded_texts = []
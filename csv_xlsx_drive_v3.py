@@ -5,30 +5,268 @@ Converts CSV files to XLSX format and manages them on Google Drive using officia
 """
 
 import argparse
+import hashlib
+import json
 import os
+import random
+import re
 import sys
 import tempfile
-import pandas as pd
-from openpyxl import load_workbook
-from openpyxl.styles import Alignment
-
-# Google Drive API v3 imports
-from google.auth.transport.requests import Request
-from google.oauth2.credentials import Credentials
-from google_auth_oauthlib.flow import InstalledAppFlow
-from googleapiclient.discovery import build
+import threading
+import time
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+import codecs
+import csv
+import io
+
+# pandas, openpyxl and the rest of the Google client stack are imported
+# lazily by the code paths that need them, so --list/--delete start fast.
+# HttpError is cheap and needed by every except clause.
 from googleapiclient.errors import HttpError
-from googleapiclient.http import MediaFileUpload, MediaIoBaseDownload
 
 # If modifying these scopes, delete the file token.json.
 SCOPES = ['https://www.googleapis.com/auth/drive.file']
 
+# Drive discovery document cached locally, so building the service never
+# needs to look it up
+DISCOVERY_CACHE = 'drive_v3_discovery.json'
+DISCOVERY_URL = 'https://www.googleapis.com/discovery/v1/apis/drive/v3/rest'
+
+# Local manifest of uploaded sheets: title -> {file_id, md5, source}
+DEFAULT_MANIFEST = 'drive_manifest.json'
+
+# Drive accepts at most 100 calls per batch request
+BATCH_LIMIT = 100
+
+# Retry rate limiting and server errors with exponential backoff
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+MAX_RETRIES = 5
+RETRY_BASE_DELAY = 1.0
+
+# Default size of the thread pool for multi-file operations
+DEFAULT_WORKERS = 4
+
+# Fixed timestamps so regenerating an unchanged sheet gives identical bytes
+FIXED_ZIP_TIME = (1980, 1, 1, 0, 0, 0)
+FIXED_CORE_TIME = b'2000-01-01T00:00:00Z'
+CORE_TIMESTAMP_RE = re.compile(rb'(<dcterms:(?:created|modified)[^>]*>)[^<]*(</dcterms:)')
+
+
+# Translation sheet layout (create_csv column order)
+CSV_COLUMNS = ['english', 'hebrew', 'tested?', 'comments']
+COLUMN_WIDTHS = {
+    'A': 50,   # english
+    'B': 50,   # hebrew
+    'C': 15,   # tested (boolean dropdown)
+    'D': 100,  # comments
+}
+COLUMN_STYLE_NAMES = ['kq8_english', 'kq8_hebrew', 'kq8_tested', 'kq8_comments']
+
+
+def column_styles():
+    """Named styles for the header and each translation column"""
+    from openpyxl.styles import Alignment, Font, NamedStyle
+
+    return [
+        NamedStyle(name='kq8_header', font=Font(bold=True),
+                   alignment=Alignment(horizontal='center', vertical='top')),
+        # English text column (A)
+        NamedStyle(name='kq8_english', alignment=Alignment(horizontal='left', vertical='top', wrap_text=True)),
+        # Hebrew translation column (B)
+        NamedStyle(name='kq8_hebrew', alignment=Alignment(horizontal='right', vertical='top', wrap_text=True)),
+        # Tested column (C) - center alignment for better readability
+        NamedStyle(name='kq8_tested', alignment=Alignment(horizontal='center', vertical='center')),
+        # Comments column (D)
+        NamedStyle(name='kq8_comments', alignment=Alignment(horizontal='left', vertical='top', wrap_text=True)),
+    ]
+
+
+def styled_cell(worksheet, value, style_name):
+    """Write-only cell with one of the workbook's named styles (see column_styles)"""
+    from openpyxl.cell import WriteOnlyCell
+
+    cell = WriteOnlyCell(worksheet, value=value)
+    cell.style = style_name
+    return cell
+
+
+def decode_csv_bytes(data):
+    """Decode CSV bytes in one pass: BOM sniffing, then UTF-8, then Windows-1255
+
+    Returns:
+        Tuple of (text, encoding)
+    """
+    if data.startswith(codecs.BOM_UTF8):
+        return data[len(codecs.BOM_UTF8):].decode('utf-8'), 'utf-8-sig'
+    try:
+        return data.decode('utf-8'), 'utf-8'
+    except UnicodeDecodeError:
+        # Windows-1255 maps (almost) every byte, so it is the final fallback
+        return data.decode('windows-1255', errors='replace'), 'windows-1255'
+
+
+def read_translation_csv(csv_file_path):
+    """Read a create_csv style file (no header) into padded 4-column rows
+
+    TRUE/FALSE in the tested? column become booleans, like pandas used to read them.
+
+    Returns:
+        Tuple of (rows, encoding)
+    """
+    with open(csv_file_path, 'rb') as f:
+        text, encoding = decode_csv_bytes(f.read())
+
+    rows = []
+    for row in csv.reader(io.StringIO(text, newline='')):
+        if not row:
+            continue
+        row = (row + [''] * len(CSV_COLUMNS))[:len(CSV_COLUMNS)]
+        tested = row[2].strip().upper()
+        if tested in ('TRUE', 'FALSE'):
+            row[2] = tested == 'TRUE'
+        rows.append(row)
+    return rows, encoding
+
+
+def load_discovery_document(cache_path=DISCOVERY_CACHE):
+    """Drive v3 discovery document: local cache, else the copy bundled with
+    googleapiclient, else downloaded once. The result is cached in cache_path."""
+    if os.path.exists(cache_path):
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    from googleapiclient.discovery_cache import get_static_doc
+    content = get_static_doc('drive', 'v3')
+    if content is None:
+        import httplib2
+        resp, content = httplib2.Http().request(DISCOVERY_URL)
+        if resp.status != 200:
+            raise RuntimeError(f"Could not download discovery document (HTTP {resp.status})")
+        content = content.decode('utf-8')
+
+    with open(cache_path, 'w', encoding='utf-8') as f:
+        f.write(content)
+    return json.loads(content)
+
+
+def make_xlsx_deterministic(xlsx_file_path):
+    """Rewrite an XLSX with fixed zip and document timestamps"""
+    with zipfile.ZipFile(xlsx_file_path) as src:
+        entries = [(info, src.read(info.filename)) for info in src.infolist()]
+
+    with zipfile.ZipFile(xlsx_file_path, 'w', zipfile.ZIP_DEFLATED) as dst:
+        for info, data in entries:
+            if info.filename == 'docProps/core.xml':
+                data = CORE_TIMESTAMP_RE.sub(rb'\g<1>' + FIXED_CORE_TIME + rb'\g<2>', data)
+            fixed = zipfile.ZipInfo(info.filename, FIXED_ZIP_TIME)
+            fixed.compress_type = zipfile.ZIP_DEFLATED
+            fixed.external_attr = info.external_attr
+            dst.writestr(fixed, data)
+
+
+def file_md5(file_path):
+    """MD5 hex digest of a file, as reported by Drive's md5Checksum"""
+    md5 = hashlib.md5()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            md5.update(chunk)
+    return md5.hexdigest()
+
+
+def load_manifest(manifest_path):
+    """Load the sync manifest (empty if missing)"""
+    if not os.path.exists(manifest_path):
+        return {}
+    with open(manifest_path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_manifest(manifest, manifest_path):
+    """Save the sync manifest"""
+    with open(manifest_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+
+def backoff(attempt):
+    """Sleep for an exponentially growing, jittered delay"""
+    time.sleep(RETRY_BASE_DELAY * (2 ** attempt) + random.uniform(0, RETRY_BASE_DELAY))
+
+
+def http_status(error):
+    """Status code of an HttpError (batch parts report it as a string)"""
+    return int(error.resp.status)
+
+
+def parse_pairs(items, separator='='):
+    """Split 'A=B' command line items into (A, B) tuples (B may be empty)"""
+    pairs = []
+    for item in items:
+        first, _, second = item.partition(separator)
+        pairs.append((first, second))
+    return pairs
+
+
 class CSVXLSXDriveManager:
     def __init__(self):
         self.service = None
+        self.credentials = None
+        # One HTTP connection per worker thread, the service object is shared
+        self._local = threading.local()
         
+    def connect_local(self, url):
+        """Use a local Drive stand-in (see fake_drive.py) instead of Google Drive"""
+        from googleapiclient.discovery import build_from_document
+        from googleapiclient.http import build_http
+
+        document = dict(load_discovery_document())
+        document['rootUrl'] = url
+        document['mtlsRootUrl'] = url
+        document['baseUrl'] = url + document['servicePath']
+        self.credentials = None
+        self.service = build_from_document(document, http=build_http())
+        print(f"✅ Using local Drive at {url}")
+
+    def _http(self):
+        """Thread-local HTTP object (httplib2 connections are not thread safe)"""
+        http = getattr(self._local, 'http', None)
+        if http is None:
+            # build_http keeps 308 (resumable upload progress) from being followed as a redirect
+            from googleapiclient.http import build_http
+            http = build_http()
+            if self.credentials is not None:
+                from google_auth_httplib2 import AuthorizedHttp
+                http = AuthorizedHttp(self.credentials, http=http)
+            self._local.http = http
+        return http
+
+    def execute(self, request):
+        """Execute a request (or batch) on this thread's connection, retrying 429/5xx"""
+        for attempt in range(MAX_RETRIES + 1):
+            try:
+                return request.execute(http=self._http())
+            except HttpError as error:
+                if http_status(error) not in RETRY_STATUSES or attempt == MAX_RETRIES:
+                    raise
+                print(f"⏳ HTTP {http_status(error)}, retrying ({attempt + 1}/{MAX_RETRIES})...")
+                backoff(attempt)
+
+    def run_parallel(self, func, items, max_workers=DEFAULT_WORKERS):
+        """Run func(*item) for every item on a bounded thread pool, keeping order"""
+        if not self.service:
+            if not self.authenticate():
+                return None
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            return list(pool.map(lambda item: func(*item), items))
+
     def authenticate(self):
-        """Authenticate with Google Drive API using official method"""
+        """Authenticate with Google Drive API using official method
+        
+        A cached token that is still valid is used as is, without a refresh
+        round trip, and the service is built from the cached discovery document.
+        """
+        from google.oauth2.credentials import Credentials
+        from googleapiclient.discovery import build_from_document
+
         creds = None
         # The file token.json stores the user's access and refresh tokens, and is
         # created automatically when the authorization flow completes for the first time.
@@ -38,6 +276,7 @@ class CSVXLSXDriveManager:
         # If there are no (valid) credentials available, let the user log in.
         if not creds or not creds.valid:
             if creds and creds.expired and creds.refresh_token:
+                from google.auth.transport.requests import Request
                 creds.refresh(Request())
             else:
                 if not os.path.exists('credentials.json'):
@@ -50,6 +289,7 @@ class CSVXLSXDriveManager:
                     print("5. Download credentials.json to this directory")
                     return False
                     
+                from google_auth_oauthlib.flow import InstalledAppFlow
                 flow = InstalledAppFlow.from_client_secrets_file(
                     'credentials.json', SCOPES)
                 creds = flow.run_local_server(port=0)
@@ -59,7 +299,8 @@ class CSVXLSXDriveManager:
                 token.write(creds.to_json())
         
         try:
-            self.service = build('drive', 'v3', credentials=creds)
+            self.credentials = creds
+            self.service = build_from_document(load_discovery_document(), credentials=creds)
             print("✅ Successfully authenticated with Google Drive")
             return True
         except Exception as e:
@@ -69,96 +310,65 @@ class CSVXLSXDriveManager:
     def csv_to_xlsx(self, csv_file_path, xlsx_file_path, sheet_name="Translation", use_checkboxes=False):
         """Convert CSV to XLSX with proper formatting
         
+        Rows are streamed through a write-only workbook and every cell gets one
+        of the named column styles registered once per workbook.
+        
         Args:
             csv_file_path: Path to input CSV file
             xlsx_file_path: Path to output XLSX file  
             sheet_name: Name of the Excel sheet
             use_checkboxes: If True, use actual checkboxes instead of dropdown (experimental)
         """
+        from openpyxl import Workbook
+        from openpyxl.formatting.rule import FormulaRule
+        from openpyxl.styles import PatternFill
+        from openpyxl.worksheet.datavalidation import DataValidation
+
         try:
-            # Try to read CSV with different encodings (UTF-8 first, then Windows-1255)
-            df = None
-            for encoding in ['utf-8', 'windows-1255', 'utf-8-sig']:
-                try:
-                    # Read CSV without headers and assign proper column names
-                    df = pd.read_csv(csv_file_path, encoding=encoding, header=None, 
-                                   names=['english', 'hebrew', 'tested?', 'comments'])
-                    print(f"✅ Successfully read CSV with {encoding} encoding")
-                    break
-                except UnicodeDecodeError:
-                    continue
+            rows, encoding = read_translation_csv(csv_file_path)
+            print(f"✅ Successfully read CSV with {encoding} encoding")
             
-            if df is None:
-                raise ValueError("Could not read CSV file with any supported encoding")
+            workbook = Workbook(write_only=True)
+            for style in column_styles():
+                workbook.add_named_style(style)
+            worksheet = workbook.create_sheet(sheet_name)
             
-            # Fill any missing data with empty strings
-            df = df.fillna('')
+            # Set column widths for better readability
+            for column, width in COLUMN_WIDTHS.items():
+                worksheet.column_dimensions[column].width = width
             
-            # Create Excel writer with formatting
-            with pd.ExcelWriter(xlsx_file_path, engine='openpyxl') as writer:
-                df.to_excel(writer, sheet_name=sheet_name, index=False)
-                
-                # Get the workbook and worksheet
-                workbook = writer.book
-                worksheet = writer.sheets[sheet_name]
-                
-                # Import data validation
-                from openpyxl.worksheet.datavalidation import DataValidation
-                
-                # Set column widths for better readability
-                column_widths = {
-                    'A': 50,   # english
-                    'B': 50,   # hebrew  
-                    'C': 15,   # tested (boolean dropdown)
-                    'D': 100,  # comments
-                }
-                
-                for column, width in column_widths.items():
-                    worksheet.column_dimensions[column].width = width
-                
-                # Add data validation for the "tested" column (column C)
-                # Create dropdown with TRUE/FALSE options
-                dv = DataValidation(type="list", formula1='"TRUE,FALSE"', allow_blank=True)
-                dv.error = 'Your entry is not valid'
-                dv.errorTitle = 'Invalid Entry'
-                dv.prompt = 'Please select TRUE or FALSE'
-                dv.promptTitle = 'Testing Status'
-                
-                # Apply validation to the entire "tested" column (starting from row 2, skipping header)
-                worksheet.add_data_validation(dv)
-                dv.add(f"C2:C{len(df) + 1}")
-                
-                # Add conditional formatting for TRUE/FALSE values
-                from openpyxl.formatting.rule import FormulaRule
-                from openpyxl.styles import PatternFill, Font
-                
-                # Green background for TRUE
-                green_fill = PatternFill(start_color='C6EFCE', end_color='C6EFCE', fill_type='solid')
-                true_rule = FormulaRule(formula=['$C2="TRUE"'], fill=green_fill)
-                worksheet.conditional_formatting.add(f"C2:C{len(df) + 1}", true_rule)
-                
-                # Light red background for FALSE  
-                red_fill = PatternFill(start_color='FFC7CE', end_color='FFC7CE', fill_type='solid')
-                false_rule = FormulaRule(formula=['$C2="FALSE"'], fill=red_fill)
-                worksheet.conditional_formatting.add(f"C2:C{len(df) + 1}", false_rule)
-                
-                # Set text alignment for different columns
-                for row in range(2, len(df) + 2):  # Skip header row
-                    # English text column (A)
-                    cell_a = worksheet[f'A{row}']
-                    cell_a.alignment = Alignment(horizontal='left', vertical='top', wrap_text=True)
-                    
-                    # Hebrew translation column (B)
-                    cell_b = worksheet[f'B{row}']
-                    cell_b.alignment = Alignment(horizontal='right', vertical='top', wrap_text=True)
-                    
-                    # Tested column (C) - center alignment for better readability
-                    cell_c = worksheet[f'C{row}']
-                    cell_c.alignment = Alignment(horizontal='center', vertical='center')
-                    
-                    # Comments column (D) 
-                    cell_d = worksheet[f'D{row}']
-                    cell_d.alignment = Alignment(horizontal='left', vertical='top', wrap_text=True)
+            last_row = len(rows) + 1
+            
+            # Add data validation for the "tested" column (column C)
+            # Create dropdown with TRUE/FALSE options
+            dv = DataValidation(type="list", formula1='"TRUE,FALSE"', allow_blank=True)
+            dv.error = 'Your entry is not valid'
+            dv.errorTitle = 'Invalid Entry'
+            dv.prompt = 'Please select TRUE or FALSE'
+            dv.promptTitle = 'Testing Status'
+            
+            # Apply validation to the entire "tested" column (starting from row 2, skipping header)
+            # (write-only sheets have no add_data_validation helper)
+            worksheet.data_validations.append(dv)
+            dv.add(f"C2:C{last_row}")
+            
+            # Green background for TRUE
+            green_fill = PatternFill(start_color='C6EFCE', end_color='C6EFCE', fill_type='solid')
+            true_rule = FormulaRule(formula=['$C2="TRUE"'], fill=green_fill)
+            worksheet.conditional_formatting.add(f"C2:C{last_row}", true_rule)
+            
+            # Light red background for FALSE  
+            red_fill = PatternFill(start_color='FFC7CE', end_color='FFC7CE', fill_type='solid')
+            false_rule = FormulaRule(formula=['$C2="FALSE"'], fill=red_fill)
+            worksheet.conditional_formatting.add(f"C2:C{last_row}", false_rule)
+            
+            worksheet.append([styled_cell(worksheet, name, 'kq8_header') for name in CSV_COLUMNS])
+            
+            for row in rows:
+                worksheet.append([styled_cell(worksheet, value, style_name)
+                                  for value, style_name in zip(row, COLUMN_STYLE_NAMES)])
+            
+            workbook.save(xlsx_file_path)
             
             print(f"✅ Successfully converted {csv_file_path} to {xlsx_file_path}")
             return True
@@ -181,13 +391,14 @@ class CSVXLSXDriveManager:
             if folder_id:
                 file_metadata['parents'] = [folder_id]
             
+            from googleapiclient.http import MediaFileUpload
             media = MediaFileUpload(file_path, resumable=True)
             
-            file = self.service.files().create(
+            file = self.execute(self.service.files().create(
                 body=file_metadata,
                 media_body=media,
                 fields='id,name,webViewLink'
-            ).execute()
+            ))
             
             print(f"✅ Successfully uploaded '{file.get('name')}' to Google Drive")
             print(f"📂 File ID: {file.get('id')}")
@@ -199,25 +410,234 @@ class CSVXLSXDriveManager:
             print(f"❌ Error uploading to Google Drive: {error}")
             return None
 
-    def download_from_drive(self, file_id, output_path):
+    def fetch_checksums(self, file_ids):
+        """Get md5Checksum of many files with batch HTTP requests
+
+        Parts that fail with 429/5xx are retried in a new batch with backoff.
+
+        Returns:
+            Dictionary of file_id -> md5Checksum (None for missing/trashed files).
+            Files whose state could not be determined are left out.
+        """
+        checksums = {}
+        pending = list(file_ids)
+
+        for attempt in range(MAX_RETRIES + 1):
+            retry = []
+
+            def callback(request_id, response, exception):
+                if exception is None:
+                    checksums[request_id] = None if response.get('trashed') else response.get('md5Checksum')
+                elif http_status(exception) == 404:
+                    checksums[request_id] = None
+                elif http_status(exception) in RETRY_STATUSES:
+                    retry.append(request_id)
+                else:
+                    print(f"❌ Error reading '{request_id}': {exception}")
+
+            for start in range(0, len(pending), BATCH_LIMIT):
+                batch = self.service.new_batch_http_request(callback=callback)
+                for file_id in pending[start:start + BATCH_LIMIT]:
+                    batch.add(self.service.files().get(fileId=file_id, fields='id,md5Checksum,trashed'),
+                              request_id=file_id)
+                self.execute(batch)
+
+            if not retry or attempt == MAX_RETRIES:
+                break
+            pending = retry
+            backoff(attempt)
+
+        return checksums
+
+    def _upload_xlsx(self, xlsx_path, title, folder_id=None, file_id=None):
+        """Create a new Drive file, or replace the content of file_id"""
+        from googleapiclient.http import MediaFileUpload
+
+        media = MediaFileUpload(xlsx_path, resumable=True)
+        if file_id:
+            return self.execute(self.service.files().update(
+                fileId=file_id,
+                media_body=media,
+                fields='id,name,md5Checksum,webViewLink'
+            ))
+        file_metadata = {'name': title}
+        if folder_id:
+            file_metadata['parents'] = [folder_id]
+        return self.execute(self.service.files().create(
+            body=file_metadata,
+            media_body=media,
+            fields='id,name,md5Checksum,webViewLink'
+        ))
+
+    def sync_to_drive(self, uploads, manifest_path=DEFAULT_MANIFEST, folder_id=None, sheet_name="Translation",
+                      max_workers=DEFAULT_WORKERS):
+        """Upload only the sheets whose content changed since the last sync
+
+        Args:
+            uploads: List of (csv_file_path, title) tuples
+            manifest_path: Local manifest of title -> file_id/md5
+            folder_id: Google Drive folder ID for new files
+            sheet_name: Name of the Excel sheet
+            max_workers: Number of concurrent uploads
+
+        Returns:
+            Dictionary with lists of 'created', 'updated', 'unchanged' and 'failed' titles
+        """
+        if not self.service:
+            if not self.authenticate():
+                return None
+
+        manifest = load_manifest(manifest_path)
+        result = {'created': [], 'updated': [], 'unchanged': [], 'failed': []}
+        temp_dir = tempfile.mkdtemp(prefix='kq8_sync_')
+
+        def convert(index, csv_file_path, title):
+            xlsx_path = os.path.join(temp_dir, f"{index}.xlsx")
+            if not self.csv_to_xlsx(csv_file_path, xlsx_path, sheet_name):
+                return None
+            make_xlsx_deterministic(xlsx_path)
+            return xlsx_path, file_md5(xlsx_path)
+
+        def upload(title, csv_file_path, xlsx_path, file_id):
+            try:
+                return self._upload_xlsx(xlsx_path, title, folder_id, file_id)
+            except HttpError as error:
+                print(f"❌ Error syncing '{title}': {error}")
+                return None
+
+        try:
+            # Convert all sheets first and hash the generated XLSX bytes
+            converted = self.run_parallel(
+                convert, [(index, csv_file_path, title) for index, (csv_file_path, title) in enumerate(uploads)],
+                max_workers)
+            local = {}
+            for (csv_file_path, title), item in zip(uploads, converted):
+                if item is None:
+                    result['failed'].append(title)
+                else:
+                    local[title] = (csv_file_path, *item)
+
+            # One batch of metadata calls for every known file
+            known = {title: manifest[title]['file_id'] for title in local if title in manifest}
+            remote = self.fetch_checksums(known.values()) if known else {}
+
+            changed = []
+            for title, (csv_file_path, xlsx_path, md5) in local.items():
+                file_id = known.get(title)
+                if file_id and file_id not in remote:
+                    result['failed'].append(title)
+                    continue
+                remote_md5 = remote.get(file_id) if file_id else None
+                if remote_md5 is not None and remote_md5 == md5:
+                    print(f"⏭️  Unchanged: '{title}'")
+                    result['unchanged'].append(title)
+                    continue
+                # Missing/trashed remote files are created again
+                changed.append((title, csv_file_path, xlsx_path, file_id if remote_md5 is not None else None))
+
+            files = self.run_parallel(upload, changed, max_workers) if changed else []
+            for (title, csv_file_path, xlsx_path, file_id), file in zip(changed, files):
+                if file is None:
+                    result['failed'].append(title)
+                    continue
+                if file_id:
+                    result['updated'].append(title)
+                    print(f"🔄 Updated '{title}' (ID: {file.get('id')})")
+                else:
+                    result['created'].append(title)
+                    print(f"✅ Created '{title}' (ID: {file.get('id')})")
+                    print(f"🔗 View Link: {file.get('webViewLink')}")
+                manifest[title] = {
+                    'file_id': file.get('id'),
+                    'md5': file.get('md5Checksum') or local[title][2],
+                    'source': csv_file_path,
+                }
+        finally:
+            save_manifest(manifest, manifest_path)
+            for name in os.listdir(temp_dir):
+                os.unlink(os.path.join(temp_dir, name))
+            os.rmdir(temp_dir)
+
+        print(f"📊 Sync: {len(result['created'])} created, {len(result['updated'])} updated, "
+              f"{len(result['unchanged'])} unchanged, {len(result['failed'])} failed")
+        return result
+
+    def upload_many(self, uploads, folder_id=None, sheet_name="Translation", max_workers=DEFAULT_WORKERS):
+        """Convert and upload many CSV files concurrently with one authenticated service
+
+        Args:
+            uploads: List of (csv_file_path, title) tuples
+
+        Returns:
+            List of file IDs (None for failed uploads), in input order
+        """
+        def upload(csv_file_path, title):
+            with tempfile.NamedTemporaryFile(suffix='.xlsx', delete=False) as temp_file:
+                temp_xlsx = temp_file.name
+            try:
+                if not self.csv_to_xlsx(csv_file_path, temp_xlsx, sheet_name):
+                    return None
+                file = self._upload_xlsx(temp_xlsx, title, folder_id)
+                print(f"✅ Uploaded '{title}' (ID: {file.get('id')})")
+                return file.get('id')
+            except HttpError as error:
+                print(f"❌ Error uploading '{title}': {error}")
+                return None
+            finally:
+                os.unlink(temp_xlsx)
+
+        return self.run_parallel(upload, uploads, max_workers)
+
+    def download_many(self, downloads, sheet_name="Translation", max_workers=DEFAULT_WORKERS):
+        """Download many sheets concurrently and convert them to CSV
+
+        Args:
+            downloads: List of (file_id, output_csv_path) tuples
+
+        Returns:
+            List of booleans, in input order
+        """
+        def download(file_id, output_path):
+            with tempfile.NamedTemporaryFile(suffix='.xlsx', delete=False) as temp_file:
+                temp_xlsx = temp_file.name
+            try:
+                return (self.download_from_drive(file_id, temp_xlsx, quiet=True)
+                        and self.xlsx_to_csv(temp_xlsx, output_path, sheet_name))
+            finally:
+                os.unlink(temp_xlsx)
+
+        return self.run_parallel(download, downloads, max_workers)
+
+    def download_from_drive(self, file_id, output_path, quiet=False):
         """Download file from Google Drive"""
+        from googleapiclient.http import MediaIoBaseDownload
+
         if not self.service:
             if not self.authenticate():
                 return False
         
         try:
             # Get file metadata
-            file_metadata = self.service.files().get(fileId=file_id).execute()
+            file_metadata = self.execute(self.service.files().get(fileId=file_id))
             print(f"📥 Downloading: {file_metadata.get('name')}")
             
-            # Download file content
-            request = self.service.files().get_media(fileId=file_id)
-            with open(output_path, 'wb') as f:
-                downloader = MediaIoBaseDownload(f, request)
-                done = False
-                while done is False:
-                    status, done = downloader.next_chunk()
-                    print(f"Download progress: {int(status.progress() * 100)}%")
+            for attempt in range(MAX_RETRIES + 1):
+                # Download file content on this thread's connection
+                request = self.service.files().get_media(fileId=file_id)
+                request.http = self._http()
+                try:
+                    with open(output_path, 'wb') as f:
+                        downloader = MediaIoBaseDownload(f, request)
+                        done = False
+                        while done is False:
+                            status, done = downloader.next_chunk()
+                            if not quiet:
+                                print(f"Download progress: {int(status.progress() * 100)}%")
+                    break
+                except HttpError as error:
+                    if http_status(error) not in RETRY_STATUSES or attempt == MAX_RETRIES:
+                        raise
+                    backoff(attempt)
             
             print(f"✅ Successfully downloaded to {output_path}")
             return True
@@ -237,11 +657,11 @@ class CSVXLSXDriveManager:
             if folder_id:
                 query += f" and parents in '{folder_id}'"
             
-            results = self.service.files().list(
+            results = self.execute(self.service.files().list(
                 q=query,
                 pageSize=50,
                 fields="nextPageToken, files(id, name, createdTime, modifiedTime, webViewLink)"
-            ).execute()
+            ))
             
             items = results.get('files', [])
             
@@ -269,7 +689,7 @@ class CSVXLSXDriveManager:
         
         try:
             # Get file metadata first to show what we're deleting
-            file_metadata = self.service.files().get(fileId=file_id).execute()
+            file_metadata = self.execute(self.service.files().get(fileId=file_id))
             file_name = file_metadata.get('name')
             
             # Confirm deletion
@@ -279,7 +699,7 @@ class CSVXLSXDriveManager:
                 return False
             
             # Delete the file
-            self.service.files().delete(fileId=file_id).execute()
+            self.execute(self.service.files().delete(fileId=file_id))
             print(f"✅ Successfully deleted '{file_name}' from Google Drive")
             return True
             
@@ -289,6 +709,8 @@ class CSVXLSXDriveManager:
 
     def xlsx_to_csv(self, xlsx_file_path, csv_file_path, sheet_name="Translation"):
         """Convert XLSX to CSV"""
+        import pandas as pd
+
         try:
             # Read Excel file
             df = pd.read_excel(xlsx_file_path, sheet_name=sheet_name)
@@ -303,6 +725,19 @@ class CSVXLSXDriveManager:
             print(f"❌ Error converting XLSX to CSV: {e}")
             return False
 
+def upload_pairs(items, title=None):
+    """Parse CSV_FILE[=TITLE] arguments, checking that the files exist"""
+    uploads = []
+    for csv_file, item_title in parse_pairs(items):
+        if not os.path.exists(csv_file):
+            print(f"❌ File not found: {csv_file}")
+            sys.exit(1)
+        if not item_title:
+            item_title = title if title and len(items) == 1 else os.path.splitext(os.path.basename(csv_file))[0]
+        uploads.append((csv_file, item_title))
+    return uploads
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="CSV to XLSX Google Drive Manager for Hebrew Translation",
@@ -321,6 +756,13 @@ Examples:
   # List files in Google Drive
   %(prog)s --list
   
+  # Upload only changed sheets (CSV_FILE or CSV_FILE=TITLE)
+  %(prog)s --sync output\\1000_translations.csv="KQ8 - Daventry" output\\2000_translations.csv="KQ8 - Dead City"
+  
+  # Upload / download many sheets concurrently with one authentication
+  %(prog)s --upload-many output\\1000_translations.csv="KQ8 - Daventry" output\\2000_translations.csv="KQ8 - Dead City"
+  %(prog)s --download-many 1ABC...XYZ=output\\1000_translations_new.csv 1DEF...UVW=output\\2000_translations_new.csv
+  
   # Convert CSV to XLSX locally (no upload)
   %(prog)s --csv-to-xlsx messages.csv messages.xlsx
   
@@ -335,6 +777,9 @@ Examples:
     group.add_argument('--download', action='store_true', help='Download XLSX from Google Drive and convert to CSV')
     group.add_argument('--delete', help='Delete file from Google Drive (provide file ID)')
     group.add_argument('--list', action='store_true', help='List files in Google Drive')
+    group.add_argument('--sync', nargs='+', metavar='CSV_FILE[=TITLE]', help='Upload CSV files as XLSX only when their content changed')
+    group.add_argument('--upload-many', nargs='+', metavar='CSV_FILE[=TITLE]', help='Upload many CSV files as XLSX concurrently')
+    group.add_argument('--download-many', nargs='+', metavar='FILE_ID=CSV_FILE', help='Download many XLSX files concurrently as CSV')
     group.add_argument('--csv-to-xlsx', nargs=2, metavar=('CSV_FILE', 'XLSX_FILE'), help='Convert CSV to XLSX locally')
     group.add_argument('--xlsx-to-csv', nargs=2, metavar=('XLSX_FILE', 'CSV_FILE'), help='Convert XLSX to CSV locally')
     
@@ -344,10 +789,21 @@ Examples:
     parser.add_argument('--output', help='Output CSV file path for download')
     parser.add_argument('--folder-id', help='Google Drive folder ID for upload')
     parser.add_argument('--sheet-name', default='Translation', help='Excel sheet name (default: Translation)')
+    parser.add_argument('--manifest', default=DEFAULT_MANIFEST, help=f'Sync manifest file (default: {DEFAULT_MANIFEST})')
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS, help=f'Concurrent transfers for multi-file modes (default: {DEFAULT_WORKERS})')
+    parser.add_argument('--drive-url', help='Use a running local Drive stand-in at this URL (see fake_drive.py)')
+    parser.add_argument('--fake-drive', metavar='DIR', help='Start a local Drive stand-in stored in DIR (offline testing)')
     
     args = parser.parse_args()
     
     manager = CSVXLSXDriveManager()
+    fake_server = None
+    if args.fake_drive:
+        from fake_drive import FakeDriveServer
+        fake_server = FakeDriveServer(args.fake_drive).start()
+        manager.connect_local(fake_server.url)
+    elif args.drive_url:
+        manager.connect_local(args.drive_url if args.drive_url.endswith('/') else args.drive_url + '/')
     
     try:
         if args.upload:
@@ -402,6 +858,33 @@ Examples:
             except:
                 pass
                 
+        elif args.sync:
+            # Upload only changed sheets
+            uploads = upload_pairs(args.sync, args.title)
+            result = manager.sync_to_drive(uploads, args.manifest, args.folder_id, args.sheet_name, args.workers)
+            if result is None or result['failed']:
+                sys.exit(1)
+                
+        elif args.upload_many:
+            # Upload many CSV files concurrently
+            file_ids = manager.upload_many(upload_pairs(args.upload_many, args.title), args.folder_id,
+                                           args.sheet_name, args.workers)
+            if file_ids is None or None in file_ids:
+                sys.exit(1)
+            print(f"🎉 Uploaded {len(file_ids)} files successfully!")
+                
+        elif args.download_many:
+            # Download many files concurrently
+            downloads = parse_pairs(args.download_many)
+            for file_id, output_path in downloads:
+                if not output_path:
+                    print(f"❌ Missing output CSV for file ID: {file_id} (use FILE_ID=CSV_FILE)")
+                    sys.exit(1)
+            results = manager.download_many(downloads, args.sheet_name, args.workers)
+            if results is None or not all(results):
+                sys.exit(1)
+            print(f"🎉 Downloaded {len(results)} files successfully!")
+                
         elif args.delete:
             # Delete file from Google Drive
             if manager.delete_file(args.delete):
@@ -443,6 +926,10 @@ Examples:
     except Exception as e:
         print(f"❌ Unexpected error: {e}")
         sys.exit(1)
+    finally:
+        if fake_server is not None:
+            print(f"📡 Local Drive requests: {fake_server.request_count}")
+            fake_server.shutdown()
 
 if __name__ == '__main__':
     main()
@@ -2,79 +2,49 @@
 """
 Debug script to understand the bitmap format
 Supports analyzing individual bitmaps or a range of letter indices
+(see glyph_inspect.py for block/ANSI previews and contact sheets)
 """
 
-from PIL import Image
 import sys
-import os
 from collections import Counter
 
+from glyph_inspect import read_glyph, load_glyphs, color_counts, render_values
+
 def analyze_bitmap(bitmap_path):
-    img = Image.open(bitmap_path)
-    pixels = list(img.getdata())
-    width, height = img.size
+    mode, arr = read_glyph(bitmap_path)
+    height, width = arr.shape[:2]
+    pixel_count = width * height
     
     print(f"Bitmap: {bitmap_path}")
     print(f"Size: {width}x{height}")
-    print(f"Mode: {img.mode}")
-    print(f"Pixel count: {len(pixels)}")
+    print(f"Mode: {mode}")
+    print(f"Pixel count: {pixel_count}")
     
     # Show pixel value distribution
-    pixel_counts = Counter(pixels)
     print("Pixel value distribution:")
-    for value, count in sorted(pixel_counts.items()):
-        print(f"  {value}: {count} pixels ({count/len(pixels)*100:.1f}%)")
+    for value, count in color_counts(arr):
+        print(f"  {value}: {count} pixels ({count/pixel_count*100:.1f}%)")
     
     print()
     print("Raw pixel grid (showing actual values):")
-    for y in range(height):
-        row = []
-        for x in range(width):
-            pixel = pixels[y * width + x]
-            # Handle both indexed color (single int) and RGB (tuple)
-            if isinstance(pixel, tuple):
-                # For RGB, show as (R,G,B)
-                row.append(f"{str(pixel):15s}")
-            else:
-                # For indexed color, show as single number
-                row.append(f"{pixel:3d}")
-        print(" ".join(row))
+    # Indexed color as single numbers, RGB as (R, G, B)
+    print(render_values(arr))
 
 def analyze_bitmap_range(bitmaps_dir, start_index, end_index):
     """Analyze a range of bitmaps and provide summary statistics"""
     print(f"Analyzing bitmaps {start_index} to {end_index} in {bitmaps_dir}")
     print("=" * 60)
     
+    # Try both .bmp and .png extensions, read through the cached reader
+    glyphs = load_glyphs(bitmaps_dir, start_index, end_index)
+    
+    # Accumulate pixel counts
     total_pixel_counts = Counter()
     total_pixels = 0
-    files_analyzed = 0
-    
-    for letter_index in range(start_index, end_index + 1):
-        # Try both .bmp and .png extensions
-        bitmap_path_bmp = os.path.join(bitmaps_dir, f"bitmap_{letter_index:03d}.bmp")
-        bitmap_path_png = os.path.join(bitmaps_dir, f"bitmap_{letter_index:03d}.png")
-        
-        bitmap_path = None
-        if os.path.exists(bitmap_path_bmp):
-            bitmap_path = bitmap_path_bmp
-        elif os.path.exists(bitmap_path_png):
-            bitmap_path = bitmap_path_png
-        else:
-            print(f"Warning: Bitmap {letter_index:03d} not found")
-            continue
-        
-        try:
-            img = Image.open(bitmap_path)
-            pixels = list(img.getdata())
-            
-            # Accumulate pixel counts
-            pixel_counts = Counter(pixels)
-            total_pixel_counts.update(pixel_counts)
-            total_pixels += len(pixels)
-            files_analyzed += 1
-            
-        except Exception as e:
-            print(f"Error processing {bitmap_path}: {e}")
+    for _, _, _, arr in glyphs:
+        total_pixel_counts.update(dict(color_counts(arr)))
+        total_pixels += arr.shape[0] * arr.shape[1]
+    files_analyzed = len(glyphs)
     
     print(f"\nFiles analyzed: {files_analyzed}")
     print(f"Total pixels: {total_pixels}")
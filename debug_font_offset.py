@@ -1,149 +1,75 @@
 #!/usr/bin/env python3
 """
-Debug script to trace font file creation and find what's at offset 0x242
+Debug script to trace font file creation and find what's at a given offset (e.g. 0x242)
+
+The font is built in memory exactly as create_font.py would write it, then
+walked with the PFT layout of binary_schema.py, so the listed offsets cannot
+drift from the reader or the writer.
+
+Usage:
+    python debug_font_offset.py [metadata_json] [bitmaps_folder] [--offset 0x242] [--pattern bitmap_*.png]
 """
 
-import struct
+import argparse
 import json
-import glob
 import os
-from PIL import Image
+import sys
+
+from binary_schema import PFT_LAYOUT, walk, layout_fields, field_at
+from create_font import load_bitmaps, font_bytes
+
+DEFAULT_OFFSET = 0x242
 
-def debug_font_creation(metadata_filename, bitmaps_folder):
+
+def debug_font_creation(metadata_filename, bitmaps_folder, target_offset=DEFAULT_OFFSET, pattern="bitmap_*.png"):
     """
     Debug font creation to show what data is written at each offset
     """
-    
+
     # Load metadata
     with open(metadata_filename, 'r') as meta_file:
         metadata = json.load(meta_file)
-    
-    # Scan bitmaps folder
-    bitmap_files = glob.glob(os.path.join(bitmaps_folder, "bitmap_*.png"))
-    bitmap_files.sort()
-    
-    bitmap_data_list = []
-    for bitmap_file in bitmap_files:
-        filename = os.path.basename(bitmap_file)
-        if filename.startswith("bitmap_") and filename.endswith(".png"):
-            index_str = filename[7:-4]
-            try:
-                index = int(index_str)
-                img = Image.open(bitmap_file)
-                if img.mode != 'L':
-                    img = img.convert('L')
-                
-                bitmap_data = {
-                    'index': index,
-                    'width': img.width,
-                    'height': img.height,
-                    'data': list(img.getdata())
-                }
-                bitmap_data_list.append(bitmap_data)
-            except ValueError:
-                pass
-    
-    bitmap_data_list.sort(key=lambda x: x['index'])
-    
-    # Calculate what should be at offset 0x242 (578 decimal)
-    target_offset = 0x242
-    current_pos = 0
-    
+
+    # Build the font in memory and walk it
+    data = font_bytes(metadata, load_bitmaps(bitmaps_folder, pattern))
+    root = walk(PFT_LAYOUT, data)
+
     print(f"Tracing font file creation to find offset 0x{target_offset:X} ({target_offset})")
     print("=" * 60)
-    
-    def trace_write(data_desc, size, data_preview=None):
-        nonlocal current_pos
-        end_pos = current_pos + size
-        if current_pos <= target_offset < end_pos:
-            offset_in_section = target_offset - current_pos
-            print(f"*** TARGET FOUND at 0x{target_offset:X} ({target_offset}) ***")
-            print(f"Section: {data_desc}")
-            print(f"Section range: 0x{current_pos:X}-0x{end_pos-1:X}")
-            print(f"Position in section: byte {offset_in_section}")
-            if data_preview:
-                print(f"Data preview: {data_preview}")
-            print("=" * 60)
-            return True
-        elif current_pos <= target_offset <= end_pos:
-            print(f"0x{current_pos:03X}-0x{end_pos-1:03X}: {data_desc} *** CONTAINS TARGET ***")
+
+    for path, offset, size in layout_fields(root):
+        end_pos = offset + size
+        if offset <= target_offset < end_pos:
+            print(f"0x{offset:03X}-0x{end_pos-1:03X}: {path} *** CONTAINS TARGET ***")
         else:
-            print(f"0x{current_pos:03X}-0x{end_pos-1:03X}: {data_desc}")
-        current_pos = end_pos
-        return False
-    
-    # Trace the file structure
-    trace_write("Block tag (PFON)", 4, "PFON")
-    trace_write("Block size + align", 4)
-    trace_write("Class version", 4)
-    
-    # Font info (44 bytes total)
-    trace_write("Font flags", 4)
-    trace_write("Text flags", 4)
-    trace_write("Glyph count", 4)
-    trace_write("Char height", 4)
-    trace_write("Char width", 4)
-    trace_write("Text color", 4)
-    trace_write("Back color", 4)
-    trace_write("Baseline", 4)
-    trace_write("Text H scale", 4)
-    trace_write("Text V scale", 4)
-    trace_write("Char H space", 4)
-    
-    # Character mapping
-    trace_write("Char count", 2)
-    trace_write("Char first", 2)
-    
-    # Character glyph mapping array
-    char_count = metadata['character_mapping']['char_count']
-    trace_write(f"Char glyph mapping array ({char_count} entries)", char_count * 2)
-    
-    # Glyph info array  
-    glyph_count = metadata['font_info']['glyph_count']
-    trace_write(f"Glyph info array ({glyph_count} entries)", glyph_count * 8)
-    
-    # Bitmap array header
-    trace_write("PBMA tag", 4, "PBMA")
-    trace_write("PBMA unknown", 4)
-    trace_write("PBMA head", 4)
-    trace_write("Bitmap chunks", 4)
-    trace_write("Bitmap version", 4)
-    trace_write("Bitmap count", 4)
-    
-    # rmap section
-    trace_write("rmap tag", 4, "rmap")
-    trace_write("rmap unknown", 4)
-    
-    # Reserved entries
-    bitmap_count = len(bitmap_data_list)
-    trace_write(f"Reserved entries ({bitmap_count} entries)", bitmap_count * 4)
-    
-    # Individual bitmap data
-    for i, bitmap in enumerate(bitmap_data_list):
-        trace_write(f"Bitmap {i} PBMP tag", 4, "PBMP")
-        trace_write(f"Bitmap {i} unknown", 4)
-        trace_write(f"Bitmap {i} head", 4)
-        trace_write(f"Bitmap {i} chunks", 4)
-        trace_write(f"Bitmap {i} version", 4)
-        trace_write(f"Bitmap {i} width", 4)
-        trace_write(f"Bitmap {i} height", 4)
-        trace_write(f"Bitmap {i} bitCount", 4)
-        trace_write(f"Bitmap {i} flags", 4)
-        trace_write(f"Bitmap {i} data tag", 4, "data")
-        
-        # Bitmap pixel data
-        data_size = len(bitmap['data'])
-        trace_write(f"Bitmap {i} pixel data", data_size)
-        
-        trace_write(f"Bitmap {i} padding", 4)
-        trace_write(f"Bitmap {i} DETL tag", 4, "DETL")
-        trace_write(f"Bitmap {i} mipmap count", 4)
-        trace_write(f"Bitmap {i} final padding", 4)
-    
-    # Palette
-    trace_write("Has palette", 4)
-    
-    print(f"\nTotal expected file size: 0x{current_pos:X} ({current_pos} bytes)")
+            print(f"0x{offset:03X}-0x{end_pos-1:03X}: {path}")
+
+    location = field_at(root, target_offset)
+    print("=" * 60)
+    if location is None:
+        print(f"Target 0x{target_offset:X} is past the end of the file")
+    else:
+        path, offset, size = location
+        print(f"*** TARGET FOUND at 0x{target_offset:X} ({target_offset}) ***")
+        print(f"Section: {path}")
+        print(f"Section range: 0x{offset:X}-0x{offset + size - 1:X}")
+        print(f"Position in section: byte {target_offset - offset}")
+        print(f"Data preview: {data[target_offset:min(offset + size, target_offset + 16)].hex(' ').upper()}")
+
+    print(f"\nTotal expected file size: 0x{len(data):X} ({len(data)} bytes)")
 
 if __name__ == "__main__":
-    debug_font_creation("font/console_metadata.json", "bitmaps")
\ No newline at end of file
+    parser = argparse.ArgumentParser(description='Trace the offsets of a font before creating it')
+    parser.add_argument('metadata', nargs='?', default="font/console_metadata.json", help='Font metadata JSON')
+    parser.add_argument('bitmaps_folder', nargs='?', default="bitmaps", help='Folder with the bitmaps')
+    parser.add_argument('--offset', type=lambda value: int(value, 0), default=DEFAULT_OFFSET,
+                        help='Offset to find (default: 0x242)')
+    parser.add_argument('--pattern', default="bitmap_*.png", help='Bitmap file pattern (default: bitmap_*.png)')
+    args = parser.parse_args()
+
+    for path in (args.metadata, args.bitmaps_folder):
+        if not os.path.exists(path):
+            print(f"Error: '{path}' not found")
+            sys.exit(1)
+
+    debug_font_creation(args.metadata, args.bitmaps_folder, args.offset, args.pattern)
@@ -7,6 +7,8 @@ from PIL import Image, ImageDraw, ImageFont
 import sys
 import os
 
+from glyph_inspect import read_glyph, color_counts, render_mask
+
 def create_hebrew_aleph(width=12, height=15, background_value=0, text_value=157):
     """
     Create a bitmap with Hebrew letter א (Aleph)
@@ -90,12 +92,11 @@ def preview_bitmap(bitmap_path):
         print(f"Error: {bitmap_path} not found")
         return
     
-    img = Image.open(bitmap_path)
-    pixels = list(img.getdata())
-    width, height = img.size
+    _, arr = read_glyph(bitmap_path)
+    height, width = arr.shape[:2]
     
     # Determine threshold - use middle value between min and max
-    unique_values = sorted(set(pixels))
+    unique_values = [value for value, _ in color_counts(arr)]
     if len(unique_values) > 1:
         threshold = (min(unique_values) + max(unique_values)) // 2
     else:
@@ -107,15 +108,8 @@ def preview_bitmap(bitmap_path):
     print("█ = text (low values), ░ = background (high values)")
     print()
     
-    for y in range(height):
-        row = ""
-        for x in range(width):
-            pixel = pixels[y * width + x]
-            if pixel <= threshold:  # Low values = text
-                row += "█"
-            else:  # High values = background
-                row += "░"
-        print(row)
+    # Low values = text, high values = background
+    print(render_mask(arr <= threshold))
 
 def main():
     if len(sys.argv) < 2:
@@ -21,19 +21,9 @@ Usage: python extract_bmp_from_pbm.py <input_pbm_file> <output_bmp_file>
 """
 
 import sys
-import struct
 import os
-from PIL import Image
 
-
-def read_string(file, length):
-    """Read a fixed-length string from file."""
-    return file.read(length).decode('ascii', errors='ignore')
-
-
-def read_uint32(file):
-    """Read a 4-byte unsigned integer (little endian)."""
-    return struct.unpack('<I', file.read(4))[0]
+from pbm_codec import read_pbm, pbm_to_image
 
 
 def extract_bmp_from_pbm(input_path, output_path):
@@ -45,82 +35,38 @@ def extract_bmp_from_pbm(input_path, output_path):
         output_path: Path to output BMP file
     """
     try:
-        with open(input_path, 'rb') as pbm_file:
-            # Read and verify "PBMP" signature
-            signature = read_string(pbm_file, 4)
-            if signature != "PBMP":
-                print(f"Error: Invalid PBM file signature. Expected 'PBMP', got '{signature}'")
-                return False
-            print(f"✓ Valid PBM signature: {signature}")
-            
-            # Skip 4 bytes (ignore)
-            pbm_file.read(4)
-            
-            # Read and verify "head" signature
-            head_signature = read_string(pbm_file, 4)
-            if head_signature != "head":
-                print(f"Error: Invalid head signature. Expected 'head', got '{head_signature}'")
-                return False
-            print(f"✓ Valid head signature: {head_signature}")
-            
-            # Read header information
-            num_chunks = read_uint32(pbm_file)
-            version = read_uint32(pbm_file)
-            width = read_uint32(pbm_file)
-            height = read_uint32(pbm_file)
-            bit_count = read_uint32(pbm_file)
-            flags = read_uint32(pbm_file)
-            
-            print(f"\nPBM Header Information:")
-            print(f"  Number of chunks: {num_chunks}")
-            print(f"  Version: {version}")
-            print(f"  Width: {width}")
-            print(f"  Height: {height}")
-            print(f"  Bit count: {bit_count}")
-            print(f"  Flags: {flags}")
-            
-            # Read and verify "data" signature
-            data_signature = read_string(pbm_file, 4)
-            if data_signature != "data":
-                print(f"Error: Invalid data signature. Expected 'data', got '{data_signature}'")
-                return False
-            print(f"✓ Valid data signature: {data_signature}")
-            
-            # Read data size
-            data_size = read_uint32(pbm_file)
-            expected_size = height * width
-            print(f"\nData size: {data_size} bytes")
-            print(f"Expected size (height × width): {expected_size} bytes")
-            
-            if data_size != expected_size:
-                print(f"Warning: Data size mismatch! Using the value from header: {data_size}")
-            
-            # Read BMP data
-            bmp_data = pbm_file.read(data_size)
-            
-            if len(bmp_data) != data_size:
-                print(f"Error: Could not read expected amount of data.")
-                print(f"Expected: {data_size} bytes, Got: {len(bmp_data)} bytes")
-                return False
-            
-            print(f"✓ Successfully read {len(bmp_data)} bytes of BMP data")
-            
-            # Create PIL Image from bitmap data (8-bit grayscale) and save as BMP
-            if len(bmp_data) == data_size and width > 0 and height > 0:
-                # Create PIL Image from bitmap data (8-bit grayscale)
-                img = Image.new('L', (width, height))
-                img.putdata(bmp_data)
-                
-                # Save as BMP
-                img.save(output_path)
-                print(f"\n✓ BMP file extracted successfully: {output_path}")
-                print(f"  Output file size: {len(bmp_data)} bytes")
-            else:
-                print(f"Error: Invalid dimensions or data size")
-                return False
-            
-            return True
+        header, bmp_data = read_pbm(input_path)
+        print(f"✓ Valid PBM, head and data signatures")
+        
+        print(f"\nPBM Header Information:")
+        print(f"  Number of chunks: {header['num_chunks']}")
+        print(f"  Version: {header['version']}")
+        print(f"  Width: {header['width']}")
+        print(f"  Height: {header['height']}")
+        print(f"  Bit count: {header['bit_count']}")
+        print(f"  Flags: {header['flags']}")
+        
+        data_size = header['data_size']
+        expected_size = header['height'] * header['width']
+        print(f"\nData size: {data_size} bytes")
+        print(f"Expected size (height × width): {expected_size} bytes")
+        
+        if data_size != expected_size:
+            print(f"Warning: Data size mismatch! Using the value from header: {data_size}")
+        
+        print(f"✓ Successfully read {len(bmp_data)} bytes of BMP data")
+        
+        # Create PIL Image from bitmap data (8-bit grayscale) and save as BMP
+        img = pbm_to_image(header, bmp_data)
+        img.save(output_path)
+        print(f"\n✓ BMP file extracted successfully: {output_path}")
+        print(f"  Output file size: {len(bmp_data)} bytes")
+        
+        return True
             
+    except ValueError as e:
+        print(f"Error: {e}")
+        return False
     except FileNotFoundError:
         print(f"Error: Could not find input file: {input_path}")
         return False
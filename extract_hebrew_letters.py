@@ -2,185 +2,136 @@
 """
 Hebrew Letter Extractor for KQ8 Fonts
 Extracts Hebrew letters from a single PNG file and creates individual bitmap files
+
+Letters are found with the connected-component pass of letter_sheet.py (no
+OpenCV needed), so sheets with any number of letters, final forms and
+punctuation work. Use letter_sheet.py to check what a sheet is split into.
 """
 
-import cv2
 import numpy as np
-from PIL import Image, ImageDraw
+from PIL import Image
 import os
 import sys
+from concurrent.futures import ThreadPoolExecutor
+
+from letter_sheet import find_glyphs, DEFAULT_THRESHOLD, X0, X1
+from png_to_bmp import encode_dimensions
+from glyph_inspect import read_glyph, color_counts, render_mask
+
+DEFAULT_WORKERS = 4
 
-def find_contours_in_image(image_path):
+# Glyph height of the target font
+TARGET_HEIGHT = 15
+
+# Letter color of the target bitmaps
+TEXT_VALUE = 157
+
+def find_letters_in_image(image_path, threshold=DEFAULT_THRESHOLD, gap=0):
     """
-    Find the largest 27 contours in the Hebrew letters image
-    Returns list of contours with their bounding boxes and Y positions
+    Find the letters (final forms and punctuation included) of a letter sheet
+    Returns (bounding-box table ordered right to left, grayscale image array)
     """
-    # Load image
-    img = cv2.imread(image_path, cv2.IMREAD_GRAYSCALE)
-    if img is None:
+    try:
+        with Image.open(image_path) as img:
+            gray = np.array(img.convert('L'))
+    except OSError:
         print(f"Error: Could not load image {image_path}")
-        return []
+        return None, None
     
-    print(f"Loaded image: {img.shape[1]}x{img.shape[0]} pixels")
-    
-    # Threshold the image to create binary image
-    # Assuming letters are dark on light background
-    _, binary = cv2.threshold(img, 128, 255, cv2.THRESH_BINARY)
-    
-    # Find contours - try different retrieval modes
-    # cv2.RETR_LIST finds all contours without hierarchy (might work better for detailed letters)
-    contours, _ = cv2.findContours(binary, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-    
-    print(f"Found {len(contours)} total contours")
-    if (len(contours) != 27):
-        print("Warning: Expected 27 contours for Hebrew letters, found different number.")
-        exit(1)
-    
-    # Calculate area and bounding box for each contour
-    contour_data = []
-    for i, contour in enumerate(contours):
-        area = cv2.contourArea(contour)
-        x, y, w, h = cv2.boundingRect(contour)
-        contour_data.append({
-            'contour': contour,
-            'area': area,
-            'bbox': (x, y, w, h),
-            'x': x,
-            'y': y,
-            'width': w,
-            'height': h,
-            'center_x': x + w // 2
-        })
-    
-    # Sort by area (largest first) and take top 27
-    contour_data.sort(key=lambda x: x['area'], reverse=True)
-    largest_27 = contour_data[:27]
-    
-    # Sort by X position (right to left, so we sort by descending X)
-    largest_27.sort(key=lambda x: x['center_x'], reverse=True)
-    
-    print(f"Selected 27 largest contours:")
-    for i, data in enumerate(largest_27):
-        x, y, w, h = data['bbox']
-        print(f"  Letter {i+1:2d}: area={data['area']:4.0f}, bbox=({x:3d},{y:2d},{w:2d},{h:2d})")
-    
-    return largest_27, img
+    print(f"Loaded image: {gray.shape[1]}x{gray.shape[0]} pixels")
+    
+    # Connected components above the threshold, multi-part glyphs grouped
+    letters = find_glyphs(gray, threshold, gap)
+    
+    print(f"Found {len(letters)} letters:")
+    for i, (x, y, x1, y1, area) in enumerate(letters.tolist()):
+        print(f"  Letter {i+1:2d}: area={area:4d}, bbox=({x:3d},{y:2d},{x1 - x:2d},{y1 - y:2d})")
+    
+    return letters, gray
 
-def create_target_bitmap(contour_data, original_img, target_width, target_height, background_value=0, text_value=157):
+def target_width_for(width):
+    """Target bitmap width: 8 for narrow letters, 12 (or the next multiple of 4) otherwise"""
+    if width <= 6:
+        return 8
+    return max(12, -(-width // 4) * 4)
+
+def create_target_bitmaps(letters, original_img, target_height=TARGET_HEIGHT, text_value=TEXT_VALUE):
     """
-    Create a target bitmap with the rectangular region from original image around the contour
+    Create the target bitmaps: the rectangular region around each letter,
+    centered horizontally and kept at its original Y position (at least 1).
+    
+    Returns:
+        List of (height, width) uint8 arrays
     """
-    x, y, w, h = contour_data['bbox']
-    
-    # Create target image
-    target_img = Image.new('L', (target_width, target_height), background_value)
-    
-    # Set pixel (0,0) to encode bitmap dimensions: width × height
-    target_img.putpixel((0, 0), target_width * target_height)
-    
-    # Calculate X offset for centering
-    padding_x = (target_width - w) // 2
-    target_x = padding_x
-    target_y = y  # Keep original Y position as requested
-    if target_y == 0:
-        target_y+=1
-    
-    # Extract the rectangular region from original image
-    contour_region = original_img[y:y+h, x:x+w]
-    
-    # Convert original image region to PIL
-    region_pil = Image.fromarray(contour_region)
-    
-    # Convert to target image array
-    target_array = np.array(target_img)
-    
-    # Make sure we don't go out of bounds
-    end_y = min(target_y + h, target_height)
-    end_x = min(target_x + w, target_width)
-    actual_h = end_y - target_y
-    actual_w = end_x - target_x
-    
-    if target_y >= 0 and target_x >= 0 and actual_h > 0 and actual_w > 0:
-        # Copy the rectangular region directly from original image
-        # Preserve the original pixel values from the source image
-        for dy in range(actual_h):
-            for dx in range(actual_w):
-                orig_pixel = contour_region[dy, dx]
-                # Copy the original pixel value directly
-                target_array[target_y + dy, target_x + dx] = orig_pixel
-    
-    # Apply color remapping to the entire target image (except pixel 0,0)
-    for y in range(target_height):
-        for x in range(target_width):
-            if x == 0 and y == 0:
-                continue  # Skip the dimension encoding pixel
-            
-            pixel_value = target_array[y, x]
-            
-            # Remap colors according to specifications
-            if 1 <= pixel_value <= 30:
-                target_array[y, x] = 0
-            elif 31 <= pixel_value <= 128:
-                target_array[y, x] = 0
-            elif 128 > pixel_value < 210:
-                target_array[y, x] = 0
-            else:
-                target_array[y, x] = 157
-            # pixel_value == 0 remains 0 (background)
-    
-    return Image.fromarray(target_array)
+    bitmaps = []
+    for x, y, x1, y1, _ in letters.tolist():
+        w = x1 - x
+        target_width = target_width_for(w)
+        target = np.zeros((target_height, target_width), dtype=np.uint8)
+        
+        # Calculate X offset for centering, keep the original Y position
+        target_x = (target_width - w) // 2
+        target_y = max(y, 1)
+        
+        # Copy the region (clipped to the bitmap) in one slice
+        actual_h = min(y1 - y, target_height - target_y)
+        actual_w = min(w, target_width - target_x)
+        if actual_h > 0 and actual_w > 0:
+            target[target_y:target_y + actual_h, target_x:target_x + actual_w] = \
+                original_img[y:y + actual_h, x:x + actual_w]
+        bitmaps.append(target)
+    
+    # Remap colors: above 128 is text, everything else background
+    for target in bitmaps:
+        target[:] = np.where(target > 128, text_value, 0)
+        # Set pixel (0,0) to encode bitmap dimensions: width × height
+        encode_dimensions(target)
+    
+    return bitmaps
 
-def extract_hebrew_letters(input_image_path, output_dir="hebrew_letters"):
+def extract_hebrew_letters(input_image_path, output_dir="hebrew_letters", first_index=96,
+                           threshold=DEFAULT_THRESHOLD, gap=0, expected=None, max_workers=DEFAULT_WORKERS):
     """
     Main function to extract Hebrew letters from PNG file
     """
     # Create output directory
     os.makedirs(output_dir, exist_ok=True)
     
-    # Find contours
-    contour_data, original_img = find_contours_in_image(input_image_path)
+    # Find letters
+    letters, original_img = find_letters_in_image(input_image_path, threshold, gap)
     
-    if not contour_data:
-        print("No contours found!")
-        return
+    if letters is None or len(letters) == 0:
+        print("No letters found!")
+        return []
+    
+    if expected is not None and len(letters) != expected:
+        print(f"Warning: Expected {expected} letters, found {len(letters)}")
     
     print(f"\nCreating individual letter bitmaps...")
     
-    created_files = []
+    bitmaps = create_target_bitmaps(letters, original_img)
     
-    for i, data in enumerate(contour_data):
-        letter_num = i + 1
-        width = data['width']
-        
-        # Determine target size based on width
-        if width <= 6:
-            target_width, target_height = 8, 15
-        else:
-            target_width, target_height = 12, 15
-        
-        print(f"Letter {letter_num:2d}: width={width:2d} -> target size {target_width}x{target_height}")
-        
-        # Create bitmap
-        bitmap = create_target_bitmap(data, original_img, target_width, target_height)
-        
-        # Save bitmap with KQ8 font naming convention
-        bitmap_index = 95 + letter_num  # Start from bitmap_096.png
-        filename = f"bitmap_{bitmap_index:03d}.png"
-        output_path = os.path.join(output_dir, filename)
-        bitmap.save(output_path)
-        created_files.append(output_path)
-        
-        print(f"  Saved: {filename} ({target_width}x{target_height})")
+    outputs = []
+    for i, (letter, bitmap) in enumerate(zip(letters, bitmaps)):
+        # KQ8 font naming convention, starting from bitmap_096.png
+        filename = f"bitmap_{first_index + i:03d}.png"
+        height, width = bitmap.shape
+        print(f"Letter {i+1:2d}: width={letter[X1] - letter[X0]:2d} -> {filename} ({width}x{height})")
+        outputs.append((os.path.join(output_dir, filename), bitmap))
+    
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        list(pool.map(lambda output: Image.fromarray(output[1]).save(output[0]), outputs))
     
-    print(f"\nCompleted! Created {len(created_files)} Hebrew letter bitmaps in '{output_dir}/'")
+    print(f"\nCompleted! Created {len(outputs)} Hebrew letter bitmaps in '{output_dir}/'")
     
     # Print summary
-    size_8x15 = sum(1 for f in created_files if "8x15" in f)
-    size_12x15 = sum(1 for f in created_files if "12x15" in f)
-    print(f"  {size_8x15} letters with size 8x15")
-    print(f"  {size_12x15} letters with size 12x15")
+    sizes = {}
+    for bitmap in bitmaps:
+        sizes[bitmap.shape] = sizes.get(bitmap.shape, 0) + 1
+    for (height, width), count in sorted(sizes.items(), key=lambda item: item[0][1]):
+        print(f"  {count} letters with size {width}x{height}")
     
-    return created_files
+    return [path for path, _ in outputs]
 
 def preview_letter(image_path):
     """
@@ -190,27 +141,17 @@ def preview_letter(image_path):
         print(f"Error: {image_path} not found")
         return
     
-    img = Image.open(image_path)
-    pixels = list(img.getdata())
-    width, height = img.size
+    _, arr = read_glyph(image_path)
+    height, width = arr.shape
     
-    unique_values = sorted(set(pixels))
+    unique_values = [value for value, _ in color_counts(arr)]
     print(f"Letter preview ({width}x{height}):")
     print(f"Pixel values: {unique_values}")
     print("█ = text, ░ = background, ● = dimension encoding at (0,0)")
     print()
     
-    for y in range(height):
-        row = ""
-        for x in range(width):
-            pixel = pixels[y * width + x]
-            if pixel == 157:  # Text color
-                row += "█"
-            elif pixel == width * height and x == 0 and y == 0:  # Dimension encoding
-                row += "●"  # Special marker for (0,0) pixel
-            else:
-                row += "░"  # Background
-        print(row)
+    # Text color as blocks, the dimension encoding pixel as a marker
+    print(render_mask(arr == TEXT_VALUE, (0, 0) if arr[0, 0] == width * height else None))
 
 def main():
     if len(sys.argv) < 2:
@@ -0,0 +1,353 @@
+#!/usr/bin/env python3
+"""
+Local HTTP stand-in for the Google Drive v3 endpoints used by csv_xlsx_drive_v3.py
+
+Serves the subset of the REST API the manager uses (files get/list/delete,
+resumable and multipart uploads, alt=media downloads and batch requests),
+storing files in a local directory (content + metadata.json). The real
+googleapiclient client is pointed at it, so every code path can be tested
+offline. Every HTTP request is counted (a batch counts as one) and
+--fail-every N answers every Nth request with 503 to exercise retries.
+
+Usage:
+    python fake_drive.py <root_dir> [--port 8765] [--fail-every N]
+    python csv_xlsx_drive_v3.py --list --drive-url http://127.0.0.1:8765/
+
+or let the manager start one in-process:
+    python csv_xlsx_drive_v3.py --sync output/1000_translations.csv --fake-drive .fake_drive
+"""
+
+import argparse
+import email.parser
+import hashlib
+import json
+import os
+import re
+import threading
+import uuid
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+
+METADATA_FILE = 'metadata.json'
+
+FILE_PATH_RE = re.compile(r'^/(upload/)?drive/v3/files(?:/([^/?]+))?$')
+
+# bytes <first>-<last>/<total> or bytes */<total> (total may be * while unknown)
+CONTENT_RANGE_RE = re.compile(r'^bytes (?:(\d+)-(\d+)|\*)/(\d+|\*)$')
+
+HTTP_REASONS = {200: 'OK', 204: 'No Content', 308: 'Resume Incomplete', 400: 'Bad Request',
+                404: 'Not Found', 429: 'Too Many Requests', 503: 'Service Unavailable'}
+
+
+def _json_response(status, data):
+    return status, {'Content-Type': 'application/json; charset=UTF-8'}, json.dumps(data).encode('utf-8')
+
+
+def _error(status, message):
+    return _json_response(status, {'error': {'code': status, 'message': message,
+                                             'errors': [{'message': message, 'reason': 'fake'}]}})
+
+
+def _select_fields(item, fields):
+    """Apply a simple 'a,b,c' fields mask"""
+    if not fields:
+        return dict(item)
+    keys = {name.strip() for name in fields.split(',')}
+    return {key: value for key, value in item.items() if key in keys}
+
+
+def _list_fields(fields):
+    """Extract the per-file mask from 'nextPageToken, files(a, b)'"""
+    if fields and 'files(' in fields:
+        return fields[fields.index('files(') + 6:fields.rindex(')')]
+    return None
+
+
+class FakeDriveStore:
+    def __init__(self, root_dir, fail_every=0):
+        self.root_dir = root_dir
+        self.fail_every = fail_every
+        self.request_count = 0
+        self.lock = threading.Lock()
+        self.sessions = {}
+        os.makedirs(root_dir, exist_ok=True)
+        self.metadata_path = os.path.join(root_dir, METADATA_FILE)
+        if os.path.exists(self.metadata_path):
+            with open(self.metadata_path, 'r', encoding='utf-8') as f:
+                self.metadata = json.load(f)
+        else:
+            self.metadata = {}
+
+    def _save(self):
+        with open(self.metadata_path, 'w', encoding='utf-8') as f:
+            json.dump(self.metadata, f, indent=2)
+
+    def _write_content(self, item, content):
+        with open(os.path.join(self.root_dir, item['id']), 'wb') as f:
+            f.write(content)
+        item['md5Checksum'] = hashlib.md5(content).hexdigest()
+        item['size'] = str(len(content))
+        item['modifiedTime'] = datetime.now(timezone.utc).isoformat()
+
+    def _create(self, body, content, base_url):
+        file_id = uuid.uuid4().hex
+        item = {
+            'id': file_id,
+            'name': body.get('name', file_id),
+            'parents': body.get('parents', []),
+            'createdTime': datetime.now(timezone.utc).isoformat(),
+            'webViewLink': f"{base_url}drive/v3/files/{file_id}?alt=media",
+        }
+        if content is not None:
+            self._write_content(item, content)
+        self.metadata[file_id] = item
+        self._save()
+        return item
+
+    def _update(self, file_id, body, content):
+        item = self.metadata[file_id]
+        item.update({key: value for key, value in body.items() if key != 'id'})
+        if content is not None:
+            self._write_content(item, content)
+        self._save()
+        return item
+
+    def handle(self, method, url, headers, body, base_url, top_level=True):
+        """
+        Handle one API request.
+
+        Returns:
+            Tuple of (status, headers, body bytes)
+        """
+        if top_level:
+            with self.lock:
+                self.request_count += 1
+                count = self.request_count
+            if self.fail_every and count % self.fail_every == 0:
+                return _error(503, 'Injected failure')
+
+        parts = urlsplit(url)
+        query = {key: values[0] for key, values in parse_qs(parts.query).items()}
+
+        if parts.path == '/batch/drive/v3' and method == 'POST':
+            return self._batch(headers, body, base_url)
+
+        match = FILE_PATH_RE.match(parts.path)
+        if not match:
+            return _error(404, f"Unknown endpoint: {parts.path}")
+        is_upload, file_id = bool(match.group(1)), match.group(2)
+
+        with self.lock:
+            if file_id and file_id not in self.metadata:
+                return _error(404, f"File not found: {file_id}")
+
+            if is_upload:
+                return self._upload(method, file_id, query, headers, body, base_url)
+
+            if method == 'GET' and file_id is None:
+                fields = _list_fields(query.get('fields'))
+                files = [_select_fields(item, fields) for item in self.metadata.values()
+                         if not item.get('trashed')]
+                return _json_response(200, {'files': files})
+
+            if method == 'GET':
+                if query.get('alt') == 'media':
+                    with open(os.path.join(self.root_dir, file_id), 'rb') as f:
+                        content = f.read()
+                    return 200, {'Content-Type': 'application/octet-stream',
+                                 'Content-Length': str(len(content))}, content
+                return _json_response(200, _select_fields(self.metadata[file_id], query.get('fields')))
+
+            if method == 'DELETE' and file_id:
+                del self.metadata[file_id]
+                content_path = os.path.join(self.root_dir, file_id)
+                if os.path.exists(content_path):
+                    os.remove(content_path)
+                self._save()
+                return 204, {}, b''
+
+            if method == 'PATCH' and file_id:
+                item = self._update(file_id, json.loads(body or b'{}'), None)
+                return _json_response(200, _select_fields(item, query.get('fields')))
+
+            if method == 'POST' and file_id is None:
+                item = self._create(json.loads(body or b'{}'), None, base_url)
+                return _json_response(200, _select_fields(item, query.get('fields')))
+
+        return _error(400, f"Unsupported request: {method} {parts.path}")
+
+    def _upload(self, method, file_id, query, headers, body, base_url):
+        upload_type = query.get('uploadType')
+
+        # Second step of a resumable upload: the content itself
+        if method == 'PUT' and 'upload_id' in query:
+            return self._resume_upload(query['upload_id'], headers, body, base_url)
+
+        if upload_type == 'resumable':
+            upload_id = uuid.uuid4().hex
+            self.sessions[upload_id] = {'file_id': file_id, 'metadata': json.loads(body or b'{}'),
+                                        'fields': query.get('fields'), 'content': bytearray()}
+            location = f"{base_url}upload/drive/v3/files?uploadType=resumable&upload_id={upload_id}"
+            return 200, {'Location': location, 'Content-Length': '0'}, b''
+
+        if upload_type == 'multipart':
+            message = email.parser.BytesParser().parsebytes(
+                b'Content-Type: ' + headers.get('content-type', '').encode('latin1') + b'\r\n\r\n' + body)
+            metadata_part, media_part = message.get_payload()
+            metadata = json.loads(metadata_part.get_payload(decode=True) or b'{}')
+            return self._store_upload(file_id, metadata, media_part.get_payload(decode=True),
+                                      query.get('fields'), base_url)
+
+        if upload_type == 'media':
+            return self._store_upload(file_id, {}, body, query.get('fields'), base_url)
+
+        return _error(400, f"Unsupported uploadType: {upload_type}")
+
+    def _resume_upload(self, upload_id, headers, body, base_url):
+        """
+        Append a chunk to a resumable upload session.
+
+        A PUT without Content-Range carries the whole file. "bytes */N" is a
+        status query (sent by the client after a failed chunk) and is answered
+        like an incomplete chunk: 308 with the Range received so far. The file
+        is only stored, and the session closed, once all N bytes have arrived.
+        """
+        session = self.sessions.get(upload_id)
+        if session is None:
+            return _error(404, 'Unknown upload session')
+        content = session['content']
+
+        content_range = headers.get('content-range')
+        if content_range is None:
+            content[:] = body
+            total = len(content)
+        else:
+            match = CONTENT_RANGE_RE.match(content_range.strip())
+            if not match:
+                return _error(400, f"Invalid Content-Range: {content_range}")
+            first, last, total = match.groups()
+            if first is not None:
+                first, last = int(first), int(last)
+                if first > len(content) or last - first + 1 != len(body):
+                    return _error(400, f"Content-Range {content_range} does not continue at byte {len(content)}")
+                content[first:] = body
+            total = None if total == '*' else int(total)
+
+        if total is None or len(content) < total:
+            response_headers = {'Content-Length': '0'}
+            if content:
+                response_headers['Range'] = f"bytes=0-{len(content) - 1}"
+            return 308, response_headers, b''
+
+        del self.sessions[upload_id]
+        return self._store_upload(session['file_id'], session['metadata'], bytes(content[:total]),
+                                  session['fields'], base_url)
+
+    def _store_upload(self, file_id, metadata, content, fields, base_url):
+        if file_id:
+            item = self._update(file_id, metadata, content)
+        else:
+            item = self._create(metadata, content, base_url)
+        return _json_response(200, _select_fields(item, fields))
+
+    def _batch(self, headers, body, base_url):
+        """Dispatch every part of a multipart/mixed batch request"""
+        content_type = headers.get('content-type', '')
+        message = email.parser.BytesParser().parsebytes(
+            b'Content-Type: ' + content_type.encode('latin1') + b'\r\n\r\n' + body)
+
+        boundary = f"batch_{uuid.uuid4().hex}"
+        out = []
+        for part in message.get_payload():
+            request_text = part.get_payload(decode=False)
+            head, _, part_body = request_text.replace('\r\n', '\n').partition('\n\n')
+            request_line, *header_lines = head.split('\n')
+            part_method, part_url, _ = request_line.split(' ', 2)
+            part_headers = {}
+            for line in header_lines:
+                key, _, value = line.partition(':')
+                part_headers[key.strip().lower()] = value.strip()
+
+            status, response_headers, response_body = self.handle(
+                part_method, part_url, part_headers, part_body.encode('utf-8'), base_url, top_level=False)
+
+            # Unfold the header (the client folds long Content-IDs)
+            content_id = re.sub(r'\r?\n', '', str(part['Content-ID']))
+            out.append(f"--{boundary}\r\nContent-Type: application/http\r\n"
+                       f"Content-ID: <response-{content_id[1:-1]}>\r\n\r\n"
+                       f"HTTP/1.1 {status} {HTTP_REASONS.get(status, 'Unknown')}\r\n")
+            for key, value in response_headers.items():
+                out.append(f"{key}: {value}\r\n")
+            out.append(f"\r\n{response_body.decode('utf-8')}\r\n")
+        out.append(f"--{boundary}--\r\n")
+
+        return 200, {'Content-Type': f"multipart/mixed; boundary={boundary}"}, ''.join(out).encode('utf-8')
+
+
+class FakeDriveHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def _dispatch(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        body = self.rfile.read(length) if length else b''
+        headers = {key.lower(): value for key, value in self.headers.items()}
+        base_url = f"http://{self.server.server_address[0]}:{self.server.server_address[1]}/"
+        status, response_headers, response_body = self.server.store.handle(
+            self.command, self.path, headers, body, base_url)
+
+        self.send_response(status)
+        for key, value in response_headers.items():
+            if key.lower() != 'content-length':
+                self.send_header(key, value)
+        self.send_header('Content-Length', str(len(response_body)))
+        self.end_headers()
+        self.wfile.write(response_body)
+
+    do_GET = do_POST = do_PUT = do_PATCH = do_DELETE = _dispatch
+
+    def log_message(self, format, *args):
+        pass
+
+
+class FakeDriveServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, root_dir, port=0, fail_every=0):
+        self.store = FakeDriveStore(root_dir, fail_every)
+        super().__init__(('127.0.0.1', port), FakeDriveHandler)
+
+    @property
+    def url(self):
+        return f"http://{self.server_address[0]}:{self.server_address[1]}/"
+
+    @property
+    def request_count(self):
+        return self.store.request_count
+
+    def start(self):
+        """Serve in a background thread"""
+        thread = threading.Thread(target=self.serve_forever, daemon=True)
+        thread.start()
+        return self
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Local HTTP stand-in for the Google Drive v3 API')
+    parser.add_argument('root_dir', help='Directory for stored files and metadata')
+    parser.add_argument('--port', type=int, default=8765, help='Port to listen on (default: 8765)')
+    parser.add_argument('--fail-every', type=int, default=0, help='Answer every Nth request with 503')
+    args = parser.parse_args()
+
+    server = FakeDriveServer(args.root_dir, args.port, args.fail_every)
+    print(f"Fake Drive serving {args.root_dir} at {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print(f"Handled {server.request_count} requests")
+
+
+if __name__ == '__main__':
+    main()
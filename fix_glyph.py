@@ -1,160 +1,112 @@
 import os
 from PIL import Image
-import numpy as np
 
-# Step 1: Ensure first line is zeros for all PNG glyphs
+from glyph_transform import load_rules, rule_for, transform_glyphs, list_images, read_image, DEFAULT_RULES
+from png_to_bmp import glyph_indices, write_glyph_bmp
 
-def is_background_pixel(pixel):
-    """Check if a pixel is considered background (black or transparent)"""
-    return np.array_equal(pixel, [0, 0, 0]) or np.array_equal(pixel, [0, 4, 0])
+# Step 1: Ensure first line is zeros for all PNG glyphs
+# The shift tables (width / empty columns -> shift) are the "fix" transform in glyph_rules.json
 
-def find_top_left_pixel(arr):
+def read_indexed_glyph(path):
     """
-    Find the leftmost pixel on the topmost line that contains content.
-    Returns: (top_left_x, top_left_y, rgb_color)
+    Read a glyph as palette indices, the way png_to_bmp reads it.
+    Returns: (uint8 array, palette of a 'P' image or None)
     """
-    height, width = arr.shape[:2]
-    
-    # Find leftmost pixel on topmost line (excluding first line which is zeros)
-    for y in range(1, height):  # Start from line 1 (skip first line)
-        for x in range(width):
-            if not is_background_pixel(arr[y, x]):
-                rgb_color = arr[y, x]
-                return x, y, rgb_color
-    
-    return -1, -1, [0, 0, 0]  # No pixel found
-
-def count_empty_columns(arr):
+    with Image.open(path) as img:
+        palette = img.getpalette() if img.mode == 'P' else None
+        return glyph_indices(img), palette
+
+def fix_glyphs(src_dir, rules_file=DEFAULT_RULES, indexed=False):
     """
-    Count how many columns contain only background pixels (zeros).
-    Returns: number of columns that are completely empty
+    Fix all PNG glyphs of a directory in memory.
+
+    Width 4 glyphs are copied as is, the others get the first line zeroed,
+    empty columns padded/trimmed, then are shifted right and wrapped one line down.
+
+    Args:
+        src_dir: Directory with the glyph PNGs
+        rules_file: Glyph rules file
+        indexed: Keep palette indices (uint8 (H, W) arrays) instead of converting to RGB
+
+    Returns:
+        List of (file name, array, palette or None)
     """
-    height, width = arr.shape[:2]
-    empty_columns = 0
-    
-    for x in range(width):
-        column_is_empty = True
-        for y in range(height):
-            if not is_background_pixel(arr[y, x]):
-                column_is_empty = False
-                break
-        
-        if column_is_empty:
-            empty_columns += 1
-    
-    return empty_columns
-
-def fix_first_line_zeros(src_dir, tgt_dir):
+    rule = rule_for(load_rules(rules_file), 'fix', os.path.basename(os.path.normpath(src_dir)))
+
+    fnames = list_images(src_dir, '.png')
+    arrays = []
+    palettes = []
+    for fname in fnames:
+        if indexed:
+            arr, palette = read_indexed_glyph(os.path.join(src_dir, fname))
+        else:
+            # Convert to RGB if needed
+            arr, palette = read_image(os.path.join(src_dir, fname), 'RGB'), None
+        arrays.append(arr)
+        palettes.append(palette)
+
+    return [(fname, arr, palette)
+            for fname, (arr, _, _), palette in zip(fnames, transform_glyphs(arrays, rule), palettes)]
+
+def glyph_image(arr, palette=None):
+    """Image of a fixed glyph: 'RGB', or 'P' / 'L' for palette indices"""
+    if arr.ndim == 3:
+        return Image.fromarray(arr)
+    height, width = arr.shape
+    img = Image.frombytes('P' if palette else 'L', (width, height), arr.tobytes())
+    if palette:
+        img.putpalette(palette)
+    return img
+
+def save_glyphs(glyphs, tgt_dir):
+    """Save fixed glyphs (from fix_glyphs) as PNG files"""
     if not os.path.exists(tgt_dir):
         os.makedirs(tgt_dir)
-    for fname in os.listdir(src_dir):
-        if fname.lower().endswith('.png'):
-            src_path = os.path.join(src_dir, fname)
-            tgt_path = os.path.join(tgt_dir, fname)
-            img = Image.open(src_path)
-            # Convert to RGB if needed
-            if img.mode != 'RGB':
-                img = img.convert('RGB')
-            arr = np.array(img)
-            width_orig = arr.shape[1]
-            
-            # If width is 4, copy as is without any changes
-            if width_orig == 4:
-                img_fixed = Image.fromarray(arr)
-                img_fixed.save(tgt_path)
-                continue
-            
-            # Set first line to zeros (black RGB)
-            arr[0, :] = [0, 0, 0]  # RGB black
-            empty_cols=count_empty_columns(arr)
-
-            # Adjust columns if needed
-            if empty_cols < 2:
-                # Pad with 4 empty cols (2 left, 2 right)
-                height, width = arr.shape[:2]
-                new_arr = np.zeros((height, width + 4, 3), dtype=arr.dtype)
-                new_arr[:, 2:width+2] = arr
-                arr = new_arr
-                empty_cols = count_empty_columns(arr)
-            elif empty_cols > 5:
-                # Remove cols in multiples of 4 until empty_cols < 6
-                while empty_cols > 5:
-                    cols_to_remove = min(4, ((empty_cols - 5) // 4 + 1) * 4)
-                    left_remove = cols_to_remove // 2
-                    right_remove = cols_to_remove // 2
-                    height, width = arr.shape[:2]
-                    arr = arr[:, left_remove:width-right_remove]
-                    empty_cols = count_empty_columns(arr)
-            
-            width_orig = arr.shape[1]
-            
-            #print(f"Processing {fname}: width={width_orig}, empty_columns={empty_cols}")
-            required_x_left = 0
-            if width_orig >= 12:
-                if empty_cols == 5:
-                    required_x_left=3
-                elif empty_cols == 4:
-                    required_x_left = 3
-                elif empty_cols == 2 or empty_cols == 3:
-                    required_x_left = 4
-            elif width_orig == 8:
-                if empty_cols == 2:
-                    required_x_left = 4
-                elif empty_cols == 3:
-                    required_x_left = 4
-                elif empty_cols == 4:
-                    required_x_left = 3
-                elif empty_cols == 6:
-                    required_x_left = 3
-                elif empty_cols == 5:
-                    required_x_left = 3
-                elif empty_cols == 1:
-                    required_x_left = 4
-
-            #if "098" in fname:
-            #    print(f"Debug: Processing {fname} with width {width_orig} and empty columns {empty_cols} and required_x_left {required_x_left}")
-                
-            # Find top-left pixel
-            top_left_x, top_left_y, rgb_color = find_top_left_pixel(arr)
-            shift_amount = required_x_left
-            
-            # Create a wider bitmap to accommodate the shift
-            height, width = arr.shape[:2]
-            new_width = width + shift_amount
-            wider_arr = np.zeros((height, new_width, 3), dtype=arr.dtype)
-            wider_arr[:, :] = [0, 0, 0]  # Fill with black background
-            
-            # Copy original image shifted to the right
-            wider_arr[:, shift_amount:shift_amount+width] = arr
-            
-            # Cut the right part that extends beyond original width
-            cut_part = wider_arr[:, width:]
-            
-            # Create final array with original dimensions
-            final_arr = np.zeros_like(arr)
-            final_arr[:, :] = [0, 0, 0]
-            
-            # Copy the left part (within original width)
-            final_arr[:, :] = wider_arr[:, :width]
-            
-            # Draw the cut part on x=0 and y+1 (shift down by 1 line)
-            if cut_part.shape[1] > 0:  # If there's actually something to wrap
-                for y in range(height - 1):  # Don't go beyond image bounds
-                    for x in range(min(cut_part.shape[1], width)):
-                        if not is_background_pixel(cut_part[y, x]):
-                            final_arr[y + 1, x] = cut_part[y, x]
-
-            arr = final_arr
-            
-            img_fixed = Image.fromarray(arr)
-            img_fixed.save(tgt_path)
+    for fname, arr, palette in glyphs:
+        glyph_image(arr, palette).save(os.path.join(tgt_dir, fname))
+
+def fix_first_line_zeros(src_dir, tgt_dir, rules_file=DEFAULT_RULES, indexed=False):
+    save_glyphs(fix_glyphs(src_dir, rules_file, indexed), tgt_dir)
+
+def write_bitmaps(glyphs, targets):
+    """
+    Write fixed indexed glyphs straight to font BMPs, without a glyphs_fixed PNG directory.
+
+    Args:
+        glyphs: Result of fix_glyphs(..., indexed=True)
+        targets: List of (palette name, output directory) as for png_to_bmp
+    """
+    for palette_name, output_dir in targets:
+        os.makedirs(output_dir, exist_ok=True)
+        for fname, arr, _ in glyphs:
+            write_glyph_bmp(arr, fname, output_dir, palette_name)
 
 if __name__ == "__main__":
+    import argparse
     import sys
-    if len(sys.argv) != 3:
-        print("Usage: python fix_glyph.py <source_dir> <target_dir>")
+
+    parser = argparse.ArgumentParser(description='Fix PNG glyphs to prepare a font')
+    parser.add_argument('source_dir', help='Directory with the glyph PNGs')
+    parser.add_argument('target_dir', nargs='?', help='Output directory for the fixed PNGs')
+    parser.add_argument('--indexed', action='store_true',
+                        help="Keep palette indices and write 'L'/'P' PNGs instead of RGB")
+    parser.add_argument('--bmp', nargs=2, action='append', default=[], metavar=('PALETTE', 'OUTPUT_DIR'),
+                        help='Also write font BMPs like png_to_bmp.py, straight from memory (repeatable)')
+    parser.add_argument('--rules', default=DEFAULT_RULES, help='Glyph rules file (default: glyph_rules.json)')
+    args = parser.parse_args()
+
+    if not args.target_dir and not args.bmp:
+        parser.error("Give a target directory and/or --bmp PALETTE OUTPUT_DIR")
+    if not os.path.isdir(args.source_dir):
+        print(f"Error: Glyphs directory '{args.source_dir}' not found")
         sys.exit(1)
-    src_dir = sys.argv[1]
-    tgt_dir = sys.argv[2]
-    fix_first_line_zeros(src_dir, tgt_dir)
-    print(f"Processed all PNG files from {src_dir} to {tgt_dir}, first line set to zeros.")
+
+    # The BMP writer takes palette indices, so --bmp implies --indexed
+    glyphs = fix_glyphs(args.source_dir, args.rules, args.indexed or bool(args.bmp))
+    if args.target_dir:
+        save_glyphs(glyphs, args.target_dir)
+        print(f"Processed all PNG files from {args.source_dir} to {args.target_dir}, first line set to zeros.")
+    if args.bmp:
+        write_bitmaps(glyphs, args.bmp)
+        for palette_name, output_dir in args.bmp:
+            print(f"Wrote {palette_name} font bitmaps from {args.source_dir} to {output_dir}")
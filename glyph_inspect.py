@@ -0,0 +1,358 @@
+#!/usr/bin/env python3
+"""
+Glyph inspection: render font bitmaps as text, ANSI color blocks or a PNG contact sheet
+
+Glyphs are read once through a cached reader (keyed by path and mtime, like
+palette.load_palette) and rendered with lookup tables over the whole pixel
+array, so a full font of 200+ glyphs prints instantly. For every glyph the
+summary shows width, height, the colors used and the (0,0) dimension
+encoding (width * height, split over (0,0) and (1,0) when above 255).
+
+Usage:
+    python glyph_inspect.py <bitmaps_dir | bitmap_file> [start_index] [end_index]
+                            [--mode info|values|blocks|ansi] [--palette file.pal]
+                            [--sheet contact_sheet.png] [--scale 4] [--columns 16]
+
+Examples:
+    python glyph_inspect.py castle/bitmaps 96 122 --mode blocks
+    python glyph_inspect.py GAME/bitmaps_27 --sheet font_27.png --palette castled/castled.pal
+    python glyph_inspect.py bitmaps/bitmap_065.bmp --mode values
+"""
+
+import argparse
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from PIL import Image, ImageDraw
+
+DEFAULT_WORKERS = 4
+
+# Process-wide cache: (absolute path, mtime_ns) -> (mode, read-only pixel array)
+_cache = {}
+
+# Text of each 8-bit value, padded like f"{value:3d}"
+VALUE_TEXT = np.array([f"{value:3d}" for value in range(256)])
+
+TEXT_CHAR = "█"
+BACKGROUND_CHAR = "░"
+ENCODING_CHAR = "●"
+
+
+def read_glyph(path):
+    """
+    Read a glyph bitmap, reusing the decoded copy while the file is unchanged.
+
+    Returns:
+        Tuple of (PIL mode, read-only pixel array: (H, W) for indexed/grayscale,
+        (H, W, C) for color images)
+    """
+    path = os.path.abspath(path)
+    key = (path, os.stat(path).st_mtime_ns)
+    glyph = _cache.get(key)
+    if glyph is None:
+        with Image.open(path) as img:
+            arr = np.array(img)
+            mode = img.mode
+        if arr.dtype == bool:
+            arr = arr.astype(np.uint8)
+        arr.setflags(write=False)
+        glyph = (mode, arr)
+        # Drop stale entries for this path
+        for stale_key in [k for k in _cache if k[0] == path]:
+            del _cache[stale_key]
+        _cache[key] = glyph
+    return glyph
+
+
+def glyph_path(bitmaps_dir, index):
+    """Path of bitmap_<index>.bmp (or .png) in a font folder, None if missing"""
+    for ext in ('.bmp', '.png'):
+        path = os.path.join(bitmaps_dir, f"bitmap_{index:03d}{ext}")
+        if os.path.exists(path):
+            return path
+    return None
+
+
+def glyph_indices_in(bitmaps_dir):
+    """Sorted indices of the bitmap_###.bmp/.png files in a font folder"""
+    indices = set()
+    for name in os.listdir(bitmaps_dir):
+        stem, ext = os.path.splitext(name)
+        if ext.lower() in ('.bmp', '.png') and stem.startswith('bitmap_') and stem[7:].isdigit():
+            indices.add(int(stem[7:]))
+    return sorted(indices)
+
+
+def load_glyphs(bitmaps_dir, start_index=None, end_index=None, max_workers=DEFAULT_WORKERS):
+    """
+    Read a range of glyphs of a font folder on a thread pool.
+
+    Missing indices print a warning and unreadable files an error.
+
+    Returns:
+        List of (index, path, mode, array)
+    """
+    if start_index is None:
+        indices = glyph_indices_in(bitmaps_dir)
+    else:
+        indices = range(start_index, (end_index if end_index is not None else start_index) + 1)
+
+    paths = []
+    for index in indices:
+        path = glyph_path(bitmaps_dir, index)
+        if path is None:
+            print(f"Warning: Bitmap {index:03d} not found")
+            continue
+        paths.append((index, path))
+
+    def read(item):
+        try:
+            return read_glyph(item[1]), None
+        except Exception as e:
+            return None, e
+
+    glyphs = []
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        for (index, path), (glyph, error) in zip(paths, pool.map(read, paths)):
+            if error is not None:
+                print(f"Error processing {path}: {error}")
+                continue
+            glyphs.append((index, path) + glyph)
+    return glyphs
+
+
+def dimension_encoding(arr):
+    """
+    Dimension value stored in a glyph: (0,0), plus (1,0) * 256 when width * height > 255.
+
+    Returns:
+        Tuple of (stored value, expected width * height)
+    """
+    height, width = arr.shape[:2]
+    expected = width * height
+    if arr.ndim != 2:
+        return None, expected
+    flat = arr.reshape(-1)
+    stored = int(flat[0])
+    if expected > 255 and flat.size > 1:
+        stored += int(flat[1]) * 256
+    return stored, expected
+
+
+def pixel_list(arr):
+    """Pixels of a glyph as (N,) values (indexed) or (N, C) colors"""
+    return arr.reshape(-1) if arr.ndim == 2 else arr.reshape(-1, arr.shape[-1])
+
+
+def count_pixels(pixels):
+    """
+    Distribution of pixel values of a pixel_list.
+
+    Returns:
+        List of (value, count) sorted by value; values are ints for indexed
+        glyphs and tuples for color glyphs
+    """
+    if pixels.ndim == 1 and pixels.dtype == np.uint8:
+        counts = np.bincount(pixels, minlength=256)
+        values = np.nonzero(counts)[0]
+        return list(zip(values.tolist(), counts[values].tolist()))
+    values, counts = np.unique(pixels, axis=0, return_counts=True)
+    if pixels.ndim == 1:
+        return list(zip(values.tolist(), counts.tolist()))
+    return [(tuple(value), count) for value, count in zip(values.tolist(), counts.tolist())]
+
+
+def color_counts(arr):
+    """Distribution of the pixel values of a glyph (see count_pixels)"""
+    return count_pixels(pixel_list(arr))
+
+
+def glyph_info(arr):
+    """Width, height, colors and dimension encoding of a glyph as a dictionary"""
+    stored, expected = dimension_encoding(arr)
+    # The encoding pixels aren't glyph colors
+    skip = 0 if stored is None else 2 if expected > 255 else 1
+    return {
+        'width': arr.shape[1],
+        'height': arr.shape[0],
+        'colors': [value for value, _ in count_pixels(pixel_list(arr)[skip:])],
+        'encoding': stored,
+        'encoding_ok': stored == expected,
+    }
+
+
+def join_chars(chars):
+    """Join a (H, W) array of strings into lines"""
+    return "\n".join("".join(row) for row in chars.tolist())
+
+
+def render_values(arr):
+    """Pixel grid with the actual values: 3 columns per indexed pixel, (R, G, B) for color"""
+    if arr.ndim == 2 and arr.dtype == np.uint8:
+        cells = VALUE_TEXT[arr]
+    elif arr.ndim == 2:
+        cells = np.char.mod('%3d', arr)
+    else:
+        text = np.char.mod('%d', arr)
+        cells = text[..., 0]
+        for channel in range(1, arr.shape[-1]):
+            cells = np.char.add(np.char.add(cells, ', '), text[..., channel])
+        cells = np.char.ljust(np.char.add(np.char.add('(', cells), ')'), 15)
+    return "\n".join(" ".join(row) for row in cells.tolist())
+
+
+def render_mask(mask, marker=None):
+    """
+    Blocks for a boolean mask (█ = True, ░ = False).
+
+    Args:
+        marker: Optional (y, x) drawn as ● (the dimension encoding pixel)
+    """
+    chars = np.where(mask, TEXT_CHAR, BACKGROUND_CHAR)
+    if marker is not None:
+        chars[marker] = ENCODING_CHAR
+    return join_chars(chars)
+
+
+def ansi_table(palette=None):
+    """ANSI 24-bit background escape + two spaces for each of the 256 indices"""
+    rgb = palette.rgb if palette is not None else np.repeat(np.arange(256, dtype=np.uint8), 3).reshape(256, 3)
+    return np.array([f"\x1b[48;2;{r};{g};{b}m  " for r, g, b in rgb.tolist()])
+
+
+def render_ansi(arr, table):
+    """Colored blocks of an indexed glyph (see ansi_table)"""
+    reset = "\x1b[0m"
+    return "\n".join("".join(row) + reset for row in table[arr].tolist())
+
+
+def glyph_header(index, path, arr):
+    """One summary line per glyph"""
+    info = glyph_info(arr)
+    status = "ok" if info['encoding_ok'] else f"expected {info['width'] * info['height']}"
+    colors = " ".join(str(color) for color in info['colors'])
+    name = f"{index:03d}" if index is not None else os.path.basename(path)
+    return (f"{name}: {info['width']}x{info['height']}, (0,0) encoding {info['encoding']} ({status}), "
+            f"colors: {colors}")
+
+
+def render_glyphs(glyphs, mode='info', palette=None):
+    """
+    Render many glyphs as one string.
+
+    Args:
+        glyphs: List of (index, path, mode, array) from load_glyphs
+        mode: 'info' (summary lines only), 'values', 'blocks' (non-zero pixels) or 'ansi'
+        palette: Palette for the ansi mode (default: grayscale)
+    """
+    table = ansi_table(palette) if mode == 'ansi' else None
+    parts = []
+    for index, path, _, arr in glyphs:
+        parts.append(glyph_header(index, path, arr))
+        if mode == 'values':
+            parts.append(render_values(arr))
+        elif mode == 'blocks':
+            content = arr.any(axis=-1) if arr.ndim == 3 else arr != 0
+            if arr.ndim == 2:
+                # The encoding pixels aren't glyph pixels
+                content = content.copy()
+                content.reshape(-1)[:2 if arr.size > 255 else 1] = False
+            parts.append(render_mask(content, (0, 0)))
+        elif mode == 'ansi' and arr.ndim == 2:
+            parts.append(render_ansi(arr, table))
+        if mode != 'info':
+            parts.append("")
+    return "\n".join(parts)
+
+
+def contact_sheet(glyphs, palette=None, scale=4, columns=16, background=255):
+    """
+    Render glyphs in one image, each in a cell labelled with its index.
+
+    Args:
+        glyphs: List of (index, path, mode, array) from load_glyphs (indexed glyphs)
+        palette: Palette to color the indices (default: grayscale)
+        scale: Pixel size of a glyph pixel
+        columns: Glyphs per row
+        background: Palette index shown between cells
+
+    Returns:
+        PIL RGB image
+    """
+    arrays = [arr if arr.ndim == 2 else np.asarray(Image.fromarray(arr).convert('L')) for _, _, _, arr in glyphs]
+    cell_height = max(arr.shape[0] for arr in arrays) + 2
+    cell_width = max(arr.shape[1] for arr in arrays) + 2
+    label_height = 12
+    rows = -(-len(arrays) // columns)
+
+    # Paste every glyph into an index grid, then color it with one palette lookup
+    grid = np.full((rows * cell_height, columns * cell_width), background, dtype=np.uint8)
+    for i, arr in enumerate(arrays):
+        top = (i // columns) * cell_height + 1
+        left = (i % columns) * cell_width + 1
+        grid[top:top + arr.shape[0], left:left + arr.shape[1]] = arr
+
+    rgb = palette.rgb if palette is not None else np.repeat(np.arange(256, dtype=np.uint8), 3).reshape(256, 3)
+    colored = rgb[grid].repeat(scale, axis=0).repeat(scale, axis=1)
+
+    # Leave room for a label under every row of cells
+    row_height = cell_height * scale
+    sheet = np.full((rows * (row_height + label_height), columns * cell_width * scale, 3), 255, dtype=np.uint8)
+    for row in range(rows):
+        top = row * (row_height + label_height)
+        sheet[top:top + row_height] = colored[row * row_height:(row + 1) * row_height]
+
+    img = Image.fromarray(sheet)
+    draw = ImageDraw.Draw(img)
+    for i, (index, path, _, _) in enumerate(glyphs):
+        label = f"{index:03d}" if index is not None else os.path.basename(path)
+        draw.text(((i % columns) * cell_width * scale + 2,
+                   (i // columns) * (row_height + label_height) + row_height),
+                  label, fill=(0, 0, 0))
+    return img
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Inspect font glyph bitmaps')
+    parser.add_argument('source', help='Font bitmaps folder or a single bitmap file')
+    parser.add_argument('start_index', nargs='?', type=int, help='First glyph index (default: all)')
+    parser.add_argument('end_index', nargs='?', type=int, help='Last glyph index (default: start_index)')
+    parser.add_argument('--mode', choices=['info', 'values', 'blocks', 'ansi'], default='info',
+                        help='Text rendering (default: info)')
+    parser.add_argument('--palette', help='Palette for ansi mode and the contact sheet')
+    parser.add_argument('--sheet', help='Also write a PNG contact sheet')
+    parser.add_argument('--scale', type=int, default=4, help='Contact sheet pixel size (default: 4)')
+    parser.add_argument('--columns', type=int, default=16, help='Contact sheet glyphs per row (default: 16)')
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS,
+                        help=f'Number of parallel workers (default: {DEFAULT_WORKERS})')
+    args = parser.parse_args()
+
+    if not os.path.exists(args.source):
+        print(f"Error: '{args.source}' not found")
+        sys.exit(1)
+
+    if os.path.isdir(args.source):
+        glyphs = load_glyphs(args.source, args.start_index, args.end_index, args.workers)
+    else:
+        glyphs = [(None, args.source) + read_glyph(args.source)]
+
+    if not glyphs:
+        print("No glyphs found")
+        sys.exit(1)
+
+    palette = None
+    if args.palette:
+        from palette import load_palette
+        palette = load_palette(args.palette)
+
+    print(render_glyphs(glyphs, args.mode, palette))
+
+    if args.sheet:
+        contact_sheet(glyphs, palette, args.scale, args.columns).save(args.sheet)
+        print(f"Saved contact sheet of {len(glyphs)} glyphs to {args.sheet}")
+
+
+if __name__ == "__main__":
+    main()
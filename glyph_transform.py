@@ -0,0 +1,296 @@
+#!/usr/bin/env python3
+"""
+Glyph transform engine shared by fix_glyph.py and reverse_glyph.py
+
+Both tools normalize a glyph the same way, in opposite directions:
+- fix: shift right, the columns pushed out on the right wrap to the left
+  side one row down (PNG glyph sets -> game bitmaps)
+- reverse: shift left, the columns pushed out on the left wrap to the right
+  side one row up (game bitmaps -> drawable glyphs)
+
+How far to shift depends on the glyph width and its number of empty
+(background only) columns. These tables live in glyph_rules.json:
+
+    {"transforms": {"fix": {...}, "reverse": {...}},
+     "fonts": {"glyphs_32_46": {"fix": {"shifts": [...]}}}}
+
+A transform rule has:
+    direction          "right" or "left"
+    clear_first_row    true to clear the whole first row, or a number of pixels
+    skip_widths        glyph widths copied unchanged
+    min_empty_columns  pad pad_columns (half each side) if fewer empty columns
+    max_empty_columns  trim trim_columns (half each side) while more empty columns
+    shifts             list of {"width"|"min_width": n, "empty_columns": {count: shift}},
+                       the first entry matching the width is used
+"fonts" overrides keys of a transform for one glyph set (source directory name).
+
+The engine works on stacks of glyphs, (N, H, W) palette indices or
+(N, H, W, C) colors. Background is index 0, or black / (0, 4, 0) for colors.
+
+Usage:
+    python glyph_transform.py --fix <src_dir> <tgt_dir> [--fix ...] [--reverse <src_dir> <tgt_dir> ...]
+                              [--rules glyph_rules.json] [--workers 4]
+
+Example:
+    python glyph_transform.py --fix glyphs_24_38 glyphs_fixed_27 --fix glyphs_24_38 glyphs_fixed_36
+"""
+
+import argparse
+import copy
+import json
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from PIL import Image
+
+DEFAULT_RULES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'glyph_rules.json')
+DEFAULT_WORKERS = 4
+
+# Background colors of RGB glyphs
+RGB_BACKGROUND = ((0, 0, 0), (0, 4, 0))
+
+
+def load_rules(rules_file=DEFAULT_RULES):
+    """Load the glyph rules file"""
+    with open(rules_file, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def rule_for(rules, transform, font_name=None):
+    """
+    Rule of a transform ('fix' or 'reverse'), with the overrides of a glyph set applied.
+    """
+    if transform not in rules['transforms']:
+        raise ValueError(f"Unknown transform: {transform}")
+    rule = copy.deepcopy(rules['transforms'][transform])
+    rule.update(rules.get('fonts', {}).get(font_name, {}).get(transform, {}))
+    return rule
+
+
+def shift_for(rule, width, empty_cols):
+    """Shift amount for a glyph width and number of empty columns (0 if no entry)"""
+    for entry in rule.get('shifts', []):
+        if 'width' in entry and width != entry['width']:
+            continue
+        if 'min_width' in entry and width < entry['min_width']:
+            continue
+        return entry['empty_columns'].get(str(empty_cols), 0)
+    return 0
+
+
+def background_mask(stack):
+    """Boolean mask of background pixels of a (N, H, W) or (N, H, W, C) stack"""
+    if stack.ndim == 3:
+        return stack == 0
+    colors = stack[..., :3]
+    mask = np.zeros(stack.shape[:3], dtype=bool)
+    for color in RGB_BACKGROUND:
+        mask |= (colors == color).all(axis=-1)
+    return mask
+
+
+def count_empty_columns(stack):
+    """Number of background-only columns of every glyph in a stack, shape (N,)"""
+    content = ~background_mask(stack)
+    return stack.shape[2] - np.count_nonzero(content.any(axis=1), axis=-1)
+
+
+def shift_wrap(stack, shift, direction):
+    """
+    Shift every glyph of a stack and wrap the columns pushed out to the other side.
+
+    right: shift right, wrapped columns go to the left side one row down
+    left:  shift left, wrapped columns go to the right side one row up
+
+    Vacated columns are background (0); background pixels are not wrapped.
+
+    Returns:
+        New stack of the same shape
+    """
+    width = stack.shape[2]
+    shift = min(shift, width)
+    if shift <= 0:
+        return stack.copy()
+
+    out = np.zeros_like(stack)
+    background = background_mask(stack)
+    if direction == 'right':
+        out[:, :, shift:] = stack[:, :, :width - shift]
+        wrapped = stack[:, :-1, width - shift:]
+        keep = ~background[:, :-1, width - shift:]
+        target = out[:, 1:, :shift]
+    elif direction == 'left':
+        out[:, :, :width - shift] = stack[:, :, shift:]
+        wrapped = stack[:, 1:, :shift]
+        keep = ~background[:, 1:, :shift]
+        target = out[:, :-1, width - shift:]
+    else:
+        raise ValueError(f"Unknown direction: {direction}")
+    target[keep] = wrapped[keep]
+    return out
+
+
+def clear_first_row(arr, rule):
+    """Clear the first row of a glyph in place (whole row or the first n pixels)"""
+    clear = rule.get('clear_first_row')
+    if clear is True:
+        arr[0] = 0
+    elif clear:
+        arr[0, :clear] = 0
+    return arr
+
+
+def prepare_glyph(arr, rule):
+    """
+    Clear the first row and pad/trim empty columns of one glyph.
+
+    Returns:
+        Tuple of (new array, empty columns) or (None, None) for skipped widths
+    """
+    if arr.shape[1] in rule.get('skip_widths', []):
+        return None, None
+
+    arr = clear_first_row(arr.copy(), rule)
+
+    empty_cols = int(count_empty_columns(arr[None])[0])
+
+    if 'min_empty_columns' in rule and empty_cols < rule['min_empty_columns']:
+        pad = rule['pad_columns']
+        padded = np.zeros((arr.shape[0], arr.shape[1] + pad) + arr.shape[2:], dtype=arr.dtype)
+        padded[:, pad // 2:pad // 2 + arr.shape[1]] = arr
+        arr = padded
+        empty_cols = int(count_empty_columns(arr[None])[0])
+    elif 'max_empty_columns' in rule:
+        trim = rule['trim_columns']
+        while empty_cols > rule['max_empty_columns']:
+            arr = arr[:, trim // 2:arr.shape[1] - trim // 2]
+            empty_cols = int(count_empty_columns(arr[None])[0])
+
+    return arr, empty_cols
+
+
+def transform_glyphs(arrays, rule):
+    """
+    Apply a transform rule to many glyphs.
+
+    Glyphs are prepared one by one (their widths may change), then glyphs
+    with the same shape and shift are shifted and wrapped as one stack.
+
+    Args:
+        arrays: List of (H, W) or (H, W, C) arrays
+        rule: Transform rule (see rule_for)
+
+    Returns:
+        List of (array, empty_cols, shift); skipped glyphs are returned
+        unchanged with empty_cols None
+    """
+    results = [None] * len(arrays)
+    groups = {}
+    for i, arr in enumerate(arrays):
+        prepared, empty_cols = prepare_glyph(arr, rule)
+        if prepared is None:
+            results[i] = (arr, None, 0)
+            continue
+        shift = shift_for(rule, prepared.shape[1], empty_cols)
+        groups.setdefault((prepared.shape, shift), []).append((i, prepared, empty_cols))
+
+    for (_, shift), members in groups.items():
+        stack = shift_wrap(np.stack([prepared for _, prepared, _ in members]), shift, rule['direction'])
+        for (i, _, empty_cols), arr in zip(members, stack):
+            results[i] = (arr, empty_cols, shift)
+    return results
+
+
+def transform_array(arr, rule):
+    """Apply a transform rule to one glyph, returns (array, empty_cols, shift)"""
+    return transform_glyphs([arr], rule)[0]
+
+
+def list_images(src_dir, extension):
+    """Sorted file names with an extension in a directory"""
+    return sorted(name for name in os.listdir(src_dir) if name.lower().endswith(extension))
+
+
+def read_image(path, mode=None):
+    """Read an image as an array, optionally converting it first"""
+    with Image.open(path) as img:
+        if mode and img.mode != mode:
+            img = img.convert(mode)
+        return np.array(img, dtype=np.uint8)
+
+
+def run_transforms(tasks, rules, max_workers=DEFAULT_WORKERS, read_mode=None, extensions=None):
+    """
+    Run several transform tasks on one worker pool, decoding every source file once.
+
+    Args:
+        tasks: List of (transform, src_dir, tgt_dir)
+        rules: Loaded rules (see load_rules)
+        max_workers: Number of threads used to decode and encode files
+        read_mode: Dictionary transform -> PIL mode to convert to when reading (optional)
+        extensions: Dictionary transform -> file extension (default .png for fix, .bmp for reverse)
+
+    Returns:
+        Dictionary tgt_dir -> number of files written
+    """
+    extensions = extensions or {'fix': '.png', 'reverse': '.bmp'}
+    read_mode = read_mode or {}
+
+    jobs = []
+    for transform, src_dir, tgt_dir in tasks:
+        names = list_images(src_dir, extensions[transform])
+        jobs.append((transform, src_dir, tgt_dir, names))
+
+    # Decode each (file, mode) once even if several tasks use the same source
+    sources = sorted({(os.path.join(src_dir, name), read_mode.get(transform))
+                      for transform, src_dir, _, names in jobs for name in names})
+
+    written = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        decoded = dict(zip(sources, pool.map(lambda source: read_image(*source), sources)))
+
+        outputs = []
+        for transform, src_dir, tgt_dir, names in jobs:
+            os.makedirs(tgt_dir, exist_ok=True)
+            rule = rule_for(rules, transform, os.path.basename(os.path.normpath(src_dir)))
+            arrays = [decoded[(os.path.join(src_dir, name), read_mode.get(transform))] for name in names]
+            for name, (arr, _, _) in zip(names, transform_glyphs(arrays, rule)):
+                outputs.append((os.path.join(tgt_dir, name), arr))
+            written[tgt_dir] = len(names)
+
+        list(pool.map(lambda output: Image.fromarray(output[1]).save(output[0]), outputs))
+
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run fix/reverse glyph transforms on one worker pool')
+    parser.add_argument('--fix', nargs=2, action='append', default=[], metavar=('SRC_DIR', 'TGT_DIR'),
+                        help='Fix PNG glyphs (shift right, wrap down)')
+    parser.add_argument('--reverse', nargs=2, action='append', default=[], metavar=('SRC_DIR', 'TGT_DIR'),
+                        help='Reverse BMP glyphs (shift left, wrap up)')
+    parser.add_argument('--rules', default=DEFAULT_RULES, help='Rules file (default: glyph_rules.json)')
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS,
+                        help=f'Number of parallel workers (default: {DEFAULT_WORKERS})')
+    args = parser.parse_args()
+
+    tasks = [('fix', src, tgt) for src, tgt in args.fix] + [('reverse', src, tgt) for src, tgt in args.reverse]
+    if not tasks:
+        parser.error("Nothing to do, give at least one --fix or --reverse")
+
+    for _, src_dir, _ in tasks:
+        if not os.path.isdir(src_dir):
+            print(f"Error: Input directory '{src_dir}' not found")
+            sys.exit(1)
+
+    rules = load_rules(args.rules)
+    # fix_glyph works on RGB glyphs
+    written = run_transforms(tasks, rules, args.workers, read_mode={'fix': 'RGB'})
+    for tgt_dir, count in written.items():
+        print(f"Wrote {count} files to {tgt_dir}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+Letter sheet segmentation without OpenCV
+
+Finds the glyphs of a letter sheet (e.g. a whole Hebrew alphabet drawn in one
+PNG) with a NumPy connected-component pass:
+1. Threshold the image and run-length encode the foreground rows
+2. Join runs that touch in consecutive rows (8-connectivity) with a small
+   union-find over runs, so every component gets a label
+3. Build a bounding-box table (x0, y0, x1, y1, area) for all components
+4. Group components that belong to one glyph (the dots of ':' or '!', the
+   leg of a ק) when they overlap horizontally on the same text line
+5. Order glyphs by line, right to left within a line (Hebrew order)
+
+Any number of glyphs is handled, final forms and punctuation included.
+
+Usage:
+    python letter_sheet.py <sheet_image> [--threshold 128] [--gap 0] [--left-to-right]
+"""
+
+import argparse
+import os
+import sys
+
+import numpy as np
+from PIL import Image
+
+DEFAULT_THRESHOLD = 128
+
+# Columns of the bounding-box tables
+X0, Y0, X1, Y1, AREA = range(5)
+
+
+def foreground_mask(gray, threshold=DEFAULT_THRESHOLD):
+    """Foreground (letter) pixels: values above the threshold"""
+    return np.asarray(gray) > threshold
+
+
+def find_runs(mask):
+    """
+    Horizontal foreground runs of a mask.
+
+    Returns:
+        Tuple of (rows, starts, ends) arrays, ends exclusive, ordered by row then start
+    """
+    height, width = mask.shape
+    padded = np.zeros((height, width + 2), dtype=np.int8)
+    padded[:, 1:-1] = mask
+    edges = np.diff(padded, axis=1)
+    rows, starts = np.nonzero(edges == 1)
+    _, ends = np.nonzero(edges == -1)
+    return rows, starts, ends
+
+
+def _find(parent, i):
+    """Root of a run in the union-find forest (with path halving)"""
+    while parent[i] != i:
+        parent[i] = parent[parent[i]]
+        i = parent[i]
+    return i
+
+
+def label_runs(rows, starts, ends):
+    """
+    Component label of every run (8-connectivity).
+
+    Two runs on consecutive rows are connected when their column ranges
+    overlap or touch diagonally.
+
+    Returns:
+        (number of runs,) array of labels 0..count-1, and the count
+    """
+    run_count = len(rows)
+    parent = list(range(run_count))
+    row_bounds = np.searchsorted(rows, np.arange(rows.max() + 2)) if run_count else np.zeros(1, dtype=int)
+
+    for row in range(len(row_bounds) - 2):
+        a0, a1 = row_bounds[row], row_bounds[row + 1]
+        b0, b1 = row_bounds[row + 1], row_bounds[row + 2]
+        if a0 == a1 or b0 == b1:
+            continue
+        # Runs of the next row overlapping [start - 1, end] of each run of this row
+        next_starts, next_ends = starts[b0:b1], ends[b0:b1]
+        first = np.searchsorted(next_ends, starts[a0:a1], side='left')
+        last = np.searchsorted(next_starts, ends[a0:a1], side='right')
+        for a, lo, hi in zip(range(a0, a1), first.tolist(), last.tolist()):
+            for b in range(b0 + lo, b0 + hi):
+                root_a, root_b = _find(parent, a), _find(parent, b)
+                if root_a != root_b:
+                    parent[max(root_a, root_b)] = min(root_a, root_b)
+
+    roots = np.array([_find(parent, i) for i in range(run_count)], dtype=np.intp)
+    unique_roots, labels = np.unique(roots, return_inverse=True)
+    return labels.reshape(-1), len(unique_roots)
+
+
+def component_boxes(mask):
+    """
+    Bounding-box table of the connected components of a mask.
+
+    Returns:
+        (count, 5) int array of x0, y0, x1, y1 (exclusive) and pixel area
+    """
+    rows, starts, ends = find_runs(mask)
+    labels, count = label_runs(rows, starts, ends)
+
+    boxes = np.empty((count, 5), dtype=np.int64)
+    boxes[:, [X0, Y0]] = np.iinfo(np.int64).max
+    boxes[:, [X1, Y1]] = 0
+    np.minimum.at(boxes[:, X0], labels, starts)
+    np.minimum.at(boxes[:, Y0], labels, rows)
+    np.maximum.at(boxes[:, X1], labels, ends)
+    np.maximum.at(boxes[:, Y1], labels, rows + 1)
+    boxes[:, AREA] = np.bincount(labels, weights=ends - starts, minlength=count)
+    return boxes
+
+
+def text_lines(mask):
+    """
+    Row ranges of the text lines of a sheet (bands of rows with foreground).
+
+    Returns:
+        (lines, 2) array of y0, y1 (exclusive)
+    """
+    has_ink = np.zeros(mask.shape[0] + 2, dtype=np.int8)
+    has_ink[1:-1] = mask.any(axis=1)
+    edges = np.diff(has_ink)
+    return np.column_stack([np.nonzero(edges == 1)[0], np.nonzero(edges == -1)[0]])
+
+
+def group_boxes(boxes, lines, gap=0):
+    """
+    Merge the components of multi-part glyphs.
+
+    Components on the same text line whose column ranges overlap become one
+    glyph; with gap > 0, parts less than gap columns apart are merged too.
+
+    Returns:
+        (glyphs, 5) table of merged boxes, ordered by line then x0
+    """
+    if len(boxes) == 0:
+        return boxes
+    line_of = np.searchsorted(lines[:, 1], boxes[:, Y0], side='right')
+    order = np.lexsort((boxes[:, X0], line_of))
+    boxes, line_of = boxes[order], line_of[order]
+
+    # A new glyph starts on a new line, or when no box to its left reaches it
+    new_glyph = np.ones(len(boxes), dtype=bool)
+    for line in np.unique(line_of):
+        members = np.nonzero(line_of == line)[0]
+        reach = np.maximum.accumulate(boxes[members, X1])
+        new_glyph[members[1:]] = boxes[members[1:], X0] >= reach[:-1] + gap
+
+    first = np.nonzero(new_glyph)[0]
+    glyphs = np.empty((len(first), 5), dtype=np.int64)
+    glyphs[:, X0] = np.minimum.reduceat(boxes[:, X0], first)
+    glyphs[:, Y0] = np.minimum.reduceat(boxes[:, Y0], first)
+    glyphs[:, X1] = np.maximum.reduceat(boxes[:, X1], first)
+    glyphs[:, Y1] = np.maximum.reduceat(boxes[:, Y1], first)
+    glyphs[:, AREA] = np.add.reduceat(boxes[:, AREA], first)
+    return glyphs
+
+
+def find_glyphs(gray, threshold=DEFAULT_THRESHOLD, gap=0, right_to_left=True):
+    """
+    Glyph boxes of a letter sheet in reading order.
+
+    Args:
+        gray: (height, width) grayscale array
+        threshold: Pixels above it are letter pixels
+        gap: Also merge parts less than gap columns apart
+        right_to_left: Hebrew order within a line (default) instead of left to right
+
+    Returns:
+        (glyphs, 5) table of x0, y0, x1, y1, area
+    """
+    mask = foreground_mask(gray, threshold)
+    lines = text_lines(mask)
+    glyphs = group_boxes(component_boxes(mask), lines, gap)
+    if len(glyphs) == 0:
+        return glyphs
+    line_of = np.searchsorted(lines[:, 1], glyphs[:, Y0], side='right')
+    center_x = (glyphs[:, X0] + glyphs[:, X1]) // 2
+    order = np.lexsort((-center_x if right_to_left else center_x, line_of))
+    return glyphs[order]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='List the glyphs found in a letter sheet')
+    parser.add_argument('sheet_image', help='Letter sheet image')
+    parser.add_argument('--threshold', type=int, default=DEFAULT_THRESHOLD,
+                        help=f'Letter pixels are above this value (default: {DEFAULT_THRESHOLD})')
+    parser.add_argument('--gap', type=int, default=0, help='Also merge glyph parts less than this many columns apart (default: 0)')
+    parser.add_argument('--left-to-right', action='store_true', help='Order glyphs left to right')
+    args = parser.parse_args()
+
+    if not os.path.exists(args.sheet_image):
+        print(f"Error: Image '{args.sheet_image}' not found")
+        sys.exit(1)
+
+    with Image.open(args.sheet_image) as img:
+        gray = np.array(img.convert('L'))
+    glyphs = find_glyphs(gray, args.threshold, args.gap, not args.left_to_right)
+
+    print(f"Sheet: {gray.shape[1]}x{gray.shape[0]}, {len(glyphs)} glyphs")
+    for i, (x0, y0, x1, y1, area) in enumerate(glyphs.tolist()):
+        print(f"  Glyph {i + 1:2d}: area={area:4d}, bbox=({x0:3d},{y0:2d},{x1 - x0:2d},{y1 - y0:2d})")
+
+
+if __name__ == "__main__":
+    main()
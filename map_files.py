@@ -4,14 +4,118 @@ File Mapper Script
 Maps corresponding lines from two input files and creates a mapping output file.
 The second file will be processed with text splitting using the specified max_length.
 
-Usage: python map_files.py <input1> <input2> <output> [max_length]
+Usage: python map_files.py <input1> <input2> <output> [max_length] [--tm <db>]
 """
 
 import sys
 import os
 from split_text import split_string
+from check_alignment import align, aligned_pairs, print_report, IGNORE_PREFIX
+from text_normalize import normalize_key
 
-def map_files(input1_path, input2_path, output_path, max_length):
+def is_untranslated(line2):
+    """True when the Hebrew side is missing or blank"""
+    return line2 is None or not line2.strip()
+
+
+def is_ignored(line2):
+    """True for ###IGNORE### lines: excluded by the translator on purpose"""
+    return line2 is not None and line2.startswith(IGNORE_PREFIX)
+
+
+def sync_translation_memory(tm_path, pairs, scene):
+    """
+    Store translated pairs in the translation memory and fill untranslated
+    English lines from it (translations from other scenes). ###IGNORE###
+    lines are neither stored nor filled, they stay excluded from the mapping.
+
+    Returns:
+        New list of pairs
+    """
+    from translation_memory import TranslationMemory
+
+    with TranslationMemory(tm_path) as tm:
+        stored = tm.add_many(((line1, line2) for line1, line2 in pairs
+                              if line1.strip() and not is_untranslated(line2) and not is_ignored(line2)), scene)
+        missing = [line1 for line1, line2 in pairs if line1.strip() and is_untranslated(line2)]
+        found = tm.lookup_many(missing)
+
+    reused = 0
+    filled = []
+    for line1, line2 in pairs:
+        if line1.strip() and is_untranslated(line2):
+            hebrew = found.get(normalize_key(line1))
+            if hebrew is not None:
+                line2 = hebrew
+                reused += 1
+        filled.append((line1, line2))
+
+    print(f"Translation memory: stored {stored} entries, reused {reused} of {len(missing)} untranslated lines")
+    return filled
+
+
+def pair_lines(lines1, lines2, input1_path, input2_path):
+    """
+    Pair English and Hebrew lines. When the line counts differ the files are
+    aligned with check_alignment instead of being truncated; English lines
+    missing in Hebrew are paired with None.
+    """
+    # Check if files have the same number of lines
+    if len(lines1) == len(lines2):
+        return list(zip(lines1, lines2))
+
+    print(f"Warning: Files have different number of lines!")
+    print(f"File 1: {len(lines1)} lines")
+    print(f"File 2: {len(lines2)} lines")
+    result = align(lines1, lines2)
+    print_report(result, input1_path, input2_path)
+    if result['ops'] is None:
+        print("Error: Could not align files, fix them with check_alignment.py")
+        sys.exit(1)
+    # Map along the alignment instead of truncating
+    return list(aligned_pairs(lines1, lines2, result))
+
+
+def mapping_entries(pairs, max_length, output_path):
+    """
+    Yield the mapping file entries for (english, hebrew) pairs:
+    None for a case separator, or (english, hebrew split for display).
+    
+    Args:
+        pairs: List of (english, hebrew) tuples
+        max_length: Maximum length for text splitting
+        output_path: Mapping file path (the 500 messages use a shorter line)
+    """
+    for line1, line2 in pairs:
+        # English lines missing in Hebrew are skipped like ###IGNORE### lines
+        if line2 is None:
+            continue
+
+        # Skip lines that start with ###IGNORE### in the Hebrew file
+        if is_ignored(line2):
+            continue
+        
+        # Handle empty lines - if both lines are empty, write empty line
+        if not line1.strip() and not line2.strip():
+            yield None
+            continue
+
+        # Handle cases where only one line is empty
+        if not line1.strip():
+            line1 = ""
+        if not line2.strip():
+            line2 = ""
+        
+        # Write the mapping
+        if "500" in output_path and not "5000" in output_path:
+            #line2 = split_string(line2, 100000, False)
+            line2 = split_string(line2, 22, False)
+        else:
+            line2 = split_string(line2, max_length, False)
+        yield line1, line2
+
+
+def map_files(input1_path, input2_path, output_path, max_length, tm_path=None):
     """
     Read two input files and create a mapping file.
     
@@ -20,6 +124,7 @@ def map_files(input1_path, input2_path, output_path, max_length):
         input2_path: Path to second input file  
         output_path: Path to output mapping file
         max_length: Maximum length for text splitting
+        tm_path: Optional translation memory database to populate and query
     """
     try:
         # Read both input files
@@ -29,46 +134,25 @@ def map_files(input1_path, input2_path, output_path, max_length):
         with open(input2_path, 'r', encoding='utf-8') as f2:
             lines2 = f2.readlines()
         
-        # Check if files have the same number of lines
-        if len(lines1) != len(lines2):
-            print(f"Warning: Files have different number of lines!")
-            print(f"File 1: {len(lines1)} lines")
-            print(f"File 2: {len(lines2)} lines")
-            print("Proceeding with minimum number of lines...")
-        
-        # Use the minimum number of lines
-        min_lines = min(len(lines1), len(lines2))
-        
+        lines1 = [line.rstrip('\n\r') for line in lines1]  # Remove newlines but keep content
+        lines2 = [line.rstrip('\n\r') for line in lines2]
+
+        pairs = pair_lines(lines1, lines2, input1_path, input2_path)
+
+        if tm_path:
+            scene = os.path.basename(input1_path).split('_')[0]
+            pairs = sync_translation_memory(tm_path, pairs, scene)
+
         # Create the mapping file
         with open(output_path, 'w', encoding='utf-8') as output_file:
-            for i in range(min_lines):
-                line1 = lines1[i].rstrip('\n\r')  # Remove newlines but keep content
-                line2 = lines2[i].rstrip('\n\r')  # Remove newlines but keep content
-                
-                # Skip lines that start with ###IGNORE### in the Hebrew file
-                if line2.startswith('###IGNORE###'):
-                    continue
-                
-                # Handle empty lines - if both lines are empty, write empty line
-                if not line1.strip() and not line2.strip():
+            for entry in mapping_entries(pairs, max_length, output_path):
+                if entry is None:
                     output_file.write("\n")
                 else:
-                    # Handle cases where only one line is empty
-                    if not line1.strip():
-                        line1 = ""
-                    if not line2.strip():
-                        line2 = ""
-                    
-                    # Write the mapping
-                    if "500" in output_path and not "5000" in output_path:
-                        #line2 = split_string(line2, 100000, False)
-                        line2 = split_string(line2, 22, False)
-                    else:
-                        line2 = split_string(line2, max_length, False)
-                    output_file.write(f"{line1} === {line2}\n")
+                    output_file.write(f"{entry[0]} === {entry[1]}\n")
         
         print(f"Mapping file created successfully: {output_path}")
-        print(f"Processed {min_lines} lines")
+        print(f"Processed {len(pairs)} lines")
         
     except FileNotFoundError as e:
         print(f"Error: Could not find input file - {e}")
@@ -82,28 +166,42 @@ def map_files(input1_path, input2_path, output_path, max_length):
 
 def main():
     """Main function to handle command line arguments"""
-    if len(sys.argv) not in [4, 5]:
-        print("Usage: python map_files.py <input1> <input2> <output> [max_length]")
+    argv = sys.argv[1:]
+
+    # Optional translation memory database
+    tm_path = None
+    if '--tm' in argv:
+        index = argv.index('--tm')
+        if index + 1 >= len(argv):
+            print("Error: --tm requires a database path")
+            sys.exit(1)
+        tm_path = argv[index + 1]
+        del argv[index:index + 2]
+
+    if len(argv) not in [3, 4]:
+        print("Usage: python map_files.py <input1> <input2> <output> [max_length] [--tm <db>]")
         print()
         print("Arguments:")
         print("  input1     - Path to first input text file")
         print("  input2     - Path to second input text file")
         print("  output     - Path to output mapping file")
         print("  max_length - Maximum length for text splitting (default: 29)")
+        print("  --tm <db>  - Translation memory database to populate and query")
         print()
         print("Examples:")
         print("  python map_files.py english.txt hebrew.txt mapping.txt")
         print("  python map_files.py english.txt hebrew.txt mapping.txt 35")
+        print("  python map_files.py english.txt hebrew.txt mapping.txt 26 --tm translation_memory.db")
         sys.exit(1)
     
-    input1_path = sys.argv[1]
-    input2_path = sys.argv[2]
-    output_path = sys.argv[3]
+    input1_path = argv[0]
+    input2_path = argv[1]
+    output_path = argv[2]
     
     # Parse max_length argument or use default
-    if len(sys.argv) == 5:
+    if len(argv) == 4:
         try:
-            max_length = int(sys.argv[4])
+            max_length = int(argv[3])
         except ValueError:
             print("Error: max_length must be a valid integer")
             print("Usage: python map_files.py <input1> <input2> <output> [max_length]")
@@ -130,9 +228,11 @@ def main():
     print(f"Input file 2: {input2_path}")
     print(f"Output file: {output_path}")
     print(f"Max length: {max_length}")
+    if tm_path:
+        print(f"Translation memory: {tm_path}")
     print()
     
-    map_files(input1_path, input2_path, output_path, max_length)
+    map_files(input1_path, input2_path, output_path, max_length, tm_path)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+Shared 256-color palette loading for the bitmap tools.
+
+Decodes KQ8 .ppl palettes with a single np.frombuffer over the 1 KB
+PALETTEENTRY block and also reads the JASC-PAL / raw text, .act, .bin and
+.json files the other tools accept. Decoded palettes are cached per process
+keyed by (path, mtime), so BMP->PNG, 24-bit->palette and the font tools
+share one decoded palette instead of re-parsing text files.
+
+Based on documentation from: https://svn.nicode.net/libkq8fpc/doc/kq8ppal.txt
+
+Usage:
+    python palette.py <palette_file> [output_pal_file]
+"""
+
+import json
+import os
+import sys
+
+import numpy as np
+
+PALETTE_SIZE = 256
+
+# "PPAL", "F$..", "head", chunk count, version, "data"
+PPL_DATA_OFFSET = 24
+
+# Process-wide cache: (absolute path, mtime_ns) -> Palette
+_cache = {}
+
+
+class Palette:
+    """
+    A decoded 256-color palette.
+
+    Attributes:
+        rgb: Read-only (256, 3) uint8 array
+        flags: Read-only (256,) uint8 array of PALETTEENTRY flags (zeros for
+               formats that don't store them)
+        palette_bytes: 768 bytes ready for Image.putpalette
+        source: Path the palette was loaded from (or None)
+    """
+
+    def __init__(self, rgb, flags=None, source=None):
+        rgb = np.array(rgb, dtype=np.uint8).reshape(-1, 3)[:PALETTE_SIZE]
+        if len(rgb) < PALETTE_SIZE:
+            # Pad short palettes with black
+            rgb = np.vstack([rgb, np.zeros((PALETTE_SIZE - len(rgb), 3), dtype=np.uint8)])
+        if flags is None:
+            flags = np.zeros(PALETTE_SIZE, dtype=np.uint8)
+        self.rgb = rgb
+        self.flags = np.array(flags, dtype=np.uint8)
+        self.rgb.setflags(write=False)
+        self.flags.setflags(write=False)
+        self.palette_bytes = self.rgb.tobytes()
+        self.source = source
+
+    def __len__(self):
+        return PALETTE_SIZE
+
+    def __getitem__(self, index):
+        """(r, g, b) tuple of a palette index"""
+        r, g, b = self.rgb[index]
+        return int(r), int(g), int(b)
+
+    def as_list(self):
+        """Flat [r, g, b, r, g, b, ...] list, as the older tools used"""
+        return list(self.palette_bytes)
+
+
+def decode_ppl(data, source=None):
+    """
+    Decode the contents of a KQ8 .ppl file.
+
+    Raises:
+        ValueError: If the file is too short to hold 256 entries
+    """
+    end = PPL_DATA_OFFSET + PALETTE_SIZE * 4
+    if len(data) < end:
+        raise ValueError(f"PPL file too short: {len(data)} bytes, expected at least {end}")
+    # 256 PALETTEENTRY structures (4 bytes each: R G B flags)
+    entries = np.frombuffer(data, dtype=np.uint8, count=PALETTE_SIZE * 4,
+                            offset=PPL_DATA_OFFSET).reshape(PALETTE_SIZE, 4)
+    return Palette(entries[:, :3], entries[:, 3], source)
+
+
+def parse_text_palette(text, source=None):
+    """
+    Parse a JASC-PAL file or raw "r g b" lines.
+
+    Raises:
+        ValueError: If no colors are found
+    """
+    lines = [line.strip() for line in text.splitlines() if line.strip()]
+    if not lines:
+        raise ValueError("Empty palette file")
+
+    if lines[0] == 'JASC-PAL':
+        if len(lines) < 3:
+            raise ValueError("Invalid JASC-PAL file: missing header")
+        color_lines = lines[3:3 + int(lines[2])]
+        strict = True
+    else:
+        color_lines = lines
+        strict = False
+
+    colors = []
+    for line in color_lines:
+        parts = line.split()
+        try:
+            colors.append([int(value) for value in parts[:3]] if len(parts) >= 3 else None)
+        except ValueError:
+            colors.append(None)
+        if colors[-1] is None:
+            if strict:
+                colors[-1] = [0, 0, 0]  # Invalid JASC line defaults to black
+            else:
+                colors.pop()  # Raw format skips invalid lines
+
+    if not colors:
+        raise ValueError("No valid RGB values found in palette file")
+    return Palette(colors, source=source)
+
+
+def read_palette(palette_file):
+    """
+    Read a palette file without the cache. Supported formats:
+    - .ppl files (KQ8 palette)
+    - .pal files (JASC-PAL format or raw text)
+    - .act files (Adobe Color Table)
+    - .json files (custom JSON format: {"palette": [[r,g,b], ...]})
+    - .bin files (raw RGB data)
+    """
+    ext = os.path.splitext(palette_file)[1].lower()
+
+    if ext == '.ppl':
+        with open(palette_file, 'rb') as f:
+            return decode_ppl(f.read(), palette_file)
+
+    if ext == '.pal':
+        with open(palette_file, 'r') as f:
+            return parse_text_palette(f.read(), palette_file)
+
+    if ext in ('.act', '.bin'):
+        with open(palette_file, 'rb') as f:
+            data = f.read(PALETTE_SIZE * 3)
+        data = data[:len(data) - len(data) % 3]
+        return Palette(np.frombuffer(data, dtype=np.uint8), source=palette_file)
+
+    if ext == '.json':
+        with open(palette_file, 'r') as f:
+            data = json.load(f)
+        # Take only RGB, ignore alpha if present
+        return Palette([color[:3] for color in data['palette']], source=palette_file)
+
+    raise ValueError(f"Unsupported palette format: {ext}")
+
+
+def load_palette(palette_file):
+    """
+    Load a palette, reusing the decoded copy while the file is unchanged.
+
+    Returns:
+        Palette (shared between callers, its arrays are read-only)
+    """
+    path = os.path.abspath(palette_file)
+    key = (path, os.stat(path).st_mtime_ns)
+    palette = _cache.get(key)
+    if palette is None:
+        palette = read_palette(path)
+        # Drop stale entries for this path
+        for stale_key in [k for k in _cache if k[0] == path]:
+            del _cache[stale_key]
+        _cache[key] = palette
+    return palette
+
+
+def grayscale_palette():
+    """Default 256-color grayscale palette"""
+    return Palette(np.repeat(np.arange(PALETTE_SIZE, dtype=np.uint8), 3))
+
+
+def write_jasc_pal(palette, output_filename):
+    """Write a palette as a JASC-PAL text file"""
+    with open(output_filename, 'w') as f:
+        f.write('JASC-PAL\n')
+        f.write('0100\n')
+        f.write(f'{PALETTE_SIZE}\n')
+        f.writelines(f'{r} {g} {b}\n' for r, g, b in palette.rgb.tolist())
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("Usage: python palette.py <palette_file> [output_pal_file]")
+        sys.exit(1)
+
+    palette_file = sys.argv[1]
+    if not os.path.exists(palette_file):
+        print(f"Error: Palette file '{palette_file}' not found")
+        sys.exit(1)
+
+    try:
+        palette = load_palette(palette_file)
+    except ValueError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+    print(f"Palette: {palette_file}")
+    for index in (0, 1, 16, 32, 64, 128, 200, 248, 255):
+        r, g, b = palette[index]
+        print(f"  Color {index:3d}: R={r:3d} G={g:3d} B={b:3d} flags=0x{palette.flags[index]:02X}")
+
+    if len(sys.argv) > 2:
+        write_jasc_pal(palette, sys.argv[2])
+        print(f"Wrote JASC-PAL file: {sys.argv[2]}")
+
+
+if __name__ == "__main__":
+    main()
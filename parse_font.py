@@ -4,12 +4,15 @@ Parser for King's Quest 8 font files (.pft)
 Based on the format specification from kq8pfon.txt
 """
 
-import struct
 import sys
 import os
 import json
+import hashlib
+import numpy as np
 from PIL import Image
 
+from binary_schema import PFT_LAYOUT, read_tree, layout_end, aligned_width, mipmap_sizes
+
 # Import the conversion function from our BMP to PNG converter
 #try:
 #    from convert_bmp_to_png import convert_bmp_to_png, load_palette_from_file
@@ -18,398 +21,339 @@ from PIL import Image
 CONVERTER_AVAILABLE = False
     # Warning will be shown in debug mode if needed
 
-def parse_font_file(filename, bitmaps_folder, debug=False):
+def mipmap_levels(pixels, width, height):
+    """
+    Mipmap levels of PBMP pixel data, base level first
+    
+    Args:
+        pixels: Pixel data of one bitmap (bytes or memoryview)
+        width: Aligned width of the base level
+        height: Height of the base level
+    
+    Returns:
+        List of (height, width) uint8 arrays, views into pixels (no copy)
+    """
+    levels = []
+    offset = 0
+    for level_height, level_width in mipmap_sizes(width, height):
+        size = level_height * level_width
+        if offset + size > len(pixels):
+            break
+        levels.append(np.frombuffer(pixels, dtype=np.uint8, count=size, offset=offset)
+                      .reshape(level_height, level_width))
+        offset += size
+    return levels
+
+def bitmap_levels(bitmap):
+    """Mipmap levels of a decoded PBMP bitmap (see mipmap_levels)"""
+    header = bitmap['header']
+    return mipmap_levels(bitmap['pixels'], aligned_width(header['width_raw']), header['height'])
+
+def read_font(filename, debug=False, mipmaps=False, on_bitmap=None):
     """
-    Parse a KQ8 font file and display all values except bitmap arrays and palette
+    Read a KQ8 font file and display all values except bitmap arrays and palette
+    
+    The file is decoded with the PFT layout of binary_schema.py (the same one
+    create_font.py writes with), one struct unpack per section.
     
     Args:
         filename: Path to the .pft font file
-        bitmaps_folder: Directory to save extracted bitmap files
         debug: Whether to print debug information (default: False)
+        mipmaps: Return all mipmap levels of every bitmap instead of the base level
+        on_bitmap: Optional callback(bitmap index, base level array or None),
+                   called for every bitmap (in the debug output right after
+                   the bitmap's header)
+    
+    Returns:
+        Tuple of (font metadata dictionary, list of (bitmap index, (height, width)
+        uint8 array or None when the bitmap is empty)); with mipmaps, the
+        arrays are lists of levels (base level first, empty when the bitmap is empty)
     """
     with open(filename, 'rb') as f:
-        if debug:
-            print(f"Parsing font file: {filename}")
-            print(f"File size: {os.path.getsize(filename)} bytes")
-            print("=" * 60)
-        
-        # Read Persistent::Base header
-        block_tag = f.read(4).decode('ascii')
-        if debug:
-            print(f"Block Tag: '{block_tag}'")
-        
-        # Read blockSize and blockAlign (packed in 32 bits)
-        block_data = struct.unpack('<I', f.read(4))[0]
-        block_size = block_data & 0x7FFFFFFF  # Lower 31 bits
-        block_align = (block_data >> 31) & 1  # Top bit
-        if debug:
-            print(f"Block Size: {block_size}")
-            print(f"Block Align: {block_align}")
-        
-        # Calculate aligned size
-        aligned_size = ((block_size + ((2 << block_align) - 1)) // (2 << block_align)) * (2 << block_align)
-        if debug:
-            print(f"Aligned Size: {aligned_size}")
-            print()
-        
-        # Read Persistent::VersionedBase
-        class_version = struct.unpack('<I', f.read(4))[0]
-        if debug:
-            print(f"Class Version: {class_version}")
-            print()
-        
-        # Read GFXFont::FontInfo structure
-        if debug:
-            print("FontInfo:")
-            print("-" * 40)
-        
-        font_flags = struct.unpack('<I', f.read(4))[0]
-        if debug:
-            print(f"Font Flags: 0x{font_flags:08X}")
-        
-        # Decode font flags
-        flags_desc = []
-        if font_flags & 0x00000001:
-            flags_desc.append("proportional")
-        if font_flags & 0x00000002:
-            flags_desc.append("monospaced")
-        if font_flags & 0x00000004:
-            flags_desc.append("monochrome")
-        if font_flags & 0x00000200:
-            flags_desc.append("UCS-2 text")
-        if debug:
-            print(f"  Flags: {', '.join(flags_desc) if flags_desc else 'none'}")
-        
-        text_flags = struct.unpack('<I', f.read(4))[0]
-        if debug:
-            print(f"Text Flags: 0x{text_flags:08X}")
-        
-        # Decode text flags
-        align_h = text_flags & 0x00000007
-        align_v = text_flags & 0x00000038
-        stretch = text_flags & 0x00000040
-        
-        h_align = "left"
-        if align_h == 0x02:
-            h_align = "right"
-        elif align_h == 0x04:
-            h_align = "center"
-            
-        v_align = "top"
-        if align_v == 0x08:
-            v_align = "bottom"
-        elif align_v == 0x20:
-            v_align = "center"
-            
-        if debug:
-            print(f"  Horizontal Align: {h_align}")
-            print(f"  Vertical Align: {v_align}")
-            print(f"  Stretch: {'yes' if stretch else 'no'}")
-        
-        glyph_count = struct.unpack('<i', f.read(4))[0]
-        char_height = struct.unpack('<i', f.read(4))[0]
-        char_width = struct.unpack('<i', f.read(4))[0]
-        text_color = struct.unpack('<I', f.read(4))[0]
-        back_color = struct.unpack('<I', f.read(4))[0]
-        baseline = struct.unpack('<i', f.read(4))[0]
-        text_h_scale = struct.unpack('<I', f.read(4))[0]  # fp1616_t
-        text_v_scale = struct.unpack('<I', f.read(4))[0]  # fp1616_t
-        char_h_space = struct.unpack('<i', f.read(4))[0]
-        
-        if debug:
-            print(f"Glyph Count: {glyph_count}")
-            print(f"Char Height: {char_height}")
-            print(f"Char Width: {char_width}")
-            print(f"Text Color: 0x{text_color:08X}")
-            print(f"Back Color: 0x{back_color:08X}")
-            print(f"Baseline: {baseline}")
-            print(f"Text H Scale: 0x{text_h_scale:08X} ({text_h_scale / 65536.0:.2f})")
-            print(f"Text V Scale: 0x{text_v_scale:08X} ({text_v_scale / 65536.0:.2f})")
-            print(f"Char H Space: {char_h_space}")
-            print()
-        
-        # Read character mapping
-        char_count = struct.unpack('<h', f.read(2))[0]
-        char_first = struct.unpack('<h', f.read(2))[0]
-        
-        if debug:
-            print("Character Mapping:")
-            print("-" * 40)
-            print(f"Char Count: {char_count}")
-            print(f"First Char: {char_first} ('{chr(char_first)}' if printable)")
-        
-        # Read character glyph mapping array
-        char_glyph = []
-        for i in range(char_count):
-            glyph_index = struct.unpack('<h', f.read(2))[0]
-            char_glyph.append(glyph_index)
-        
-        if debug:
-            print(f"Character to Glyph Mapping ({char_count} entries):")
-        
-        # Show characters that have actual glyphs (not -1)
-        mapped_chars = []
-        for i in range(char_count):
-            char_code = char_first + i
-            glyph_idx = char_glyph[i]
-            if glyph_idx != -1:
-                mapped_chars.append((char_code, glyph_idx))
-        
-        if debug:
-            print(f"Characters with glyphs ({len(mapped_chars)} out of {char_count}):")
-            for char_code, glyph_idx in mapped_chars:
-                char_repr = repr(chr(char_code)) if 32 <= char_code <= 126 else f"\\x{char_code:02x}"
-                print(f"  Char {char_code} ({char_repr}): glyph {glyph_idx}")
-            
-            if len(mapped_chars) == 0:
-                print("  No characters have assigned glyphs!")
-            print()
-        
-        # Read glyph info array
-        if debug:
-            print("Glyph Information:")
-            print("-" * 40)
-            print(f"Glyph Array ({glyph_count} entries):")
-        
-        glyph_array = []
-        for i in range(glyph_count):
-            glyph_bytes = f.read(8)  # Read all 8 bytes including spare
-            glyph_info = struct.unpack('<BBBBBB', glyph_bytes[:6])  # First 6 bytes
-            bitmap_index, bitmap_left, bitmap_top, width, height, baseline_shift = glyph_info
-            spare_bytes = glyph_bytes[6:8]  # Last 2 bytes (spare)
-            
-            glyph_data = {
-                'bitmap_index': bitmap_index,
-                'bitmap_left': bitmap_left,
-                'bitmap_top': bitmap_top,
-                'width': width,
-                'height': height,
-                'baseline_shift': baseline_shift,
-                'spare_bytes': list(spare_bytes)  # Save spare bytes as list
-            }
-            glyph_array.append(glyph_data)
-            
-            if debug and i < 10:  # Show first 10 glyphs
-                print(f"  Glyph {i}: bitmap_idx={bitmap_index}, left={bitmap_left}, top={bitmap_top}, "
-                      f"size={width}x{height}, baseline_shift={baseline_shift}")
-        
-        if debug and glyph_count > 10:
-            print(f"  ... and {glyph_count - 10} more glyphs")
-            print()
-        
-        # Read bitmap array header
-        if debug:
-            print("Bitmap Array Header:")
-            print("-" * 40)
-        
-        # Read the bitmap array header
-        # uint32_t chunks : 24; uint32_t version: 8; (packed in first 4 bytes)
-        # uint32_t bitmapCount; (next 4 bytes)
-        pbma_tag = f.read(4)  # PBMA
-        pbma_unknown = struct.unpack('<I', f.read(4))[0]
-        pbma_head = struct.unpack('<I', f.read(4))[0]
-        bitmap_header1 = struct.unpack('<I', f.read(4))[0]  # Full 32-bit value
-        chunks = bitmap_header1 & 0x00FFFFFF      # Lower 24 bits for display
-        bitmap_header2 = struct.unpack('<I', f.read(4))[0]  # Full 32-bit value
-        version = bitmap_header2 & 0xFF   # Lower 8 bits for display
-        bitmap_count = struct.unpack('<I', f.read(4))[0]
-        
-        if debug:
-            print(f"Chunks: {chunks}")
-            print(f"Version: {version}")
-            print(f"Bitmap Count: {bitmap_count}")
-            print()
-        
-        # Read rmap section
-        rmap_tag = f.read(4)  # rmap
-        rmap_unknown = struct.unpack('<I', f.read(4))[0]
-        rmap_reserved = []
-        for _ in range(bitmap_count):
-            reserved_value = struct.unpack('<I', f.read(4))[0]
-            rmap_reserved.append(reserved_value)
-        
-        bitmap_headers = []
-        for bitmap_index in range(bitmap_count):
-            pbmp_tag = f.read(4)  # PBMP
-            pbmp_unknown = struct.unpack('<I', f.read(4))[0]
-            pbmp_head = struct.unpack('<I', f.read(4))[0]
-            bitmap_chunks_raw = struct.unpack('<I', f.read(4))[0]
-            chunks = bitmap_chunks_raw & 0x00FFFFFF      # Lower 24 bits
-            bitmap_version_raw = struct.unpack('<I', f.read(4))[0]
-            version = bitmap_version_raw & 0xFF   # Lower 8 bits
-            width_raw = struct.unpack('<I', f.read(4))[0]
-            width = ((width_raw + 3) // 4) * 4  # Aligned width for data reading
-            height = struct.unpack('<I', f.read(4))[0]
-            bitCount = struct.unpack('<I', f.read(4))[0]
-            if debug:
-                print(f"Chunks: {chunks}")
-                print(f"Version: {version}")
-                print(f"Width?: {width}")
-                print(f"Height: {height}")
-                print(f"Bit Count: {bitCount}")
-                print()
-            flags = struct.unpack('<I', f.read(4))[0]
-            data_tag = f.read(4)  # 'data'
-            if debug:
-                print(f"Word: {data_tag.decode('latin1')}")
-            
-            # Save bitmap header data
-            bitmap_header = {
-                'pbmp_tag': pbmp_tag.decode('ascii'),
-                'pbmp_unknown': pbmp_unknown,
-                'pbmp_head': pbmp_head,
-                'bitmap_chunks_raw': bitmap_chunks_raw,
-                'bitmap_version_raw': bitmap_version_raw,
-                'chunks': chunks,
-                'version': version,
-                'width_raw': width_raw,  # Original width value
-                'width': width,         # Aligned width for data
-                'height': height,
-                'bit_count': bitCount,
-                'flags': flags,
-                'data_tag': data_tag.decode('latin1')
-            }
-            #sum=0
-            
-            #for index in range(4):
-            #    data_size = (height * width) >> (index * 2)
-            #    #Read the bitmap data
-            #    f.read(data_size)
-            #    sum += data_size
-            #    print(f"Mipmap Level {index}: size={data_size} bytes")
-            #f.read(6) #TODO - check why 6
-            data_size = height * width
-            
-            # Read and display bitmap data
-            bitmap_data = f.read(data_size)
-            if debug:
-                print(f"Bitmap Data Size: {data_size} bytes ({width}x{height})")
-            
-            # Create bitmaps folder if it doesn't exist
-            if not os.path.exists(bitmaps_folder):
-                os.makedirs(bitmaps_folder)
-                if debug:
-                    print(f"Created bitmaps folder: {bitmaps_folder}")
+        data = f.read()
+    font, root = read_tree(PFT_LAYOUT, data)
+    
+    if debug:
+        print_font(filename, font, len(data), layout_end(root), on_bitmap)
+    
+    bitmaps = []
+    for bitmap_index, bitmap in enumerate(font['bitmaps']):
+        # Keep the bitmap (8-bit palette indices) as arrays
+        levels = bitmap_levels(bitmap)
+        if on_bitmap and not debug:
+            on_bitmap(bitmap_index, levels[0] if levels else None)
+        if mipmaps:
+            bitmaps.append((bitmap_index, levels))
+        else:
+            bitmaps.append((bitmap_index, levels[0] if levels else None))
+    
+    return font_metadata(font), bitmaps
 
-            # Save bitmap as BMP file
-            if len(bitmap_data) == data_size and width > 0 and height > 0:
-                # Create PIL Image from bitmap data (8-bit grayscale)
-                img = Image.new('L', (width, height))
-                img.putdata(bitmap_data)
-                
-                # Save as BMP
-                bmp_filename = os.path.join(bitmaps_folder, f"bitmap_{bitmap_index:03d}.bmp")
-                img.save(bmp_filename)
-                if debug:
-                    print(f"Saved bitmap to: {bmp_filename}")
-                
-                # Convert BMP to PNG using palette (direct function call)
-                #if CONVERTER_AVAILABLE:
-                    #png_filename = os.path.join(bitmaps_folder, f"bitmap_{bitmap_index:03d}.png")
-                    #palette_file = "menus.pal"
-                    
-                    #try:
-                    #    # Load palette if available
-                    #    palette = None
-                    #    if os.path.exists(palette_file):
-                    #        palette = load_palette_from_file(palette_file)
-                        
-                        # Convert using direct function call
-                    #    convert_bmp_to_png(bmp_filename, png_filename, palette)
-                    #    if debug:
-                    #        print(f"Converted to PNG: {png_filename}")
-                        
-                    #except Exception as e:
-                    #    if debug:
-                    #        print(f"Warning: Could not convert {bmp_filename} to PNG: {e}")
-                #else:
-                #    if debug:
-                #        print("Warning: convert_bmp_to_png module not found. PNG conversion will be skipped.")
-                #        print("PNG conversion skipped (converter not available)")
+def font_metadata(font):
+    """
+    Metadata dictionary (the <font>_metadata.json contents) of a decoded font
+    
+    Args:
+        font: Font values from binary_schema.read(PFT_LAYOUT, ...)
+    """
+    block_data = font['header']['block_data']
+    bitmap_array = font['bitmap_array']
+    
+    bitmap_headers = []
+    for bitmap_index, bitmap in enumerate(font['bitmaps']):
+        header, footer = bitmap['header'], bitmap['footer']
+        levels = bitmap_levels(bitmap)
+        bitmap_headers.append({
+            'pbmp_tag': header['pbmp_tag'].decode('ascii'),
+            'pbmp_unknown': header['pbmp_unknown'],
+            'pbmp_head': header['pbmp_head'],
+            'bitmap_chunks_raw': header['bitmap_chunks_raw'],
+            'bitmap_version_raw': header['bitmap_version_raw'],
+            'chunks': header['bitmap_chunks_raw'] & 0x00FFFFFF,  # Lower 24 bits
+            'version': header['bitmap_version_raw'] & 0xFF,      # Lower 8 bits
+            'width_raw': header['width_raw'],  # Original width value
+            'width': aligned_width(header['width_raw']),  # Aligned width for data
+            'height': header['height'],
+            'bit_count': header['bit_count'],
+            'flags': header['flags'],
+            'data_tag': header['data_tag'].decode('latin1'),
+            'bitmap_footer_unknown': list(footer['bitmap_footer_unknown']),
+            'detl_tag': footer['detl_tag'].decode('latin1'),
+            'mipmap_count': footer['mipmap_count'],
+            'detl_footer_unknown': list(footer['detl_footer_unknown']),
+            'mipmap_levels': len(levels)  # Levels stored in the pixel data, base included
+        })
+        if len(levels) > 1:
+            # Kept for create_font.py, which copies them while the base bitmap is unchanged
+            base = levels[0].tobytes()
+            bitmap_headers[-1]['base_md5'] = hashlib.md5(base).hexdigest()
+            bitmap_headers[-1]['mipmap_data'] = bytes(bitmap['pixels'])[len(base):].hex()
+    
+    # chunks/version of the array header as decoded for reference; files written
+    # so far keep the values of the last bitmap here, so do the same
+    last = bitmap_headers[-1] if bitmap_headers else {
+        'chunks': bitmap_array['bitmap_header1'] & 0x00FFFFFF,
+        'version': bitmap_array['bitmap_header2'] & 0xFF
+    }
+    
+    return {
+        'header': {
+            'block_tag': font['header']['block_tag'].decode('ascii'),
+            'block_size': block_data & 0x7FFFFFFF,  # Lower 31 bits
+            'block_align': (block_data >> 31) & 1,  # Top bit
+            'class_version': font['header']['class_version']
+        },
+        'font_info': dict(font['font_info']),
+        'character_mapping': {
+            'char_count': font['character_mapping']['char_count'],
+            'char_first': font['character_mapping']['char_first'],
+            'char_glyph': font['char_glyph']
+        },
+        'glyph_array': [dict(glyph, spare_bytes=list(glyph['spare_bytes'])) for glyph in font['glyph_array']],
+        'bitmap_array': {
+            'pbma_tag': bitmap_array['pbma_tag'].decode('ascii'),
+            'pbma_unknown': bitmap_array['pbma_unknown'],
+            'pbma_head': bitmap_array['pbma_head'],
+            'bitmap_header1': bitmap_array['bitmap_header1'],  # Full 32-bit value
+            'bitmap_header2': bitmap_array['bitmap_header2'],  # Full 32-bit value
+            'chunks': last['chunks'],  # Decoded value for reference
+            'version': last['version'],  # Decoded value for reference
+            'bitmap_count': bitmap_array['bitmap_count'],
+            'rmap_tag': font['rmap']['rmap_tag'].decode('ascii'),
+            'rmap_unknown': font['rmap']['rmap_unknown'],
+            'rmap_reserved': font['rmap_reserved'],
+            'bitmap_headers': bitmap_headers  # Individual bitmap header data
+        },
+        'palette': {
+            'has_palette': font['palette']['has_palette']
+        }
+    }
 
-            bitmap_footer_unknown = f.read(4)
+def print_font(filename, font, file_size, end_offset, on_bitmap=None):
+    """
+    Print the decoded values of a font file (debug output of read_font, see its on_bitmap)
+    
+    end_offset is where the PFT layout ends in the file (binary_schema.layout_end)
+    """
+    print(f"Parsing font file: {filename}")
+    print(f"File size: {file_size} bytes")
+    print("=" * 60)
+    
+    # Persistent::Base header
+    block_data = font['header']['block_data']
+    block_size = block_data & 0x7FFFFFFF  # Lower 31 bits
+    block_align = (block_data >> 31) & 1  # Top bit
+    print(f"Block Tag: '{font['header']['block_tag'].decode('ascii')}'")
+    print(f"Block Size: {block_size}")
+    print(f"Block Align: {block_align}")
+    
+    # Calculate aligned size
+    aligned_size = ((block_size + ((2 << block_align) - 1)) // (2 << block_align)) * (2 << block_align)
+    print(f"Aligned Size: {aligned_size}")
+    print()
+    
+    # Persistent::VersionedBase
+    print(f"Class Version: {font['header']['class_version']}")
+    print()
+    
+    # GFXFont::FontInfo structure
+    info = font['font_info']
+    print("FontInfo:")
+    print("-" * 40)
+    font_flags = info['font_flags']
+    print(f"Font Flags: 0x{font_flags:08X}")
+    
+    # Decode font flags
+    flags_desc = []
+    if font_flags & 0x00000001:
+        flags_desc.append("proportional")
+    if font_flags & 0x00000002:
+        flags_desc.append("monospaced")
+    if font_flags & 0x00000004:
+        flags_desc.append("monochrome")
+    if font_flags & 0x00000200:
+        flags_desc.append("UCS-2 text")
+    print(f"  Flags: {', '.join(flags_desc) if flags_desc else 'none'}")
+    
+    text_flags = info['text_flags']
+    print(f"Text Flags: 0x{text_flags:08X}")
+    
+    # Decode text flags
+    align_h = text_flags & 0x00000007
+    align_v = text_flags & 0x00000038
+    stretch = text_flags & 0x00000040
+    
+    h_align = "left"
+    if align_h == 0x02:
+        h_align = "right"
+    elif align_h == 0x04:
+        h_align = "center"
+        
+    v_align = "top"
+    if align_v == 0x08:
+        v_align = "bottom"
+    elif align_v == 0x20:
+        v_align = "center"
+    
+    print(f"  Horizontal Align: {h_align}")
+    print(f"  Vertical Align: {v_align}")
+    print(f"  Stretch: {'yes' if stretch else 'no'}")
+    
+    print(f"Glyph Count: {info['glyph_count']}")
+    print(f"Char Height: {info['char_height']}")
+    print(f"Char Width: {info['char_width']}")
+    print(f"Text Color: 0x{info['text_color']:08X}")
+    print(f"Back Color: 0x{info['back_color']:08X}")
+    print(f"Baseline: {info['baseline']}")
+    print(f"Text H Scale: 0x{info['text_h_scale']:08X} ({info['text_h_scale'] / 65536.0:.2f})")  # fp1616_t
+    print(f"Text V Scale: 0x{info['text_v_scale']:08X} ({info['text_v_scale'] / 65536.0:.2f})")  # fp1616_t
+    print(f"Char H Space: {info['char_h_space']}")
+    print()
+    
+    # Character mapping
+    char_count = font['character_mapping']['char_count']
+    char_first = font['character_mapping']['char_first']
+    char_glyph = font['char_glyph']
+    print("Character Mapping:")
+    print("-" * 40)
+    print(f"Char Count: {char_count}")
+    print(f"First Char: {char_first} ('{chr(char_first)}' if printable)")
+    print(f"Character to Glyph Mapping ({char_count} entries):")
+    
+    # Show characters that have actual glyphs (not -1)
+    mapped_chars = [(char_first + i, glyph_idx) for i, glyph_idx in enumerate(char_glyph) if glyph_idx != -1]
+    print(f"Characters with glyphs ({len(mapped_chars)} out of {char_count}):")
+    for char_code, glyph_idx in mapped_chars:
+        char_repr = repr(chr(char_code)) if 32 <= char_code <= 126 else f"\\x{char_code:02x}"
+        print(f"  Char {char_code} ({char_repr}): glyph {glyph_idx}")
+    
+    if len(mapped_chars) == 0:
+        print("  No characters have assigned glyphs!")
+    print()
+    
+    # Glyph info array
+    glyph_count = info['glyph_count']
+    print("Glyph Information:")
+    print("-" * 40)
+    print(f"Glyph Array ({glyph_count} entries):")
+    for i, glyph in enumerate(font['glyph_array'][:10]):  # Show first 10 glyphs
+        print(f"  Glyph {i}: bitmap_idx={glyph['bitmap_index']}, left={glyph['bitmap_left']}, top={glyph['bitmap_top']}, "
+              f"size={glyph['width']}x{glyph['height']}, baseline_shift={glyph['baseline_shift']}")
+    if glyph_count > 10:
+        print(f"  ... and {glyph_count - 10} more glyphs")
+        print()
+    
+    # Bitmap array header
+    # uint32_t chunks : 24; uint32_t version: 8; (packed in first 4 bytes)
+    # uint32_t bitmapCount; (next 4 bytes)
+    bitmap_array = font['bitmap_array']
+    print("Bitmap Array Header:")
+    print("-" * 40)
+    print(f"Chunks: {bitmap_array['bitmap_header1'] & 0x00FFFFFF}")
+    print(f"Version: {bitmap_array['bitmap_header2'] & 0xFF}")
+    print(f"Bitmap Count: {bitmap_array['bitmap_count']}")
+    print()
+    
+    for bitmap_index, bitmap in enumerate(font['bitmaps']):
+        header, footer = bitmap['header'], bitmap['footer']
+        width = aligned_width(header['width_raw'])
+        print(f"Chunks: {header['bitmap_chunks_raw'] & 0x00FFFFFF}")
+        print(f"Version: {header['bitmap_version_raw'] & 0xFF}")
+        print(f"Width?: {width}")
+        print(f"Height: {header['height']}")
+        print(f"Bit Count: {header['bit_count']}")
+        print()
+        print(f"Word: {header['data_tag'].decode('latin1')}")
+        print(f"Bitmap Data Size: {width * header['height']} bytes ({width}x{header['height']})")
+        levels = bitmap_levels(bitmap)
+        if on_bitmap:
+            on_bitmap(bitmap_index, levels[0] if levels else None)
+        if len(levels) > 1:
+            print(f"Mipmap Levels: {', '.join(f'{w}x{h}' for h, w in (level.shape for level in levels))}")
+        print(f"Word: {footer['detl_tag'].decode('latin1')}")
+        print(f"Mipmap Count: {footer['mipmap_count']}")
+        print("======================")
+    
+    # Palette
+    print(f"Has Palette: {font['palette']['has_palette']}")
+    # The layout ends after the palette flag
+    current_pos = end_offset
+    print(f"Current position: {current_pos} (0x{current_pos:X})")
+    print(f"Remaining bytes: {file_size - current_pos}")
 
-            #print(f"Total Bitmap Data Size: {sum} (0x{sum:X}) )bytes")
-            detl_tag = f.read(4)  #'DETL'
-            if debug:
-                print(f"Word: {detl_tag.decode('latin1')}")
-            mipmapCount = struct.unpack('<I', f.read(4))[0]
-            if debug:
-                print(f"Mipmap Count: {mipmapCount}")
-            detl_footer_unknown = f.read(4) #Jump 4 bytes
+def parse_font_file(filename, bitmaps_folder, debug=False):
+    """
+    Parse a KQ8 font file, save its bitmaps as BMP files and its metadata as JSON
+    
+    Args:
+        filename: Path to the .pft font file
+        bitmaps_folder: Directory to save extracted bitmap files
+        debug: Whether to print debug information (default: False)
+    """
+    def save_bitmap(bitmap_index, pixels):
+        # Create bitmaps folder if it doesn't exist
+        if not os.path.exists(bitmaps_folder):
+            os.makedirs(bitmaps_folder)
             if debug:
-                print("======================")
-            
-            # Add footer data to bitmap header
-            bitmap_header['bitmap_footer_unknown'] = list(bitmap_footer_unknown)
-            bitmap_header['detl_tag'] = detl_tag.decode('latin1')
-            bitmap_header['mipmap_count'] = mipmapCount
-            bitmap_header['detl_footer_unknown'] = list(detl_footer_unknown)
-            
-            bitmap_headers.append(bitmap_header)
-
-        # Check for palette
-        hasPalette = struct.unpack('<I', f.read(4))[0]
-        if debug:
-            print(f"Has Palette: {hasPalette}")
-            current_pos = f.tell()
-            remaining_bytes = os.path.getsize(filename) - current_pos
-            print(f"Current position: {current_pos} (0x{current_pos:X})")
-            print(f"Remaining bytes: {remaining_bytes}")
-        
-        # Save font metadata for recreation
-        font_metadata = {
-            'header': {
-                'block_tag': block_tag,
-                'block_size': block_size,
-                'block_align': block_align,
-                'class_version': class_version
-            },
-            'font_info': {
-                'font_flags': font_flags,
-                'text_flags': text_flags,
-                'glyph_count': glyph_count,
-                'char_height': char_height,
-                'char_width': char_width,
-                'text_color': text_color,
-                'back_color': back_color,
-                'baseline': baseline,
-                'text_h_scale': text_h_scale,
-                'text_v_scale': text_v_scale,
-                'char_h_space': char_h_space
-            },
-            'character_mapping': {
-                'char_count': char_count,
-                'char_first': char_first,
-                'char_glyph': char_glyph
-            },
-            'glyph_array': glyph_array,
-            'bitmap_array': {
-                'pbma_tag': pbma_tag.decode('ascii'),
-                'pbma_unknown': pbma_unknown,
-                'pbma_head': pbma_head,
-                'bitmap_header1': bitmap_header1,  # Full 32-bit value
-                'bitmap_header2': bitmap_header2,  # Full 32-bit value
-                'chunks': chunks,  # Decoded value for reference
-                'version': version,  # Decoded value for reference
-                'bitmap_count': bitmap_count,
-                'rmap_tag': rmap_tag.decode('ascii'),
-                'rmap_unknown': rmap_unknown,
-                'rmap_reserved': rmap_reserved,
-                'bitmap_headers': bitmap_headers  # Individual bitmap header data
-            },
-            'palette': {
-                'has_palette': hasPalette
-            }
-        }
-        
-        # Save metadata to JSON file
-        metadata_filename = os.path.splitext(filename)[0] + '_metadata.json'
-        with open(metadata_filename, 'w') as meta_file:
-            json.dump(font_metadata, meta_file, indent=2)
+                print(f"Created bitmaps folder: {bitmaps_folder}")
+        if pixels is None:
+            return
+        # Save as BMP (8-bit grayscale)
+        height, width = pixels.shape
+        bmp_filename = os.path.join(bitmaps_folder, f"bitmap_{bitmap_index:03d}.bmp")
+        Image.frombytes('L', (width, height), pixels.tobytes()).save(bmp_filename)
         if debug:
-            print(f"Saved font metadata to: {metadata_filename}")
-        
+            print(f"Saved bitmap to: {bmp_filename}")
+
+    # The bitmaps are saved while the debug output reaches each of them
+    font_metadata, _ = read_font(filename, debug, on_bitmap=save_bitmap)
+    
+    # Save metadata to JSON file
+    metadata_filename = os.path.splitext(filename)[0] + '_metadata.json'
+    with open(metadata_filename, 'w') as meta_file:
+        json.dump(font_metadata, meta_file, indent=2)
+    if debug:
+        print(f"Saved font metadata to: {metadata_filename}")
 
 def main():
     """Main function"""
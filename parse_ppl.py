@@ -6,10 +6,11 @@ Parses King's Quest 8 palette files (.ppl) and converts them to JASC-PAL format
 Based on documentation from: https://svn.nicode.net/libkq8fpc/doc/kq8ppal.txt
 """
 
-import struct
 import sys
 import os
 
+from palette import decode_ppl, load_palette, write_jasc_pal, PALETTE_SIZE, PPL_DATA_OFFSET
+
 def parse_ppl_file(filename, output_filename=None):
     """
     Parse a KQ8 PPL palette file and extract palette data
@@ -17,70 +18,33 @@ def parse_ppl_file(filename, output_filename=None):
     Args:
         filename: Path to the .ppl file
         output_filename: Path to output .pal file (optional)
+    
+    Returns:
+        The decoded Palette
     """
     
     print(f"Parsing PPL file: {filename}")
     print("=" * 60)
     
-    # Default system palette colors (first 8 and last 8)
-    pal_first = [
-        (0x00, 0x00, 0x00), (0x80, 0x00, 0x00), (0x00, 0x80, 0x00),
-        (0x80, 0x80, 0x00), (0x00, 0x00, 0x80), (0x80, 0x00, 0x80),
-        (0x00, 0x80, 0x80), (0xC0, 0xC0, 0xC0)
-    ]
-    
-    pal_last = [
-        (0x80, 0x80, 0x80), (0xFF, 0x00, 0x00), (0x00, 0xFF, 0x00),
-        (0xFF, 0xFF, 0x00), (0x00, 0x00, 0xFF), (0xFF, 0x00, 0xFF),
-        (0x00, 0xFF, 0xFF), (0xFF, 0xFF, 0xFF)
-    ]
-    
-    palette_colors = [(0, 0, 0)] * 256  # Initialize with black
+    with open(filename, 'rb') as f:
+        data = f.read()
+    print(f"File size: {len(data)} bytes")
     
-    # Set default system colors
-    for i, color in enumerate(pal_first):
-        palette_colors[i] = color
-    for i, color in enumerate(pal_last):
-        palette_colors[248 + i] = color
+    print("  Reading palette data (256 colors)")
+    # One vectorized decode of the 256 PALETTEENTRY structures (R G B flags)
+    palette = decode_ppl(data, filename)
     
-    with open(filename, 'rb') as f:
-        file_size = os.path.getsize(filename)
-        print(f"File size: {file_size} bytes")
-        
-        # Check if it's a RIFF palette first
-        f.read(4) #"PPAL"
-        f.read(4) #"F$..""
-        f.read(4) #"head"
-        f.read(4) #chunk count
-        f.read(4) #version
-        f.read(4) #"data"
-        
-        print("  Reading palette data (256 colors)")
-        # Read 256 PALETTEENTRY structures (4 bytes each: R G B flags)
-        for i in range(256):
-            r, g, b, flags = struct.unpack('BBBB', f.read(4))
-            palette_colors[i] = (r, g, b)
-            #print(f"    Color {i:3d}: ({r:3d},{g:3d},{b:3d}) flags=0x{flags:02X}")
-        
-        f.tell()
-        # Read the rest of the file for any additional data
-        rest_of_file = f.read()
-        if rest_of_file:
-            print(f"  Found additional data after palette: {len(rest_of_file)} bytes")
+    # Report any additional data after the palette
+    rest_size = len(data) - PPL_DATA_OFFSET - PALETTE_SIZE * 4
+    if rest_size:
+        print(f"  Found additional data after palette: {rest_size} bytes")
 
     # Generate output PAL file
     if output_filename is None:
         output_filename = os.path.splitext(filename)[0] + '.pal'
     
     print(f"\nGenerating JASC-PAL file: {output_filename}")
-    
-    with open(output_filename, 'w') as f:
-        f.write('JASC-PAL\n')
-        f.write('0100\n')
-        f.write('256\n')
-        
-        for r, g, b in palette_colors:
-            f.write(f'{r} {g} {b}\n')
+    write_jasc_pal(palette, output_filename)
     
     print(f"Successfully created palette file: {output_filename}")
     print(f"Palette contains 256 colors")
@@ -88,46 +52,84 @@ def parse_ppl_file(filename, output_filename=None):
     # Show some sample colors
     #print("\nSample colors:")
     #for i in [0, 1, 16, 32, 64, 128, 200, 248, 255]:
-    #    r, g, b = palette_colors[i]
+    #    r, g, b = palette[i]
     #    print(f"  Color {i:3d}: R={r:3d} G={g:3d} B={b:3d}")
+    
+    return palette
+
+def render_palette_grid(palette, cell_size=16):
+    """
+    Render a palette as a 16x16 grid, one cell per color
+    
+    Args:
+        palette: Decoded Palette
+        cell_size: Size of each cell in pixels
+    """
+    from PIL import Image
+    
+    # The 768 palette bytes are exactly a 16x16 RGB image
+    img = Image.frombytes('RGB', (16, 16), palette.palette_bytes)
+    return img.resize((16 * cell_size, 16 * cell_size), Image.NEAREST)
+
+def render_palette_sheet(palettes, titles, cell_size=16):
+    """
+    Render several palettes side by side with index labels
+    
+    Args:
+        palettes: List of decoded Palettes
+        titles: Title shown above each palette
+        cell_size: Size of each cell in pixels
+    """
+    import numpy as np
+    from PIL import Image, ImageDraw
+    
+    grid_size = 16 * cell_size
+    margin = 28   # Row labels on the left
+    title_height = 14
+    header_height = title_height + 12   # Title + column labels
+    gap = 12
+    
+    width = margin + len(palettes) * (grid_size + gap)
+    height = header_height + grid_size + 4
+    sheet = np.full((height, width, 3), 255, dtype=np.uint8)
+    
+    # Scale every (16, 16, 3) grid with np.repeat and paste it into the sheet
+    for i, palette in enumerate(palettes):
+        grid = palette.rgb.reshape(16, 16, 3).repeat(cell_size, axis=0).repeat(cell_size, axis=1)
+        left = margin + i * (grid_size + gap)
+        sheet[header_height:header_height + grid_size, left:left + grid_size] = grid
+    
+    img = Image.fromarray(sheet)
+    draw = ImageDraw.Draw(img)
+    
+    # Row labels: index of the first color in each row
+    for row in range(16):
+        draw.text((2, header_height + row * cell_size + (cell_size - 10) // 2),
+                  str(row * 16), fill=(0, 0, 0))
+    
+    for i, title in enumerate(titles):
+        left = margin + i * (grid_size + gap)
+        draw.text((left, 0), title, fill=(0, 0, 0))
+        # Column labels: low nibble of the index
+        for col in range(16):
+            draw.text((left + col * cell_size + (cell_size - 6) // 2, title_height),
+                      f"{col:X}", fill=(0, 0, 0))
+    
+    return img
 
 def create_palette_visualization(pal_filename, output_image=None):
     """
     Create a 16x16 pixel image showing the palette colors
     
     Args:
-        pal_filename: Path to the .pal file
+        pal_filename: Path to the palette file (.pal or .ppl)
         output_image: Output image filename (optional)
     """
     try:
-        from PIL import Image
-        
-        # Read palette
-        with open(pal_filename, 'r') as f:
-            lines = f.readlines()
-        
-        # Parse palette
-        if lines[0].strip() != 'JASC-PAL':
-            raise ValueError("Invalid JASC-PAL file")
-        
-        color_count = int(lines[2].strip())
-        colors = []
-        
-        for i in range(3, 3 + min(color_count, 256)):
-            r, g, b = map(int, lines[i].strip().split())
-            colors.append((r, g, b))
-        
-        # Create 16x16 image (256 colors max)
-        img = Image.new('RGB', (16, 16), (0, 0, 0))
-        
-        for y in range(16):
-            for x in range(16):
-                color_index = y * 16 + x
-                if color_index < len(colors):
-                    img.putpixel((x, y), colors[color_index])
+        palette = load_palette(pal_filename)
         
-        # Scale up for better visibility (16x16 -> 256x256)
-        img_large = img.resize((256, 256), Image.NEAREST)
+        # 16x16 grid scaled up for better visibility (16x16 -> 256x256)
+        img_large = render_palette_grid(palette)
         
         # Generate output filename
         if output_image is None:
@@ -148,6 +150,32 @@ def create_palette_visualization(pal_filename, output_image=None):
         print(f"❌ Error creating palette visualization: {e}")
         return False
 
+def create_palette_comparison(pal_filenames, output_image):
+    """
+    Create one image with all palettes side by side
+    
+    Args:
+        pal_filenames: Paths to the palette files (.pal or .ppl)
+        output_image: Output image filename
+    """
+    try:
+        palettes = [load_palette(pal_filename) for pal_filename in pal_filenames]
+        titles = [os.path.splitext(os.path.basename(pal_filename))[0] for pal_filename in pal_filenames]
+        
+        img = render_palette_sheet(palettes, titles)
+        img.save(output_image)
+        print(f"✅ Palette comparison saved: {output_image}")
+        print(f"   {len(palettes)} palettes, {img.size[0]}x{img.size[1]} pixels")
+        
+        return True
+        
+    except ImportError:
+        print("❌ Error: PIL (Pillow) not available. Install with: pip install Pillow")
+        return False
+    except Exception as e:
+        print(f"❌ Error creating palette comparison: {e}")
+        return False
+
 def main():
     """Main function"""
     if len(sys.argv) < 2:
@@ -157,15 +185,18 @@ def main():
         print("Usage:")
         print("  python parse_ppl.py <ppl_file> [output_pal_file]")
         print("  python parse_ppl.py visualize <pal_file> [output_image]")
+        print("  python parse_ppl.py compare <output_image> <pal_file> [pal_file ...]")
         print("")
         print("Examples:")
         print("  python parse_ppl.py game.ppl")
         print("  python parse_ppl.py game.ppl game_palette.pal")
         print("  python parse_ppl.py visualize game_palette.pal palette_grid.png")
+        print("  python parse_ppl.py compare all_palettes.png menus.pal daventry/daventry.pal")
         print("")
         print("Commands:")
         print("  parse     - Parse PPL file and create PAL file (default)")
         print("  visualize - Create 16x16 color grid image from PAL file")
+        print("  compare   - Create one image with several palettes side by side")
         print("")
         print("The script will:")
         print("  - Parse all chunks in the PPL file")
@@ -189,6 +220,20 @@ def main():
         create_palette_visualization(pal_file, output_image)
         return
     
+    if sys.argv[1] == "compare":
+        if len(sys.argv) < 4:
+            print("Usage: python parse_ppl.py compare <output_image> <pal_file> [pal_file ...]")
+            return
+        
+        pal_files = sys.argv[3:]
+        missing = [pal_file for pal_file in pal_files if not os.path.exists(pal_file)]
+        if missing:
+            print(f"Error: PAL file '{missing[0]}' not found")
+            return
+        
+        create_palette_comparison(pal_files, sys.argv[2])
+        return
+    
     # Default: parse PPL file
     ppl_file = sys.argv[1]
     output_file = sys.argv[2] if len(sys.argv) > 2 else None
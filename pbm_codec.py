@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Shared reader/writer for PBM (PBMP) menu screens.
+
+PBM File Structure (all bytes in little endian):
+- 4 bytes: "PBMP" signature
+- 4 bytes: ignore
+- 4 bytes: "head" signature
+- 4 bytes: number of chunks
+- 4 bytes: version
+- 4 bytes: width
+- 4 bytes: height
+- 4 bytes: bit count
+- 4 bytes: flags
+- 4 bytes: "data" signature
+- 4 bytes: size (height × width)
+- (height × width) bytes: pixel data
+- remaining bytes: ignorable
+
+The header is parsed with a single struct unpack. Replacing the pixels of an
+existing file memory-maps it and overwrites the pixel region in place, the
+rest of the file is never rewritten.
+"""
+
+import mmap
+import struct
+
+import numpy as np
+
+# signature, ignore, head, chunks, version, width, height, bit count, flags, data, size
+PBM_HEADER = struct.Struct('<4sI4sIIIIII4sI')
+PBM_HEADER_SIZE = PBM_HEADER.size
+
+
+def parse_pbm_header(data):
+    """
+    Parse a PBM header from the first PBM_HEADER_SIZE bytes of a file.
+
+    Returns:
+        Dictionary with the header fields plus data_offset
+
+    Raises:
+        ValueError: If the data is too short or a signature is invalid
+    """
+    if len(data) < PBM_HEADER_SIZE:
+        raise ValueError(f"File too short for a PBM header ({len(data)} bytes)")
+
+    (signature, unknown, head_signature, num_chunks, version, width, height,
+     bit_count, flags, data_signature, data_size) = PBM_HEADER.unpack_from(data)
+
+    for name, expected, value in (('PBM file', b'PBMP', signature),
+                                  ('head', b'head', head_signature),
+                                  ('data', b'data', data_signature)):
+        if value != expected:
+            found = value.decode('ascii', errors='ignore')
+            raise ValueError(f"Invalid {name} signature. Expected '{expected.decode()}', got '{found}'")
+
+    return {
+        'unknown': unknown,
+        'num_chunks': num_chunks,
+        'version': version,
+        'width': width,
+        'height': height,
+        'bit_count': bit_count,
+        'flags': flags,
+        'data_size': data_size,
+        'data_offset': PBM_HEADER_SIZE,
+    }
+
+
+def read_pbm_header(pbm_path):
+    """Read and parse the header of a PBM file"""
+    with open(pbm_path, 'rb') as f:
+        return parse_pbm_header(f.read(PBM_HEADER_SIZE))
+
+
+def read_pbm(pbm_path):
+    """
+    Read a PBM file.
+
+    Returns:
+        Tuple of (header, pixel data bytes of header['data_size'] length)
+
+    Raises:
+        ValueError: If the header is invalid or the file is truncated
+    """
+    with open(pbm_path, 'rb') as f:
+        header = parse_pbm_header(f.read(PBM_HEADER_SIZE))
+        pixels = f.read(header['data_size'])
+
+    if len(pixels) != header['data_size']:
+        raise ValueError(f"Could not read expected amount of data. "
+                         f"Expected: {header['data_size']} bytes, Got: {len(pixels)} bytes")
+    return header, pixels
+
+
+def pbm_to_image(header, pixels):
+    """Create an 8-bit grayscale PIL image from PBM pixel data"""
+    from PIL import Image
+
+    width, height = header['width'], header['height']
+    if width <= 0 or height <= 0:
+        raise ValueError("Invalid dimensions or data size")
+    if len(pixels) >= width * height:
+        return Image.frombytes('L', (width, height), pixels[:width * height])
+    # Short data (size mismatch in the header): fill what we have
+    img = Image.new('L', (width, height))
+    img.putdata(pixels)
+    return img
+
+
+def image_to_pixels(img):
+    """Return the pixels of a PIL image as a contiguous (height, width) uint8 array"""
+    if img.mode != 'L':
+        img = img.convert('L')
+    return np.ascontiguousarray(np.asarray(img, dtype=np.uint8))
+
+
+def patch_pbm_pixels(pbm_path, pixels):
+    """
+    Overwrite the pixel data of a PBM file in place.
+
+    Args:
+        pbm_path: Path to the PBM file to modify
+        pixels: NumPy array (height, width) or bytes-like object with exactly
+                data_size bytes
+
+    Returns:
+        The parsed header
+
+    Raises:
+        ValueError: If the header is invalid or the pixel size doesn't match
+    """
+    if isinstance(pixels, np.ndarray):
+        pixels = np.ascontiguousarray(pixels, dtype=np.uint8)
+    buffer = memoryview(pixels).cast('B')
+
+    with open(pbm_path, 'r+b') as f:
+        with mmap.mmap(f.fileno(), 0) as mapped:
+            header = parse_pbm_header(mapped[:PBM_HEADER_SIZE])
+            start = header['data_offset']
+            end = start + header['data_size']
+            if len(buffer) != header['data_size']:
+                raise ValueError(f"BMP data size doesn't match PBM data size! "
+                                 f"PBM expects: {header['data_size']} bytes, "
+                                 f"BMP provides: {len(buffer)} bytes")
+            if end > len(mapped):
+                raise ValueError(f"PBM file is truncated: data ends at {end}, file size {len(mapped)}")
+            mapped[start:end] = buffer
+            mapped.flush()
+    return header
@@ -14,8 +14,97 @@ This script:
 import os
 import sys
 from PIL import Image
+import numpy as np
 import glob
 
+# Colors used by the glyph PNGs (209 is the shadow)
+GLYPH_COLORS = [123, 124, 122, 119, 159, 154, 209]
+
+# Glyph colors replaced per palette (the first name contained in the palette name is used)
+PALETTE_MAPPINGS = [
+    ("consoles", dict(zip(GLYPH_COLORS, [124, 127, 124, 124, 195, 193, 25]))),
+    ("daventry", dict(zip(GLYPH_COLORS, [157, 157, 157, 156, 142, 221, 10]))),
+    ("castled",  dict(zip(GLYPH_COLORS, [204, 204, 204, 205, 182, 183, 10]))),
+    ("deadcity", dict(zip(GLYPH_COLORS, [207, 208, 208, 209, 108, 109, 10]))),
+    ("swamp",    dict(zip(GLYPH_COLORS, [235, 235, 230, 231, 230, 112, 10]))),
+    ("gnome",    dict(zip(GLYPH_COLORS, [232, 172, 172, 171, 231, 167, 10]))),
+    ("barren",   dict(zip(GLYPH_COLORS, [235, 179, 179, 180, 161, 167, 10]))),
+    ("iceworld", dict(zip(GLYPH_COLORS, [245, 228, 228, 229, 192, 128, 10]))),
+    ("snowexit", dict(zip(GLYPH_COLORS, [205, 205, 206, 212, 213, 218, 10]))),
+    ("temple",   dict(zip(GLYPH_COLORS, [229, 225, 220, 169, 176, 230, 10]))),
+]
+
+def glyph_indices(img):
+    """
+    Palette indices of a glyph image as a (height, width) uint8 array.
+    'L' and 'P' images are used as-is, other modes are converted to grayscale.
+    """
+    if img.mode not in ('L', 'P'):
+        img = img.convert('L')
+    return np.array(img, dtype=np.uint8)
+
+def remap_glyph(arr, palette_name):
+    """Apply the palette-specific color mapping with one lookup table"""
+    for name, mapping in PALETTE_MAPPINGS:
+        if name in palette_name:
+            lut = np.arange(256, dtype=np.uint8)
+            lut[list(mapping)] = list(mapping.values())
+            return lut[arr]
+    return arr.copy()
+
+def encode_dimensions(arr):
+    """Set pixel (0,0) to width * height (KQ8 font format requirement), in place"""
+    height, width = arr.shape
+    dimension_encoding = width * height
+    flat = arr.reshape(-1)
+    if dimension_encoding > 255:
+        flat[0] = dimension_encoding % 256  # Remainder in (0,0)
+        flat[1] = dimension_encoding // 256  # Quotient in (1,0)
+    else:
+        flat[0] = dimension_encoding
+    return dimension_encoding
+
+def bmp_base_name(png_name):
+    """Output name of a glyph: bitmaps 096-122 become 192-218"""
+    base_name = os.path.splitext(os.path.basename(png_name))[0]
+
+    # If bitmap number is between 096 and 122, add 96
+    if base_name.startswith('bitmap_'):
+        try:
+            bitmap_num = int(base_name.split('_')[1])
+            if 96 <= bitmap_num <= 122:
+                new_num = bitmap_num + 96
+                base_name = f"bitmap_{new_num:03d}"
+        except (ValueError, IndexError):
+            pass  # Keep original name if parsing fails
+    return base_name
+
+def write_glyph_bmp(arr, png_name, output_dir="bitmaps", palette_name="daventry", debug=False):
+    """
+    Write a glyph given as palette indices (e.g. straight from fix_glyph) as a KQ8 font BMP
+
+    Args:
+        arr: (height, width) uint8 array of palette indices
+        png_name: Name of the glyph PNG (decides the output name)
+        output_dir: Output directory for BMP files
+        palette_name: Palette to use ("daventry" or "castle")
+        debug: Whether to print debug information
+    """
+    height, width = arr.shape
+
+    # Palette mappings
+    arr = remap_glyph(arr, palette_name)
+    dimension_encoding = encode_dimensions(arr)
+
+    output_file = os.path.join(output_dir, f"{bmp_base_name(png_name)}.bmp")
+
+    # Save as BMP
+    Image.frombytes('L', (width, height), arr.tobytes()).save(output_file, 'BMP')
+
+    if debug:
+        print(f"  → Saved: {output_file}")
+        print(f"  → Dimensions: {width}x{height}, encoding: {dimension_encoding}")
+
 def convert_png_to_bmp(png_file, output_dir="bitmaps", palette_name="daventry", debug=False):
     """
     Convert a PNG glyph file to BMP format for KQ8 fonts
@@ -28,184 +117,16 @@ def convert_png_to_bmp(png_file, output_dir="bitmaps", palette_name="daventry",
     """
     try:
         # Load PNG image
-        img = Image.open(png_file)
-        width, height = img.size
-        
-        if debug:
-            print(f"Processing: {os.path.basename(png_file)} ({width}x{height})")
-        
-        # Convert to 8-bit grayscale/palette mode if needed
-        if img.mode == 'P':
-            # If it's already palette mode, convert to L to get indices
-            img = img.convert('L')
-        elif img.mode in ['RGB', 'RGBA']:
-            # Convert RGB/RGBA to grayscale
-            img = img.convert('L')
-        elif img.mode != 'L':
-            # Convert any other mode to grayscale
-            img = img.convert('L')
-        
-        # Get pixel data
-        pixel_data = list(img.getdata())
-        
-        
-        # Daventry palette mappings
-        if   "consoles" in palette_name:
-            pixel_data = [
-                124 if pixel == 123 else
-                127 if pixel == 124 else
-                124 if pixel == 122 else
-                124 if pixel == 119 else
-                195 if pixel == 159 else
-                193 if pixel == 154 else
-                25 if pixel == 209 else #shadow
-                pixel 
-                for pixel in pixel_data
-            ]
-        elif   "daventry" in palette_name:
-            pixel_data = [
-                157 if pixel == 123 else
-                157 if pixel == 124 else
-                157 if pixel == 122 else
-                156 if pixel == 119 else
-                142 if pixel == 159 else
-                221 if pixel == 154 else
-                10 if pixel == 209 else #shadow
-                pixel 
-                for pixel in pixel_data
-            ]
-        elif "castled" in palette_name:
-            pixel_data = [
-                204 if pixel == 123 else
-                204 if pixel == 124 else
-                204 if pixel == 122 else
-                205 if pixel == 119 else
-                182 if pixel == 159 else
-                183 if pixel == 154 else
-                10 if pixel == 209 else #shadow
-                pixel 
-                for pixel in pixel_data
-            ]
-        elif "deadcity" in palette_name:
-            pixel_data = [
-                207 if pixel == 123 else
-                208 if pixel == 124 else
-                208 if pixel == 122 else
-                209 if pixel == 119 else
-                108 if pixel == 159 else
-                109 if pixel == 154 else
-                10 if pixel == 209 else #shadow
-                pixel 
-                for pixel in pixel_data
-            ]
-        elif "swamp" in palette_name:
-            pixel_data = [
-                235 if pixel == 123 else
-                235 if pixel == 124 else
-                230 if pixel == 122 else
-                231 if pixel == 119 else
-                230 if pixel == 159 else
-                112 if pixel == 154 else
-                10 if pixel == 209 else #shadow
-                pixel 
-                for pixel in pixel_data
-            ]
-        elif "gnome" in palette_name:
-            pixel_data = [
-                232 if pixel == 123 else
-                172 if pixel == 124 else
-                172 if pixel == 122 else
-                171 if pixel == 119 else
-                231 if pixel == 159 else
-                167 if pixel == 154 else
-                10 if pixel == 209 else #shadow
-                pixel 
-                for pixel in pixel_data
-            ]
-        elif "barren" in palette_name:
-            pixel_data = [
-                235 if pixel == 123 else
-                179 if pixel == 124 else
-                179 if pixel == 122 else
-                180 if pixel == 119 else
-                161 if pixel == 159 else
-                167 if pixel == 154 else
-                10 if pixel == 209 else #shadow
-                pixel 
-                for pixel in pixel_data
-            ]
-        elif "iceworld" in palette_name:
-            pixel_data = [
-                245 if pixel == 123 else
-                228 if pixel == 124 else
-                228 if pixel == 122 else
-                229 if pixel == 119 else
-                192 if pixel == 159 else
-                128 if pixel == 154 else
-                10 if pixel == 209 else #shadow
-                pixel 
-                for pixel in pixel_data
-            ]
-        elif "snowexit" in palette_name:
-            pixel_data = [
-                205 if pixel == 123 else
-                205 if pixel == 124 else
-                206 if pixel == 122 else
-                212 if pixel == 119 else
-                213 if pixel == 159 else
-                218 if pixel == 154 else
-                10 if pixel == 209 else #shadow
-                pixel 
-                for pixel in pixel_data
-            ]
-        elif "temple" in palette_name:
-            pixel_data = [
-                229 if pixel == 123 else
-                225 if pixel == 124 else
-                220 if pixel == 122 else
-                169 if pixel == 119 else
-                176 if pixel == 159 else
-                230 if pixel == 154 else
-                10 if pixel == 209 else #shadow
-                pixel 
-                for pixel in pixel_data
-            ]
-        
-        
-        # Set pixel (0,0) to width * height (KQ8 font format requirement)
-        dimension_encoding = width * height
-        if dimension_encoding > 255:
-            pixel_data[0] = dimension_encoding % 256  # Remainder in (0,0)
-            pixel_data[1] = dimension_encoding // 256  # Quotient in (1,0)
-        else:
-            pixel_data[0] = dimension_encoding
-        
-        # Create new image with modified data
-        output_img = Image.new('L', (width, height))
-        output_img.putdata(pixel_data)
-        
-        # Generate output filename
-        base_name = os.path.splitext(os.path.basename(png_file))[0]
-
-        # If bitmap number is between 096 and 122, add 96
-        if base_name.startswith('bitmap_'):
-            try:
-                bitmap_num = int(base_name.split('_')[1])
-                if 96 <= bitmap_num <= 122:
-                    new_num = bitmap_num + 96
-                    base_name = f"bitmap_{new_num:03d}"
-            except (ValueError, IndexError):
-                pass  # Keep original name if parsing fails
-        
-        output_file = os.path.join(output_dir, f"{base_name}.bmp")
-        
-        # Save as BMP
-        output_img.save(output_file, 'BMP')
-        
-        if debug:
-            print(f"  → Saved: {output_file}")
-            print(f"  → Dimensions: {width}x{height}, encoding: {dimension_encoding}")
+        with Image.open(png_file) as img:
+            width, height = img.size
+            
+            if debug:
+                print(f"Processing: {os.path.basename(png_file)} ({width}x{height})")
+            
+            # Get the 8-bit pixel data (palette indices)
+            arr = glyph_indices(img)
         
+        write_glyph_bmp(arr, png_file, output_dir, palette_name, debug)
         return True
         
     except Exception as e:
@@ -1,80 +1,90 @@
-import csv
-import re
 import argparse
 import os
+import sys
 
-# Parse command-line arguments
-parser = argparse.ArgumentParser(description='Process messages CSV file and generate cleaned text output')
-parser.add_argument('csv_file', help='Path to the input CSV file')
-parser.add_argument('output_dir', help='Path to the output directory')
-args = parser.parse_args()
-
-# Validate input file exists
-if not os.path.exists(args.csv_file):
-    print(f"Error: Input file '{args.csv_file}' not found.")
-    exit(1)
-
-# Generate output filename from CSV filename
-csv_basename = os.path.basename(args.csv_file)
-csv_name_without_ext = os.path.splitext(csv_basename)[0]
-output_filename = f"{csv_name_without_ext}_english.txt"
-output_file = os.path.join(args.output_dir, output_filename)
-
-# Read the CSV file and convert to list of dictionaries
-messages = []
-with open(args.csv_file, 'r', encoding='utf-8') as f:
-    reader = csv.DictReader(f)
-    for row in reader:
-        # Convert numeric fields to integers for proper sorting
-        row['noun'] = int(row['noun'])
-        row['verb'] = int(row['verb'])
-        row['case'] = int(row['case'])
-        row['sequence'] = int(row['sequence'])
-        messages.append(row)
-
-# Sort by noun, then verb, then case, then sequence
-messages.sort(key=lambda x: (x['noun'], x['verb'], x['case'], x['sequence']))
-
-# Function to remove all bracket sections from text
-def remove_brackets(text):
-    # Remove all patterns like ([...]), ([#]...), ([0]...), (TEXT), etc.
-    # This regex matches any text in parentheses (including nested brackets)
-    pattern = r'\([^)]*\)'
-    cleaned = re.sub(pattern, '', text)
-    # Only strip leading/trailing whitespace, preserve original spacing
-    cleaned = cleaned.strip()
-    return cleaned
-
-# Process messages and write to output file
-output_lines = []
-previous_case = None
-
-for msg in messages:
-    current_case = msg['case']
-    text = msg['text']
-    
-    # Remove all bracket sections
-    cleaned_text = remove_brackets(text)
-    
-    # Skip empty lines after bracket removal
-    if not cleaned_text:
-        continue
-    
-    # Add empty line if case changed (and it's not the first message)
-    if previous_case is not None and current_case != previous_case:
-        output_lines.append('')
-    
-    output_lines.append(cleaned_text)
-    previous_case = current_case
-
-# Create output directory if it doesn't exist
-if not os.path.exists(args.output_dir):
-    os.makedirs(args.output_dir)
-
-# Write to output file
-with open(output_file, 'w', encoding='utf-8') as f:
-    for line in output_lines:
-        f.write(line + '\n')
-
-print(f"Processed {len(messages)} messages")
-print(f"Output written to {output_file}")
+from text_normalize import remove_brackets, message_sort_key, read_messages_csv
+
+
+def run(rows):
+    """
+    Convert parsed message rows into the cleaned English text lines.
+
+    Messages are sorted by noun/verb/case/sequence, bracket sections are
+    removed and an empty line separates every change of case.
+
+    Args:
+        rows: List of message dicts with int noun/verb/case/sequence
+
+    Returns:
+        List of output lines (without newlines)
+    """
+    messages = sorted(rows, key=message_sort_key)
+
+    output_lines = []
+    previous_case = None
+
+    for msg in messages:
+        current_case = msg['case']
+
+        # Remove all bracket sections
+        cleaned_text = remove_brackets(msg['text'])
+
+        # Skip empty lines after bracket removal
+        if not cleaned_text:
+            continue
+
+        # Add empty line if case changed (and it's not the first message)
+        if previous_case is not None and current_case != previous_case:
+            output_lines.append('')
+
+        output_lines.append(cleaned_text)
+        previous_case = current_case
+
+    return output_lines
+
+
+def output_path_for(csv_file, output_dir):
+    """Generate output filename from CSV filename: <name>_english.txt"""
+    csv_name_without_ext = os.path.splitext(os.path.basename(csv_file))[0]
+    return os.path.join(output_dir, f"{csv_name_without_ext}_english.txt")
+
+
+def write_lines(lines, output_file):
+    """Write lines to a UTF-8 text file, creating the directory if needed"""
+    output_dir = os.path.dirname(output_file)
+    if output_dir and not os.path.exists(output_dir):
+        os.makedirs(output_dir)
+
+    with open(output_file, 'w', encoding='utf-8') as f:
+        for line in lines:
+            f.write(line + '\n')
+
+
+def process_file(csv_file, output_dir):
+    """Read a messages CSV, process it and write the English text file"""
+    _, messages = read_messages_csv(csv_file)
+    output_file = output_path_for(csv_file, output_dir)
+    write_lines(run(messages), output_file)
+    return len(messages), output_file
+
+
+def main(argv=None):
+    # Parse command-line arguments
+    parser = argparse.ArgumentParser(description='Process messages CSV file and generate cleaned text output')
+    parser.add_argument('csv_file', help='Path to the input CSV file')
+    parser.add_argument('output_dir', help='Path to the output directory')
+    args = parser.parse_args(argv)
+
+    # Validate input file exists
+    if not os.path.exists(args.csv_file):
+        print(f"Error: Input file '{args.csv_file}' not found.")
+        sys.exit(1)
+
+    count, output_file = process_file(args.csv_file, args.output_dir)
+
+    print(f"Processed {count} messages")
+    print(f"Output written to {output_file}")
+
+
+if __name__ == "__main__":
+    main()
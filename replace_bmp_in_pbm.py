@@ -1,25 +1,17 @@
 #!/usr/bin/env python3
 """
 Replace BMP data inside a PBM (PBMP) file.
-Assumes the BMP size hasn't changed - only the content.
+Assumes the BMP size hasn't changed - only the content, so the pixel region
+is overwritten in place (memory-mapped) instead of rewriting the file.
 
 Usage: python replace_bmp_in_pbm.py <pbm_file> <bmp_file>
 """
 
 import sys
-import struct
 import os
 from PIL import Image
 
-
-def read_string(file, length):
-    """Read a fixed-length string from file."""
-    return file.read(length).decode('ascii', errors='ignore')
-
-
-def read_uint32(file):
-    """Read a 4-byte unsigned integer (little endian)."""
-    return struct.unpack('<I', file.read(4))[0]
+from pbm_codec import read_pbm_header, patch_pbm_pixels, image_to_pixels
 
 
 def replace_bmp_in_pbm(pbm_path, bmp_path):
@@ -31,109 +23,46 @@ def replace_bmp_in_pbm(pbm_path, bmp_path):
         bmp_path: Path to BMP file with new data
     """
     try:
-        # Load the BMP file using PIL
-        img = Image.open(bmp_path)
-        
-        # Convert to 8-bit grayscale if not already
-        if img.mode != 'L':
-            img = img.convert('L')
+        # Load the BMP file using PIL (converted to 8-bit grayscale)
+        with Image.open(bmp_path) as img:
+            pixels = image_to_pixels(img)
         
         # Get BMP dimensions and pixel data
-        bmp_width, bmp_height = img.size
-        bmp_data = list(img.getdata())
-        bmp_bytes = bytes(bmp_data)
+        bmp_height, bmp_width = pixels.shape
         
         print(f"BMP File Information:")
         print(f"  Width: {bmp_width}")
         print(f"  Height: {bmp_height}")
-        print(f"  Data size: {len(bmp_bytes)} bytes")
+        print(f"  Data size: {pixels.nbytes} bytes")
         print()
         
-        # Read the PBM file
-        with open(pbm_path, 'rb') as pbm_file:
-            # Read and verify "PBMP" signature
-            signature = read_string(pbm_file, 4)
-            if signature != "PBMP":
-                print(f"Error: Invalid PBM file signature. Expected 'PBMP', got '{signature}'")
-                return False
-            
-            # Skip 4 bytes (ignore)
-            pbm_file.read(4)
-            
-            # Read and verify "head" signature
-            head_signature = read_string(pbm_file, 4)
-            if head_signature != "head":
-                print(f"Error: Invalid head signature. Expected 'head', got '{head_signature}'")
-                return False
-            
-            # Read header information
-            num_chunks = read_uint32(pbm_file)
-            version = read_uint32(pbm_file)
-            pbm_width = read_uint32(pbm_file)
-            pbm_height = read_uint32(pbm_file)
-            bit_count = read_uint32(pbm_file)
-            flags = read_uint32(pbm_file)
-            
-            print(f"PBM Header Information:")
-            print(f"  Width: {pbm_width}")
-            print(f"  Height: {pbm_height}")
-            print(f"  Bit count: {bit_count}")
-            print()
-            
-            # Verify dimensions match
-            if bmp_width != pbm_width or bmp_height != pbm_height:
-                print(f"Error: Dimension mismatch!")
-                print(f"  PBM: {pbm_width}x{pbm_height}")
-                print(f"  BMP: {bmp_width}x{bmp_height}")
-                return False
-            
-            # Read and verify "data" signature
-            data_signature = read_string(pbm_file, 4)
-            if data_signature != "data":
-                print(f"Error: Invalid data signature. Expected 'data', got '{data_signature}'")
-                return False
-            
-            # Read data size
-            data_size = read_uint32(pbm_file)
-            expected_size = pbm_height * pbm_width
-            
-            if len(bmp_bytes) != data_size:
-                print(f"Error: BMP data size doesn't match PBM data size!")
-                print(f"  PBM expects: {data_size} bytes")
-                print(f"  BMP provides: {len(bmp_bytes)} bytes")
-                return False
-            
-            # Remember position where BMP data starts
-            bmp_data_offset = pbm_file.tell()
-            
-            # Skip the old BMP data
-            pbm_file.read(data_size)
-            
-            # Read remaining bytes after BMP data (if any)
-            remaining_data = pbm_file.read()
+        header = read_pbm_header(pbm_path)
+        pbm_width, pbm_height = header['width'], header['height']
         
-        # Now write the modified PBM file
-        with open(pbm_path, 'rb') as pbm_file:
-            # Read everything up to the BMP data
-            header_data = pbm_file.read(bmp_data_offset)
+        print(f"PBM Header Information:")
+        print(f"  Width: {pbm_width}")
+        print(f"  Height: {pbm_height}")
+        print(f"  Bit count: {header['bit_count']}")
+        print()
+        
+        # Verify dimensions match
+        if bmp_width != pbm_width or bmp_height != pbm_height:
+            print(f"Error: Dimension mismatch!")
+            print(f"  PBM: {pbm_width}x{pbm_height}")
+            print(f"  BMP: {bmp_width}x{bmp_height}")
+            return False
         
-        # Write the complete file with new BMP data
-        with open(pbm_path, 'wb') as pbm_file:
-            # Write header (everything before BMP data)
-            pbm_file.write(header_data)
-            
-            # Write new BMP data
-            pbm_file.write(bmp_bytes)
-            
-            # Write remaining data (if any)
-            if remaining_data:
-                pbm_file.write(remaining_data)
+        # Overwrite the pixel region in place
+        patch_pbm_pixels(pbm_path, pixels)
         
         print(f"✓ Successfully replaced BMP data in PBM file: {pbm_path}")
-        print(f"  Replaced {len(bmp_bytes)} bytes of BMP data")
+        print(f"  Replaced {pixels.nbytes} bytes of BMP data")
         
         return True
         
+    except ValueError as e:
+        print(f"Error: {e}")
+        return False
     except FileNotFoundError as e:
         print(f"Error: Could not find file - {e}")
         return False
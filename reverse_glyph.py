@@ -1,28 +1,21 @@
 import os
+from concurrent.futures import ThreadPoolExecutor
 from PIL import Image
 import numpy as np
 import sys
 
+from glyph_transform import load_rules, rule_for, shift_for, shift_wrap, clear_first_row, DEFAULT_RULES
+
+DEFAULT_WORKERS = 4
+
 def count_empty_columns_indexed(arr):
     """
     Count how many columns contain only palette index 0 (background).
     For indexed color images.
     Returns: number of columns that are completely empty
     """
-    height, width = arr.shape[:2] if len(arr.shape) > 1 else (1, arr.shape[0])
-    empty_columns = 0
-    
-    for x in range(width):
-        column_is_empty = True
-        for y in range(height):
-            if arr[y, x] != 0:  # Not palette index 0
-                column_is_empty = False
-                break
-        
-        if column_is_empty:
-            empty_columns += 1
-    
-    return empty_columns
+    arr = arr.reshape(1, -1) if arr.ndim == 1 else arr
+    return int(arr.shape[1] - np.count_nonzero(arr.any(axis=0)))
 
 def shift_image_left_and_wrap_indexed(arr, shift_amount):
     """
@@ -36,52 +29,33 @@ def shift_image_left_and_wrap_indexed(arr, shift_amount):
     Returns:
         modified array
     """
-    height, width = arr.shape[:2] if len(arr.shape) > 1 else (1, arr.shape[0])
-    
-    # Save the leftmost columns
-    left_part = arr[:, :shift_amount].copy()
-    
-    # Shift the rest of the image left
-    arr[:, :width-shift_amount] = arr[:, shift_amount:]
-    
-    # Fill the rightmost columns with palette index 0 (black)
-    arr[:, width-shift_amount:] = 0
-    
-    # Place the saved left part on the right side, shifted up by 1 pixel
-    for y in range(height):
-        for x in range(shift_amount):
-            if left_part[y, x] != 0:  # Not background
-                # Shift up by 1: if y > 0, place at y-1
-                if y > 0:
-                    arr[y - 1, width - shift_amount + x] = left_part[y, x]
-    
-    return arr
+    return shift_wrap(arr[None], shift_amount, 'left')[0]
 
-def reverse_glyph(input_path, output_path, mask_output_path=None, fixed_width=None):
+def reverse_array(arr, name="", rule=None):
     """
-    Reverse the glyph processing:
+    Reverse the glyph processing on an array of palette indices:
     1. Zero the first 2 pixels in the first line
     2. Count black columns
-    3. Optionally pad to fixed width
-    4. Optionally create mask image
-    """
-    img = Image.open(input_path)
-    
-    # Save original image properties
-    original_mode = img.mode
+    3. Shift left and wrap according to the number of black columns
     
+    Args:
+        arr: numpy array of the image (palette indices)
+        name: File name for the progress messages
+        rule: "reverse" transform rule (default: from glyph_rules.json)
     
-    # Get pixel data as-is without any conversion
-    arr = np.array(img, dtype=np.uint8)
-
+    Returns:
+        Tuple of (array, empty_cols)
+    """
     # Check if color 224 exists in the array
     if 224 in arr:
         print(f"  Color 224 found in source image")
     
     width = arr.shape[1]
     
+    rule = rule or rule_for(load_rules(), 'reverse')
+    
     # Step 1: Zero the first 2 pixels in the first line (set to palette index 0)
-    arr[0, :2] = 0
+    clear_first_row(arr, rule)
 
     if 224 not in arr:
         print(f"  Color 224 NOT found in source image")
@@ -89,58 +63,143 @@ def reverse_glyph(input_path, output_path, mask_output_path=None, fixed_width=No
     # Step 2: Count black columns (columns with only palette index 0)
     empty_cols = count_empty_columns_indexed(arr)
     
-    print(f"Processing {os.path.basename(input_path)}: width={width}, empty_columns={empty_cols}")
+    print(f"Processing {name}: width={width}, empty_columns={empty_cols}")
     
-    # Step 3: If empty_cols == 2, shift left by 4 and wrap to right side shifted up by 1
-    if empty_cols == 2:
-        arr = shift_image_left_and_wrap_indexed(arr, 4)
-    elif empty_cols == 4 or empty_cols == 3:
-        arr = shift_image_left_and_wrap_indexed(arr, 3)
-    elif empty_cols == 5:
-        arr = shift_image_left_and_wrap_indexed(arr, 2)
+    # Step 3: Shift left and wrap to the right side shifted up by 1
+    # (2 empty columns -> 4, 3 or 4 -> 3, 5 -> 2, see the "reverse" transform in glyph_rules.json)
+    shift_amount = shift_for(rule, width, empty_cols)
+    if shift_amount:
+        arr = shift_image_left_and_wrap_indexed(arr, shift_amount)
     
     # Step 4: Change all pixels with color 58 to 0
     #arr[arr == 58] = 0
     #arr[arr < 120] = 0
     #arr[arr > 221] = 0
     
-    # Step 4.5: Create mask image before padding (all non-zero colors become 255)
-    if mask_output_path is not None:
-        mask_arr = arr.copy()
-        mask_arr[mask_arr != 0] = 255
-    
-    # Step 5: Pad to fixed width if specified
-    if fixed_width is not None:
-        current_width = arr.shape[1]
-        if current_width < fixed_width:
-            padding_needed = fixed_width - current_width
-            left_pad = padding_needed // 2
-            right_pad = padding_needed - left_pad
-            
-            height = arr.shape[0]
-            new_arr = np.zeros((height, fixed_width), dtype=arr.dtype)
-            new_arr[:, left_pad:left_pad+current_width] = arr
-            arr = new_arr
-            
-            # Also pad mask image if it exists
-            if mask_output_path is not None:
-                new_mask_arr = np.zeros((height, fixed_width), dtype=mask_arr.dtype)
-                new_mask_arr[:, left_pad:left_pad+current_width] = mask_arr
-                mask_arr = new_mask_arr
-            
-            print(f"  Padded from {current_width} to {fixed_width} (left={left_pad}, right={right_pad})")
+    return arr, empty_cols
+
+def pad_to_fixed_width(stack, fixed_width):
+    """
+    Center glyphs in a fixed width (the last axis), padding with index 0.
+    Works on a single (H, W) glyph or a (N, H, W) stack of equal-sized glyphs.
+    
+    Returns:
+        Tuple of (padded array, left_pad, right_pad); unchanged if already wide enough
+    """
+    current_width = stack.shape[-1]
+    if fixed_width is None or current_width >= fixed_width:
+        return stack, 0, 0
+    
+    padding_needed = fixed_width - current_width
+    left_pad = padding_needed // 2
+    right_pad = padding_needed - left_pad
+    
+    padded = np.zeros(stack.shape[:-1] + (fixed_width,), dtype=stack.dtype)
+    padded[..., left_pad:left_pad+current_width] = stack
+    return padded, left_pad, right_pad
+
+def make_mask(stack):
+    """Mask image(s): all non-zero colors become 255"""
+    return np.where(stack != 0, 255, 0).astype(np.uint8)
+
+def reverse_glyph(input_path, output_path, mask_output_path=None, fixed_width=None, rule=None):
+    """
+    Reverse the glyph processing:
+    1. Zero the first 2 pixels in the first line
+    2. Count black columns
+    3. Optionally pad to fixed width
+    4. Optionally create mask image
+    """
+    # Get pixel data as-is without any conversion
+    with Image.open(input_path) as img:
+        arr = np.array(img, dtype=np.uint8)
+    
+    arr, empty_cols = reverse_array(arr, os.path.basename(input_path), rule)
+    
+    # Pad to fixed width if specified
+    current_width = arr.shape[1]
+    arr, left_pad, right_pad = pad_to_fixed_width(arr, fixed_width)
+    if arr.shape[1] != current_width:
+        print(f"  Padded from {current_width} to {fixed_width} (left={left_pad}, right={right_pad})")
     
-    # Create output image with exact same mode as input
-    img_result = Image.fromarray(arr)
-    img_result.save(output_path)
+    Image.fromarray(arr).save(output_path)
     
-    # Save mask image if requested
+    # Save mask image if requested (padding is 0 in the mask too)
     if mask_output_path is not None:
-        mask_result = Image.fromarray(mask_arr)
-        mask_result.save(mask_output_path)
+        Image.fromarray(make_mask(arr)).save(mask_output_path)
     
     return empty_cols
 
+def load_glyph(path):
+    """Read a glyph as a uint8 array of palette indices"""
+    with Image.open(path) as img:
+        return np.array(img, dtype=np.uint8)
+
+def reverse_directory(filenames, input_dir, output_dir, mask_output_dir=None, fixed_width=None,
+                      max_workers=DEFAULT_WORKERS, rules_file=DEFAULT_RULES):
+    """
+    Reverse many glyphs at once.
+    
+    Files are decoded and encoded on a thread pool. Glyphs of the same size are
+    padded and masked as one (N, H, W) stack.
+    
+    The shift table is the "reverse" transform of the rules file, with the
+    overrides of the input directory's glyph set.
+    
+    Returns:
+        Number of processed files
+    """
+    rule = rule_for(load_rules(rules_file), 'reverse', os.path.basename(os.path.normpath(input_dir)))
+    
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        loaded = list(pool.map(
+            lambda filename: _try(load_glyph, os.path.join(input_dir, filename)), filenames))
+        
+        results = {}
+        for filename, (arr, error) in zip(filenames, loaded):
+            if error is not None:
+                print(f"Error processing {filename}: {error}")
+                continue
+            arr, _ = reverse_array(arr, filename, rule)
+            results[filename] = arr
+        
+        # Group equal-sized glyphs and pad/mask each group as one stack
+        groups = {}
+        for filename, arr in results.items():
+            groups.setdefault(arr.shape, []).append(filename)
+        
+        outputs = []
+        for shape, names in groups.items():
+            stack, left_pad, right_pad = pad_to_fixed_width(np.stack([results[name] for name in names]), fixed_width)
+            if stack.shape[-1] != shape[-1]:
+                for name in names:
+                    print(f"  {name}: padded from {shape[-1]} to {fixed_width} (left={left_pad}, right={right_pad})")
+            masks = make_mask(stack) if mask_output_dir is not None else [None] * len(names)
+            outputs.extend(zip(names, stack, masks))
+        
+        def save(item):
+            name, arr, mask = item
+            Image.fromarray(arr).save(os.path.join(output_dir, name))
+            if mask is not None:
+                Image.fromarray(mask).save(os.path.join(mask_output_dir, name))
+        
+        saved = list(pool.map(lambda item: _try(save, item), outputs))
+    
+    processed_count = 0
+    for (name, _, _), (_, error) in zip(outputs, saved):
+        if error is not None:
+            print(f"Error processing {name}: {error}")
+        else:
+            processed_count += 1
+    return processed_count
+
+def _try(func, *args):
+    """Run func on a worker, returning (result, error) instead of raising"""
+    try:
+        return func(*args), None
+    except Exception as e:
+        return None, e
+
 if __name__ == "__main__":
     import argparse
     
@@ -151,6 +210,8 @@ if __name__ == "__main__":
     parser.add_argument('--fixed_width', type=int, help='Pad images to this fixed width (optional)')
     parser.add_argument('--from', dest='from_index', type=int, help='Process bitmaps starting from this index (optional)')
     parser.add_argument('--to', dest='to_index', type=int, help='Process bitmaps up to this index (optional)')
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS, help=f'Number of parallel workers (default: {DEFAULT_WORKERS})')
+    parser.add_argument('--rules', default=DEFAULT_RULES, help='Glyph rules file (default: glyph_rules.json)')
     
     args = parser.parse_args()
     
@@ -187,10 +248,10 @@ if __name__ == "__main__":
         range_str = f"from {from_index if from_index is not None else 'start'} to {to_index if to_index is not None else 'end'}"
         print(f"Index range filter: {range_str}")
     
-    # Process all BMP files in input directory
-    processed_count = 0
+    # Collect the BMP files in input directory
+    filenames = []
     skipped_count = 0
-    for filename in os.listdir(input_dir):
+    for filename in sorted(os.listdir(input_dir)):
         if filename.lower().endswith('.bmp'):
             # If range filter is active, check if filename matches bitmap_###.bmp pattern
             if from_index is not None or to_index is not None:
@@ -217,15 +278,11 @@ if __name__ == "__main__":
                     skipped_count += 1
                     continue
             
-            input_path = os.path.join(input_dir, filename)
-            output_path = os.path.join(output_dir, filename)
-            mask_output_path = os.path.join(mask_output_dir, filename) if mask_output_dir else None
-            
-            try:
-                empty_cols = reverse_glyph(input_path, output_path, mask_output_path, fixed_width)
-                processed_count += 1
-            except Exception as e:
-                print(f"Error processing {filename}: {e}")
+            filenames.append(filename)
+    
+    # Process all selected files as one batch
+    processed_count = reverse_directory(filenames, input_dir, output_dir, mask_output_dir, fixed_width,
+                                        args.workers, args.rules)
     
     if skipped_count > 0:
         print(f"\nSkipped {skipped_count} files outside range.")
@@ -1,8 +1,12 @@
 from doctest import debug
+from itertools import islice
 from typing import List, Optional
 import sys
 import math
 
+# Chunk groupings unsplit_string checks before giving up
+UNSPLIT_CANDIDATES = 20
+
 def calculate_weighted_length(text: str) -> float:
     """
     Calculate the weighted length of text where spaces, commas, and dots count as 0.5
@@ -207,6 +211,50 @@ def split_string(input: str, max_length: int, debug: bool = True):
         #print(f"Length: {len(final_result)}")
 
 
+def unsplit_string(display: str, max_length: int) -> Optional[str]:
+    """
+    Recover the text split_string was given from its output.
+
+    The '~' padding is dropped and the words are regrouped into the chunks
+    split_string_by_length_internal cut: each chunk fits max_length and would
+    not fit with the next word of the original text (the last word of the next
+    reversed chunk). The first UNSPLIT_CANDIDATES groupings that satisfy this
+    are checked by splitting them again.
+
+    Returns:
+        The original text, or None when it cannot be recovered exactly
+        (e.g. split with another max_length, or bracketed content removed)
+    """
+    words = display.replace('~', ' ').split()
+    count = len(words)
+
+    # ends[start]: chunk ends that leave a valid grouping of words[start:],
+    # filled from the last word backwards
+    ends = [[] for _ in range(count + 1)]
+    for start in range(count - 1, -1, -1):
+        for end in range(start + 1, count + 1):
+            chunk = ' '.join(words[start:end])
+            if end > start + 1 and calculate_weighted_length(chunk) > max_length:
+                break
+            if end == count or any(calculate_weighted_length(chunk + ' ' + words[next_end - 1]) > max_length
+                                   for next_end in ends[end]):
+                ends[start].append(end)
+
+    def groupings(start):
+        if start == count:
+            yield []
+            return
+        for end in reversed(ends[start]):
+            for rest in groupings(end):
+                yield [' '.join(words[start:end])] + rest
+
+    for chunks in islice(groupings(0), UNSPLIT_CANDIDATES):
+        candidate = ' '.join(chunk[::-1] for chunk in chunks)
+        if split_string(candidate, max_length, False) == display:
+            return candidate
+    return None
+
+
 if __name__ == "__main__":
     # Parse command line arguments
     if len(sys.argv) == 3:
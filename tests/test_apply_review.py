@@ -0,0 +1,79 @@
+"""Re-importing an unchanged review sheet must not change any Hebrew line"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from apply_review import apply_review, read_review, merge_review, read_text_lines
+from create_csv import create_csv
+from csv_xlsx_drive_v3 import CSVXLSXDriveManager
+
+# The same English line translated differently in two contexts
+ENGLISH = [
+    "Hmmm...how can I stop this wheel?",
+    "Hello there.",
+    "",
+    "Hmmm...how can I stop this wheel?",
+    "I need a stronger implement.",
+]
+HEBREW = [
+    "הממ...כיצד אוכל לעצור את הגלגל הזה?",
+    "שלום לך.",
+    "",
+    "הממ...איך אוכל לעצור את הגלגל הזה?",
+    "",
+]
+
+
+def write_scene(tmp_path):
+    scene_dir = tmp_path / "scene"
+    scene_dir.mkdir()
+    for name, lines in (("1000_messages_english.txt", ENGLISH), ("1000_messages_hebrew.txt", HEBREW)):
+        (scene_dir / name).write_text("\n".join(lines) + "\n", encoding="utf-8")
+    (scene_dir / "1000_messages.csv").write_text("noun,verb,case,sequence,talker,text_offset,"
+                                                 "ref_noun,ref_verb,ref_case,ref_sequence,text\n",
+                                                 encoding="utf-8")
+    return scene_dir
+
+
+def export_review(scene_dir, tmp_path):
+    csv_path = tmp_path / "1000_review.csv"
+    xlsx_path = tmp_path / "1000_review.xlsx"
+    create_csv(str(scene_dir / "1000_messages_english.txt"), str(scene_dir / "1000_messages_hebrew.txt"),
+               str(csv_path))
+    assert CSVXLSXDriveManager().csv_to_xlsx(str(csv_path), str(xlsx_path))
+    return xlsx_path
+
+
+def test_unchanged_export_merges_without_changes(tmp_path):
+    scene_dir = write_scene(tmp_path)
+    review = read_review(str(export_review(scene_dir, tmp_path)))
+
+    merged, changed = merge_review(ENGLISH, HEBREW, review)
+
+    assert changed == 0
+    assert merged == HEBREW
+
+
+def test_unchanged_export_does_not_rebuild(tmp_path):
+    scene_dir = write_scene(tmp_path)
+    xlsx_path = export_review(scene_dir, tmp_path)
+    output_msg = tmp_path / "out" / "1000.MSG"
+
+    assert apply_review(str(xlsx_path), str(scene_dir), "1000", str(output_msg)) == 0
+    assert not output_msg.exists()
+    assert read_text_lines(str(scene_dir / "1000_messages_hebrew.txt")) == HEBREW
+
+
+def test_edited_row_changes_only_its_line(tmp_path):
+    scene_dir = write_scene(tmp_path)
+    review = read_review(str(export_review(scene_dir, tmp_path)))
+    key = next(iter(review))
+    review[key][1] = "עריכה"
+
+    merged, changed = merge_review(ENGLISH, HEBREW, review)
+
+    assert changed == 1
+    assert merged[0] == HEBREW[0]
+    assert merged[3] == "עריכה"
@@ -0,0 +1,47 @@
+"""The lookup cube finds the true nearest color and dithering matches plain Floyd-Steinberg"""
+
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from convert_24bit_to_palette import nearest_indices, quantize_array
+from palette import Palette
+
+
+def brute_force_nearest(colors, palette):
+    distances = ((colors.reshape(-1, 1, 3).astype(np.int64) - palette.rgb.astype(np.int64)) ** 2).sum(axis=2)
+    return distances.argmin(axis=1).reshape(colors.shape[:-1])
+
+
+def test_nearest_matches_brute_force():
+    rng = np.random.default_rng(0)
+    # Random colors, and a palette with duplicates and a dense gray ramp
+    palettes = [Palette(rng.integers(0, 256, (256, 3))),
+                Palette(np.repeat(np.arange(0, 256, 2), 6).reshape(-1, 3)),
+                Palette(np.tile([[10, 20, 30], [200, 100, 0]], (128, 1)))]
+    colors = rng.integers(0, 256, (20000, 3)).astype(np.uint8)
+    for palette in palettes:
+        assert (nearest_indices(colors, palette) == brute_force_nearest(colors, palette)).all()
+
+
+def test_dither_matches_sequential_floyd_steinberg():
+    rng = np.random.default_rng(1)
+    palette = Palette(rng.integers(0, 256, (256, 3)))
+    pixels = rng.integers(0, 256, (12, 17, 3)).astype(np.uint8)
+
+    work = pixels.astype(np.float32)
+    expected = np.empty(pixels.shape[:2], dtype=np.uint8)
+    height, width = expected.shape
+    for y in range(height):
+        for x in range(width):
+            color = np.clip(work[y, x] + 0.5, 0, 255).astype(np.uint8)
+            expected[y, x] = brute_force_nearest(color, palette)
+            error = work[y, x] - palette.rgb[expected[y, x]]
+            for dy, dx, weight in ((0, 1, 0.4375), (1, -1, 0.1875), (1, 0, 0.3125), (1, 1, 0.0625)):
+                if y + dy < height and 0 <= x + dx < width:
+                    work[y + dy, x + dx] += error * np.float32(weight)
+
+    assert (quantize_array(pixels, palette, dither=True) == expected).all()
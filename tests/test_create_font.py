@@ -0,0 +1,52 @@
+"""Mipmap levels keep palette indices and stored levels of unchanged bitmaps are copied"""
+
+import hashlib
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from create_font import downsample, mipmap_stack, pixel_data, stored_mipmaps
+
+TEXT = 157
+
+
+def glyph(width=16, height=21):
+    arr = np.zeros((height, width), dtype=np.uint8)
+    arr[4:16, 3:12] = TEXT
+    # Dimension encoding: 336 = 80 + 1 * 256
+    arr[0, 0], arr[0, 1] = (width * height) % 256, (width * height) // 256
+    return arr
+
+
+def test_downsample_picks_existing_indices():
+    arr = np.array([[TEXT, 0, TEXT, TEXT],
+                    [0, TEXT, TEXT, 0]], dtype=np.uint8)
+    # A 2-2 tie keeps the top-left index, 3-1 the majority; never the mean (78/79)
+    assert downsample(arr).tolist() == [[TEXT, TEXT]]
+
+
+def test_encoding_pixels_stay_out_of_the_levels():
+    levels = mipmap_stack(glyph()[None], 3)
+    assert [level.shape[1:] for level in levels] == [(21, 16), (10, 8), (5, 4)]
+    for level in levels[1:]:
+        assert set(np.unique(level)) <= {0, TEXT}
+
+
+def test_stored_levels_are_copied_for_unchanged_bitmaps():
+    arr = glyph()
+    bitmap = {'index': 0, 'width': 16, 'height': 21, 'data': arr.tobytes()}
+    stored = bytes(range(10 * 8 + 5 * 4))
+    header = {'mipmap_levels': 3, 'base_md5': hashlib.md5(arr.tobytes()).hexdigest(), 'mipmap_data': stored.hex()}
+
+    levels = stored_mipmaps(header, bitmap)
+    assert pixel_data([bitmap], [3], [levels]) == [arr.tobytes() + stored]
+
+    # An edited base bitmap gets regenerated levels
+    arr[10, 5] = 0
+    edited = dict(bitmap, data=arr.tobytes())
+    assert stored_mipmaps(header, edited) is None
+    regenerated, = pixel_data([edited], [3], [None])
+    assert regenerated == b''.join(level[0].tobytes() for level in mipmap_stack(arr[None], 3))
@@ -0,0 +1,57 @@
+"""Resumable uploads to the fake Drive are only stored once every byte has arrived"""
+
+import json
+import os
+import sys
+from urllib.parse import urlsplit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fake_drive import FakeDriveStore
+
+BASE_URL = 'http://127.0.0.1:8765/'
+CONTENT = b'0123456789' * 10
+
+
+def start_upload(store):
+    status, headers, _ = store.handle('POST', '/upload/drive/v3/files?uploadType=resumable&fields=id,size',
+                                      {}, json.dumps({'name': 'chunked.bin'}).encode('utf-8'), BASE_URL)
+    assert status == 200
+    location = urlsplit(headers['Location'])
+    return f"{location.path}?{location.query}"
+
+
+def put(store, url, content_range, body=b''):
+    return store.handle('PUT', url, {'content-range': content_range}, body, BASE_URL)
+
+
+def test_status_query_keeps_the_session(tmp_path):
+    store = FakeDriveStore(str(tmp_path))
+    url = start_upload(store)
+
+    # Nothing received yet: 308 without a Range, no file stored
+    status, headers, _ = put(store, url, f'bytes */{len(CONTENT)}')
+    assert status == 308 and 'Range' not in headers
+    assert store.metadata == {}
+
+    status, headers, _ = put(store, url, f'bytes 0-39/{len(CONTENT)}', CONTENT[:40])
+    assert status == 308 and headers['Range'] == 'bytes=0-39'
+
+    status, headers, _ = put(store, url, f'bytes */{len(CONTENT)}')
+    assert status == 308 and headers['Range'] == 'bytes=0-39'
+    assert store.metadata == {}
+
+    status, _, body = put(store, url, f'bytes 40-99/{len(CONTENT)}', CONTENT[40:])
+    assert status == 200
+    item = json.loads(body)
+    assert item['size'] == str(len(CONTENT))
+    assert (tmp_path / item['id']).read_bytes() == CONTENT
+    assert store.sessions == {}
+
+
+def test_whole_body_without_content_range(tmp_path):
+    store = FakeDriveStore(str(tmp_path))
+    url = start_upload(store)
+    status, _, body = store.handle('PUT', url, {}, CONTENT, BASE_URL)
+    assert status == 200
+    assert (tmp_path / json.loads(body)['id']).read_bytes() == CONTENT
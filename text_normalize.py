@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Shared text normalization helpers for the translation pipeline.
+Regex patterns are compiled once at import time and reused by every stage
+(process_messages, translate_csv, map_files).
+"""
+
+import csv
+import re
+
+# Matches any text in parentheses: ([...]), ([#]...), ([0]...), (TEXT), etc.
+BRACKETS_RE = re.compile(r'\([^)]*\)')
+
+# Runs of whitespace, collapsed when building translation-memory keys
+WHITESPACE_RE = re.compile(r'\s+')
+
+# Numeric MSG header fields used for ordering messages
+SORT_FIELDS = ('noun', 'verb', 'case', 'sequence')
+
+
+def remove_brackets(text):
+    """
+    Remove all bracket sections from text.
+    Only leading/trailing whitespace is stripped, original spacing is preserved.
+    """
+    return BRACKETS_RE.sub('', text).strip()
+
+
+def normalize_key(text):
+    """
+    Normalized English key used for translation lookups:
+    brackets removed and whitespace runs collapsed to a single space.
+    """
+    return WHITESPACE_RE.sub(' ', remove_brackets(text))
+
+
+def message_sort_key(msg):
+    """Sort key: noun, then verb, then case, then sequence"""
+    return (msg['noun'], msg['verb'], msg['case'], msg['sequence'])
+
+
+def read_messages_csv(csv_file):
+    """
+    Read a messages CSV (as written by parse_msg.py).
+
+    Returns:
+        Tuple of (fieldnames, rows) where the sort fields are converted to int
+    """
+    messages = []
+    with open(csv_file, 'r', encoding='utf-8') as f:
+        reader = csv.DictReader(f)
+        fieldnames = reader.fieldnames
+        for row in reader:
+            # Convert numeric fields to integers for proper sorting
+            for field in SORT_FIELDS:
+                row[field] = int(row[field])
+            messages.append(row)
+    return fieldnames, messages
@@ -1,38 +1,15 @@
 import csv
-import re
 import argparse
 import os
+import sys
 
-# Parse command-line arguments
-parser = argparse.ArgumentParser(description='Translate CSV messages using mapping file')
-parser.add_argument('csv_file', help='Path to the input CSV file')
-parser.add_argument('mapping_file', help='Path to the mapping file (English === Hebrew)')
-parser.add_argument('output_file', help='Path to the output CSV file')
-args = parser.parse_args()
-
-# Validate input files exist
-if not os.path.exists(args.csv_file):
-    print(f"Error: Input CSV file '{args.csv_file}' not found.")
-    exit(1)
-
-if not os.path.exists(args.mapping_file):
-    print(f"Error: Mapping file '{args.mapping_file}' not found.")
-    exit(1)
-
-# Function to remove all bracket sections from text
-def remove_brackets(text):
-    # Remove all patterns like ([...]), ([#]...), ([0]...), (TEXT), etc.
-    pattern = r'\([^)]*\)'
-    cleaned = re.sub(pattern, '', text)
-    # Only strip leading/trailing whitespace, preserve original spacing
-    cleaned = cleaned.strip()
-    return cleaned
-
-# Read and parse mapping file
-print("Reading mapping file...")
-mapping = {}
-with open(args.mapping_file, 'r', encoding='utf-8') as f:
-    for line in f:
+from text_normalize import remove_brackets, normalize_key, message_sort_key, read_messages_csv
+
+
+def parse_mapping(lines):
+    """Parse mapping lines (English === Hebrew) into a dictionary"""
+    mapping = {}
+    for line in lines:
         line = line.strip()
         if not line:  # Skip empty lines
             continue
@@ -41,78 +18,193 @@ with open(args.mapping_file, 'r', encoding='utf-8') as f:
             # Use the cleaned English text as key (remove brackets for matching)
             english_cleaned = remove_brackets(english)
             mapping[english_cleaned] = hebrew
+    return mapping
+
 
-print(f"Loaded {len(mapping)} translations from mapping file")
-
-# Read the CSV file and convert to list of dictionaries
-print("Reading CSV file...")
-messages = []
-with open(args.csv_file, 'r', encoding='utf-8') as f:
-    reader = csv.DictReader(f)
-    fieldnames = reader.fieldnames
-    for row in reader:
-        # Convert numeric fields to integers for proper sorting
-        row['noun'] = int(row['noun'])
-        row['verb'] = int(row['verb'])
-        row['case'] = int(row['case'])
-        row['sequence'] = int(row['sequence'])
-        messages.append(row)
-
-# Sort by noun, then verb, then case, then sequence
-messages.sort(key=lambda x: (x['noun'], x['verb'], x['case'], x['sequence']))
-
-# Translate messages
-print("Translating messages...")
-translated_count = 0
-not_found_count = 0
-
-for msg in messages:
-    original_text = msg['text']
-    if "You are about" in original_text:
-        print(f"Debug: Original text='{original_text}'")
-    # Remove brackets from original text to match mapping
-    cleaned_text = remove_brackets(original_text)
-    
-    # Look up Hebrew translation
-    if '\n' in cleaned_text:
-        # Handle multi-line text
-        lines = cleaned_text.split('\n')
-        translated_lines = []
-        for line in lines:
+def load_mapping(mapping_file):
+    """Read and parse a mapping file (English === Hebrew)"""
+    with open(mapping_file, 'r', encoding='utf-8') as f:
+        return parse_mapping(f)
+
+
+def untranslated_lines(messages, mapping):
+    """Return the cleaned English lines that are missing from the mapping"""
+    missing = set()
+    for msg in messages:
+        for line in remove_brackets(msg['text']).split('\n'):
             line = line.strip()
-            if line in mapping:
-                translated_lines.append(mapping[line])
-            else:
-                print(f"Warning: Translation not found for line: '{line[:50]}...'")
-                translated_lines.append(line)  # Keep original line if no translation
-        msg['text'] = '\n'.join(translated_lines)
-        translated_count += 1
-    elif cleaned_text in mapping:
-        msg['text'] = mapping[cleaned_text]
-        translated_count += 1
-    else:
-        # If not found, keep original or mark as missing
-        print(f"Warning: Translation not found for: '{cleaned_text[:50]}...' original_text={original_text}")
-        msg['text'] = cleaned_text  # Keep cleaned English text if no translation
-        not_found_count += 1
-
-# Write translated CSV file
-print(f"Writing translated CSV to {args.output_file}...")
-with open(args.output_file, 'w', encoding='utf-8', newline='') as f:
-    writer = csv.DictWriter(f, fieldnames=fieldnames)
-    writer.writeheader()
+            if line and line not in mapping:
+                missing.add(line)
+    return missing
+
+
+def mapped_lines(messages, mapping):
+    """Return the cleaned English lines of the messages that the mapping translates"""
+    mapped = set()
+    for msg in messages:
+        for line in remove_brackets(msg['text']).split('\n'):
+            line = line.strip()
+            if line and line in mapping:
+                mapped.add(line)
+    return mapped
+
+
+def sync_memory(tm_path, messages, mapping, max_length, scene):
+    """
+    Store the mapping entries the messages use in the translation memory
+    (like map_files does for its pairs) and query it for the lines missing
+    from the mapping.
+
+    The mapping holds Hebrew split for display, so each entry is stored as
+    the text split_string was given (see split_text.unsplit_string); entries
+    that cannot be recovered exactly are left out.
+
+    Returns:
+        Dictionary of normalized English key -> Hebrew, split for display
+        with split_string like map_files does
+    """
+    from translation_memory import TranslationMemory
+    from split_text import split_string, unsplit_string
+
+    entries = []
+    for line in mapped_lines(messages, mapping):
+        hebrew = unsplit_string(mapping[line], max_length)
+        if hebrew is not None:
+            entries.append((line, hebrew))
+    missing = untranslated_lines(messages, mapping)
+
+    with TranslationMemory(tm_path) as tm:
+        stored = tm.add_many(entries, scene)
+        found = tm.lookup_many(missing)
+
+    print(f"Translation memory: stored {stored} entries, found {len(found)} of {len(missing)} missing lines")
+    return {key: split_string(hebrew, max_length, False) for key, hebrew in found.items()}
+
+
+def lookup(line, mapping, memory):
+    """Look up a cleaned English line in the mapping, then in the memory"""
+    if line in mapping:
+        return mapping[line]
+    if memory:
+        return memory.get(normalize_key(line))
+    return None
+
+
+def translate_messages(messages, mapping, memory=None):
+    """
+    Translate message texts in place.
+
+    Args:
+        messages: List of message dicts (as returned by read_messages_csv)
+        mapping: Dictionary of cleaned English -> Hebrew from the mapping file
+        memory: Optional dictionary of normalized English -> Hebrew used as fallback
+
+    Returns:
+        Tuple of (translated_count, not_found_count)
+    """
+    translated_count = 0
+    not_found_count = 0
+
     for msg in messages:
-        # Convert numeric fields back to strings for CSV
-        row = msg.copy()
-        row['noun'] = str(row['noun'])
-        row['verb'] = str(row['verb'])
-        row['case'] = str(row['case'])
-        row['sequence'] = str(row['sequence'])
-        writer.writerow(row)
-
-print(f"\nTranslation complete!")
-print(f"  Translated: {translated_count} messages")
-print(f"  Not found: {not_found_count} messages")
-print(f"  Total: {len(messages)} messages")
-print(f"  Output written to: {args.output_file}")
+        original_text = msg['text']
+        if "You are about" in original_text:
+            print(f"Debug: Original text='{original_text}'")
+        # Remove brackets from original text to match mapping
+        cleaned_text = remove_brackets(original_text)
+
+        # Look up Hebrew translation
+        if '\n' in cleaned_text:
+            # Handle multi-line text
+            lines = cleaned_text.split('\n')
+            translated_lines = []
+            for line in lines:
+                line = line.strip()
+                hebrew = lookup(line, mapping, memory)
+                if hebrew is not None:
+                    translated_lines.append(hebrew)
+                else:
+                    print(f"Warning: Translation not found for line: '{line[:50]}...'")
+                    translated_lines.append(line)  # Keep original line if no translation
+            msg['text'] = '\n'.join(translated_lines)
+            translated_count += 1
+            continue
+
+        hebrew = lookup(cleaned_text, mapping, memory)
+        if hebrew is not None:
+            msg['text'] = hebrew
+            translated_count += 1
+        else:
+            # If not found, keep original or mark as missing
+            print(f"Warning: Translation not found for: '{cleaned_text[:50]}...' original_text={original_text}")
+            msg['text'] = cleaned_text  # Keep cleaned English text if no translation
+            not_found_count += 1
+
+    return translated_count, not_found_count
+
+
+def write_translated_csv(messages, fieldnames, output_file):
+    """Write translated messages back to CSV"""
+    with open(output_file, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=fieldnames)
+        writer.writeheader()
+        for msg in messages:
+            # Convert numeric fields back to strings for CSV
+            row = msg.copy()
+            row['noun'] = str(row['noun'])
+            row['verb'] = str(row['verb'])
+            row['case'] = str(row['case'])
+            row['sequence'] = str(row['sequence'])
+            writer.writerow(row)
+
+
+def main():
+    # Parse command-line arguments
+    parser = argparse.ArgumentParser(description='Translate CSV messages using mapping file')
+    parser.add_argument('csv_file', help='Path to the input CSV file')
+    parser.add_argument('mapping_file', help='Path to the mapping file (English === Hebrew)')
+    parser.add_argument('output_file', help='Path to the output CSV file')
+    parser.add_argument('--tm', help='Translation memory database to populate from the mapping and use for lines missing from it')
+    parser.add_argument('--max-length', type=int, default=26,
+                        help='Maximum line length for translation memory entries (default: 26)')
+    args = parser.parse_args()
+
+    # Validate input files exist
+    if not os.path.exists(args.csv_file):
+        print(f"Error: Input CSV file '{args.csv_file}' not found.")
+        sys.exit(1)
+
+    if not os.path.exists(args.mapping_file):
+        print(f"Error: Mapping file '{args.mapping_file}' not found.")
+        sys.exit(1)
+
+    print("Reading mapping file...")
+    mapping = load_mapping(args.mapping_file)
+    print(f"Loaded {len(mapping)} translations from mapping file")
+
+    # Read the CSV file and convert to list of dictionaries
+    print("Reading CSV file...")
+    fieldnames, messages = read_messages_csv(args.csv_file)
+
+    # Sort by noun, then verb, then case, then sequence
+    messages.sort(key=message_sort_key)
+
+    memory = None
+    if args.tm:
+        scene = os.path.basename(args.csv_file).split('_')[0]
+        memory = sync_memory(args.tm, messages, mapping, args.max_length, scene)
+
+    print("Translating messages...")
+    translated_count, not_found_count = translate_messages(messages, mapping, memory)
+
+    print(f"Writing translated CSV to {args.output_file}...")
+    write_translated_csv(messages, fieldnames, args.output_file)
+
+    print(f"\nTranslation complete!")
+    print(f"  Translated: {translated_count} messages")
+    print(f"  Not found: {not_found_count} messages")
+    print(f"  Total: {len(messages)} messages")
+    print(f"  Output written to: {args.output_file}")
+
 
+if __name__ == "__main__":
+    main()
@@ -21,14 +21,14 @@ echo KQ8 Hebrew Translation Workflow
 echo ========================================
 echo.
 
-python.exe .\fix_glyph.py .\glyphs_16_15_menu %GLYPHS_FIXED_CONSOLE%
-python.exe .\fix_glyph.py .\glyphs_16_21 %GLYPHS_FIXED_20%
-python.exe .\fix_glyph.py .\glyphs_16_21_sl %GLYPHS_FIXED_20_SL%
-python.exe .\fix_glyph.py .\glyphs_16_21_l %GLYPHS_FIXED_CONSOLEL%
-python.exe .\fix_glyph.py .\glyphs_24_38 %GLYPHS_FIXED_27%
-python.exe .\fix_glyph.py .\glyphs_24_38 %GLYPHS_FIXED_36%
-python.exe .\fix_glyph.py .\glyphs_32_46 %GLYPHS_FIXED_45%
-python.exe .\fix_glyph.py .\glyphs_32_46_sl %GLYPHS_FIXED_45_SL%
+python.exe .\fix_glyph.py .\glyphs_16_15_menu %GLYPHS_FIXED_CONSOLE% --indexed
+python.exe .\fix_glyph.py .\glyphs_16_21 %GLYPHS_FIXED_20% --indexed
+python.exe .\fix_glyph.py .\glyphs_16_21_sl %GLYPHS_FIXED_20_SL% --indexed
+python.exe .\fix_glyph.py .\glyphs_16_21_l %GLYPHS_FIXED_CONSOLEL% --indexed
+python.exe .\fix_glyph.py .\glyphs_24_38 %GLYPHS_FIXED_27% --indexed
+python.exe .\fix_glyph.py .\glyphs_24_38 %GLYPHS_FIXED_36% --indexed
+python.exe .\fix_glyph.py .\glyphs_32_46 %GLYPHS_FIXED_45% --indexed
+python.exe .\fix_glyph.py .\glyphs_32_46_sl %GLYPHS_FIXED_45_SL% --indexed
 
 REM ========================================
 REM 0. Restore Font Files from Backup
@@ -82,6 +82,7 @@ for %%L in (daventry castled deadcity swamp gnome barren iceworld snowexit templ
     )
 )
 echo.
+python.exe .\parse_ppl.py compare .\all_palettes.png .\daventry\daventry.pal .\castled\castled.pal .\deadcity\deadcity.pal .\swamp\swamp.pal .\gnome\gnome.pal .\barren\barren.pal .\iceworld\iceworld.pal .\snowexit\snowexit.pal .\temple1\temple1.pal .\temple2\temple2.pal .\temple3\temple3.pal .\temple4\temple4.pal
 echo Now add mapping to colors in png_to_bmp.py
 rem pause
 
@@ -131,6 +132,12 @@ python.exe .\create_font.py %GAME_PATH%\GAME\8Gui\36_metadata.json .\GAME\bitmap
 python.exe .\create_font.py %GAME_PATH%\GAME\8Gui\36sl_metadata.json .\GAME\bitmaps_36sl %PATCH%\GAME\8Gui\36sl.pft
 python.exe .\create_font.py %GAME_PATH%\GAME\8Gui\45_metadata.json .\GAME\bitmaps_45 %PATCH%\GAME\8Gui\45.pft
 python.exe .\create_font.py %GAME_PATH%\GAME\8Gui\45sl_metadata.json .\GAME\bitmaps_45sl %PATCH%\GAME\8Gui\45sl.pft
+REM Check the (0,0) dimension encoding of all 23 fonts
+python.exe .\verify_encoding.py %PATCH% --json .\font_encoding.json
+if errorlevel 1 (
+    echo Error: Font bitmaps with a wrong dimension encoding, see font_encoding.json
+    goto :end
+)
 echo.
 
 REM ========================================
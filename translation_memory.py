@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+Persistent translation memory shared across scenes.
+
+A local SQLite file keyed by the normalized English text (see
+text_normalize.normalize_key). map_files populates it from every aligned
+English/Hebrew pair and translate_csv from the scene mapping entries it uses;
+both query it for lines missing from the scene, so a line translated in one
+scene is reused by all others.
+Each entry also carries the tested?/comments columns used by create_csv.
+
+Usage:
+    python translation_memory.py <db> import-csv <csv_file> [--scene <name>]
+    python translation_memory.py <db> export-csv <csv_file>
+    python translation_memory.py <db> stats
+"""
+
+import argparse
+import csv
+import os
+import sqlite3
+import sys
+from datetime import datetime
+
+from text_normalize import normalize_key
+
+DEFAULT_DB = 'translation_memory.db'
+
+# SQLite limits the number of bound parameters per statement
+LOOKUP_CHUNK = 500
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS translations (
+    id INTEGER PRIMARY KEY,
+    english_key TEXT NOT NULL,
+    english TEXT NOT NULL,
+    hebrew TEXT NOT NULL,
+    scene TEXT,
+    tested TEXT NOT NULL DEFAULT '',
+    comments TEXT NOT NULL DEFAULT '',
+    updated_at TEXT
+);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_translations_english_key
+    ON translations (english_key);
+"""
+
+UPSERT = """
+INSERT INTO translations (english_key, english, hebrew, scene, tested, comments, updated_at)
+VALUES (?, ?, ?, ?, COALESCE(?, ''), COALESCE(?, ''), ?)
+ON CONFLICT (english_key) DO UPDATE SET
+    english = excluded.english,
+    hebrew = excluded.hebrew,
+    scene = COALESCE(excluded.scene, translations.scene),
+    tested = COALESCE(?, translations.tested),
+    comments = COALESCE(?, translations.comments),
+    updated_at = excluded.updated_at
+"""
+
+
+class TranslationMemory:
+    def __init__(self, db_path=DEFAULT_DB):
+        self.db_path = db_path
+        self.conn = sqlite3.connect(db_path)
+        self.conn.executescript(SCHEMA)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def close(self):
+        self.conn.close()
+
+    def add_many(self, entries, scene=None):
+        """
+        Insert or update entries in a single transaction.
+
+        Args:
+            entries: Iterable of (english, hebrew) or
+                     (english, hebrew, tested, comments) tuples.
+                     tested/comments of None keep the stored values.
+            scene: Scene name recorded with the entries
+
+        Returns:
+            Number of entries written
+        """
+        now = datetime.now().isoformat(timespec='seconds')
+        rows = []
+        for entry in entries:
+            english, hebrew = entry[0], entry[1]
+            tested = entry[2] if len(entry) > 2 else None
+            comments = entry[3] if len(entry) > 3 else None
+            key = normalize_key(english)
+            if not key or not hebrew.strip():
+                continue
+            rows.append((key, english, hebrew, scene, tested, comments, now, tested, comments))
+
+        with self.conn:
+            self.conn.executemany(UPSERT, rows)
+        return len(rows)
+
+    def lookup(self, english):
+        """Return the Hebrew translation of an English line, or None"""
+        row = self.conn.execute(
+            "SELECT hebrew FROM translations WHERE english_key = ?",
+            (normalize_key(english),)).fetchone()
+        return row[0] if row else None
+
+    def lookup_many(self, english_lines):
+        """
+        Look up many English lines with indexed IN queries.
+
+        Returns:
+            Dictionary of normalized key -> Hebrew for the lines found
+        """
+        keys = list({normalize_key(line) for line in english_lines} - {''})
+        found = {}
+        for start in range(0, len(keys), LOOKUP_CHUNK):
+            chunk = keys[start:start + LOOKUP_CHUNK]
+            placeholders = ','.join('?' * len(chunk))
+            query = f"SELECT english_key, hebrew FROM translations WHERE english_key IN ({placeholders})"
+            found.update(self.conn.execute(query, chunk).fetchall())
+        return found
+
+    def set_status(self, english, tested=None, comments=None):
+        """Update the tested?/comments columns of an entry"""
+        with self.conn:
+            cursor = self.conn.execute(
+                "UPDATE translations SET tested = COALESCE(?, tested), "
+                "comments = COALESCE(?, comments), updated_at = ? WHERE english_key = ?",
+                (tested, comments, datetime.now().isoformat(timespec='seconds'),
+                 normalize_key(english)))
+        return cursor.rowcount > 0
+
+    def entries(self):
+        """Iterate over (english, hebrew, tested, comments, scene) rows"""
+        return self.conn.execute(
+            "SELECT english, hebrew, tested, comments, scene FROM translations ORDER BY id")
+
+    def stats(self):
+        """Return a dictionary with entry counts"""
+        total, tested = self.conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(tested != ''), 0) FROM translations").fetchone()
+        scenes = dict(self.conn.execute(
+            "SELECT COALESCE(scene, ''), COUNT(*) FROM translations GROUP BY scene").fetchall())
+        return {'total': total, 'tested': tested, 'scenes': scenes}
+
+    def import_csv(self, csv_file, scene=None):
+        """Import a create_csv style file (english, hebrew, tested?, comments)"""
+        with open(csv_file, 'r', encoding='utf-8-sig', newline='') as f:
+            rows = [tuple(row[:4]) for row in csv.reader(f) if len(row) >= 2]
+        # Skip an optional header row
+        if rows and rows[0][:2] == ('english', 'hebrew'):
+            rows = rows[1:]
+        return self.add_many(rows, scene)
+
+    def export_csv(self, csv_file):
+        """Export all entries as a create_csv style file"""
+        count = 0
+        with open(csv_file, 'w', encoding='utf-8-sig', newline='') as f:
+            writer = csv.writer(f)
+            for english, hebrew, tested, comments, _ in self.entries():
+                writer.writerow([english, hebrew, tested, comments])
+                count += 1
+        return count
+
+
+def main():
+    """Main function to handle command line arguments"""
+    parser = argparse.ArgumentParser(description='Manage the shared translation memory database')
+    parser.add_argument('db', help='Path to the SQLite database file')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    import_parser = subparsers.add_parser('import-csv', help='Import a create_csv style CSV file')
+    import_parser.add_argument('csv_file', help='Path to the CSV file')
+    import_parser.add_argument('--scene', help='Scene name to record with the entries')
+
+    export_parser = subparsers.add_parser('export-csv', help='Export all entries to a CSV file')
+    export_parser.add_argument('csv_file', help='Path to the output CSV file')
+
+    subparsers.add_parser('stats', help='Show entry counts')
+
+    args = parser.parse_args()
+
+    if args.command == 'import-csv' and not os.path.exists(args.csv_file):
+        print(f"Error: CSV file not found: {args.csv_file}")
+        sys.exit(1)
+
+    with TranslationMemory(args.db) as tm:
+        if args.command == 'import-csv':
+            count = tm.import_csv(args.csv_file, args.scene)
+            print(f"Imported {count} entries into {args.db}")
+        elif args.command == 'export-csv':
+            count = tm.export_csv(args.csv_file)
+            print(f"Exported {count} entries to {args.csv_file}")
+        else:
+            stats = tm.stats()
+            print(f"Entries: {stats['total']} (tested: {stats['tested']})")
+            for scene, count in sorted(stats['scenes'].items()):
+                print(f"  {scene or '(none)'}: {count}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,50 +1,174 @@
 #!/usr/bin/env python3
 """
-Verify the 0,0 pixel width encoding theory
+Verify the 0,0 pixel width encoding of font bitmaps
+
+Every glyph bitmap stores width * height in pixel (0,0); when the value is
+above 255, (0,0) holds the remainder and (1,0) the quotient of a division by
+256 (as png_to_bmp.py writes it). A wrong value only shows up as a glitch in
+the game, so this checks whole fonts at once:
+- .pft files are read directly (no extraction needed)
+- bitmap folders (bitmap_###.bmp/.png) are read through the cached glyph reader
+- folders without bitmaps are searched for .pft files (e.g. the game's 8Gui)
+
+The check runs as one array operation over the first two pixels of all glyphs
+of a font. The exit code is 1 if any glyph is wrong, and --json writes the
+results for build scripts.
+
+Usage:
+    python verify_encoding.py [source ...] [--json results.json] [--workers 4]
+
+Examples:
+    python verify_encoding.py
+    python verify_encoding.py GAME/bitmaps_20 GAME/bitmaps_27
+    python verify_encoding.py %PATCH%/GAME/8Gui daventry/bitmaps --json encoding.json
 """
 
-from PIL import Image
+import argparse
+import json
 import os
+import struct
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from glyph_inspect import load_glyphs, glyph_indices_in, DEFAULT_WORKERS
+from parse_font import read_font
+
+DEFAULT_SOURCE = "bitmaps"
+
+# Exceptions shown per font
+MAX_SHOWN = 10
+
+
+def font_sources(paths):
+    """Expand folders holding .pft files into the font files themselves"""
+    sources = []
+    for path in paths:
+        if os.path.isdir(path) and not glyph_indices_in(path):
+            for dir_path, _, file_names in os.walk(path):
+                sources.extend(os.path.join(dir_path, name) for name in sorted(file_names)
+                               if name.lower().endswith('.pft'))
+        else:
+            sources.append(path)
+    return sources
+
+
+def read_font_glyphs(source):
+    """
+    Glyphs of a .pft file or a bitmap folder.
+
+    Returns:
+        List of (bitmap index, (height, width) array or None if unreadable)
+    """
+    if os.path.isfile(source):
+        _, bitmaps = read_font(source)
+        return bitmaps
+    return [(index, arr if arr.ndim == 2 else None) for index, _, _, arr in load_glyphs(source, max_workers=1)]
+
+
+def check_encoding(glyphs):
+    """
+    Check the (0,0) dimension encoding of many glyphs at once.
+
+    Args:
+        glyphs: List of (index, (height, width) array or None)
+
+    Returns:
+        List of error dictionaries (index, width, height, expected, actual)
+    """
+    indices = np.array([index for index, _ in glyphs], dtype=np.int64)
+    sizes = np.array([arr.shape if arr is not None else (0, 0) for _, arr in glyphs], dtype=np.int64).reshape(-1, 2)
+    # First two pixels of every glyph (-1 where missing)
+    heads = np.full((len(glyphs), 2), -1, dtype=np.int64)
+    for i, (_, arr) in enumerate(glyphs):
+        if arr is not None:
+            head = arr.reshape(-1)[:2]
+            heads[i, :len(head)] = head
+
+    expected = sizes[:, 0] * sizes[:, 1]
+    split = expected > 255
+    actual = np.where(split, heads[:, 0] + heads[:, 1] * 256, heads[:, 0])
+    bad = (actual != expected) | (expected == 0) | (heads[:, 0] < 0) | (split & (heads[:, 1] < 0))
+
+    return [{'index': int(index), 'width': int(width), 'height': int(height),
+             'expected': int(exp), 'actual': int(act)}
+            for index, (height, width), exp, act in zip(indices[bad], sizes[bad], expected[bad], actual[bad])]
+
+
+def verify_font(source):
+    """
+    Verify one font (a .pft file or a bitmap folder).
 
-def verify_width_encoding():
+    Returns:
+        Result dictionary: source, glyphs, valid, errors (or error for unreadable fonts)
     """
-    Check if pixel(0,0) encodes the bitmap width
+    try:
+        glyphs = read_font_glyphs(source)
+    except (OSError, ValueError, struct.error) as e:
+        return {'source': source, 'glyphs': 0, 'valid': 0, 'errors': [], 'error': str(e)}
+    errors = check_encoding(glyphs)
+    return {'source': source, 'glyphs': len(glyphs), 'valid': len(glyphs) - len(errors), 'errors': errors}
+
+
+def verify_width_encoding(sources=(DEFAULT_SOURCE,), max_workers=DEFAULT_WORKERS):
+    """
+    Check if pixel(0,0) encodes the bitmap width × height in all given fonts
+
+    Returns:
+        List of result dictionaries (see verify_font)
     """
     print("Verifying width encoding theory:")
     print("pixel(0,0) should equal width × height")
     print("=" * 50)
-    
-    correct_predictions = 0
-    total_bitmaps = 0
-    exceptions = []
-    
-    for i in range(224):
-        bitmap_file = f"bitmap_{i:03d}.png"
-        bitmap_path = os.path.join("bitmaps", bitmap_file)
-        
-        if os.path.exists(bitmap_path):
-            img = Image.open(bitmap_path)
-            width, height = img.size
-            first_pixel = img.getpixel((0, 0))
-            
-            expected = width * height
-            actual = first_pixel
-            
-            total_bitmaps += 1
-            
-            if actual == expected:
-                correct_predictions += 1
-            else:
-                exceptions.append((i, width, height, expected, actual))
-                if len(exceptions) <= 10:  # Show first 10 exceptions
-                    print(f"  Exception bitmap_{i:03d}: {width}x{height}, expected={expected}, actual={actual}")
-    
-    print(f"\nResults:")
-    print(f"  Correct predictions: {correct_predictions}/{total_bitmaps} ({correct_predictions/total_bitmaps*100:.1f}%)")
-    print(f"  Exceptions: {len(exceptions)}")
-    
-    if len(exceptions) > 10:
-        print(f"  (showing first 10 exceptions only)")
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        results = list(pool.map(verify_font, font_sources(sources)))
+
+    for result in results:
+        print(f"\n{result['source']}:")
+        if 'error' in result:
+            print(f"  Error: {result['error']}")
+            continue
+        for error in result['errors'][:MAX_SHOWN]:
+            print(f"  Exception bitmap_{error['index']:03d}: {error['width']}x{error['height']}, "
+                  f"expected={error['expected']}, actual={error['actual']}")
+        total = result['glyphs']
+        percent = result['valid'] / total * 100 if total else 0.0
+        print(f"  Correct predictions: {result['valid']}/{total} ({percent:.1f}%)")
+        print(f"  Exceptions: {len(result['errors'])}")
+        if len(result['errors']) > MAX_SHOWN:
+            print(f"  (showing first {MAX_SHOWN} exceptions only)")
+
+    failed = [result for result in results if result['errors'] or 'error' in result]
+    print(f"\nResults: {len(results) - len(failed)}/{len(results)} fonts valid")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Verify the (0,0) dimension encoding of font bitmaps')
+    parser.add_argument('sources', nargs='*', default=[DEFAULT_SOURCE],
+                        help='.pft files, bitmap folders or folders with .pft files (default: bitmaps)')
+    parser.add_argument('--json', help='Write the results to this JSON file')
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS,
+                        help=f'Number of parallel workers (default: {DEFAULT_WORKERS})')
+    args = parser.parse_args()
+
+    for source in args.sources:
+        if not os.path.exists(source):
+            print(f"Error: '{source}' not found")
+            sys.exit(1)
+
+    results = verify_width_encoding(args.sources, args.workers)
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"Wrote results to {args.json}")
+
+    if not results or any(result['errors'] or 'error' in result for result in results):
+        sys.exit(1)
+
 
 if __name__ == "__main__":
-    verify_width_encoding()
\ No newline at end of file
+    main()